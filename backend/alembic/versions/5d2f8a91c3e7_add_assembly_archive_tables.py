@@ -0,0 +1,80 @@
+"""add assembly archive tables
+
+Revision ID: 5d2f8a91c3e7
+Revises: 37870626322d
+Create Date: 2026-10-19 09:12:41.208311
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "5d2f8a91c3e7"
+down_revision: Union[str, Sequence[str], None] = "37870626322d"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("assemblies", sa.Column("cancelled_at", sa.DateTime(), nullable=True))
+    op.create_index("ix_assemblies_status", "assemblies", ["status"])
+    op.create_index(
+        "ix_assembly_components_assembly_id", "assembly_components", ["assembly_id"]
+    )
+
+    op.create_table(
+        "assemblies_archive",
+        sa.Column("id", sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column("configuration_id", sa.Integer(), nullable=True),
+        sa.Column("status", sa.String(length=50), nullable=False),
+        sa.Column("order_reference", sa.String(length=100), nullable=True),
+        sa.Column("notes", sa.Text(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("completed_at", sa.DateTime(), nullable=True),
+        sa.Column("shipped_at", sa.DateTime(), nullable=True),
+        sa.Column("cancelled_at", sa.DateTime(), nullable=True),
+        sa.Column(
+            "archived_at",
+            sa.DateTime(),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_assemblies_archive_configuration_id",
+        "assemblies_archive",
+        ["configuration_id"],
+    )
+    op.create_table(
+        "assembly_components_archive",
+        sa.Column("id", sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column("assembly_id", sa.Integer(), nullable=False),
+        sa.Column("item_id", sa.Integer(), nullable=False),
+        sa.Column("quantity", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_assembly_components_archive_assembly_id",
+        "assembly_components_archive",
+        ["assembly_id"],
+    )
+    op.create_index(
+        "ix_assembly_components_archive_item_id",
+        "assembly_components_archive",
+        ["item_id"],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("assembly_components_archive")
+    op.drop_table("assemblies_archive")
+    op.drop_index("ix_assembly_components_assembly_id", "assembly_components")
+    op.drop_index("ix_assemblies_status", "assemblies")
+    op.drop_column("assemblies", "cancelled_at")
@@ -0,0 +1,51 @@
+"""add FIFO cost layers
+
+Revision ID: 7c4e1f9a2b80
+Revises: 0b7e2d9c4f61
+Create Date: 2026-10-19 21:10:27.553019
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "7c4e1f9a2b80"
+down_revision: Union[str, Sequence[str], None] = "0b7e2d9c4f61"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "inventory_transactions",
+        sa.Column("unit_cost", sa.Numeric(precision=12, scale=4), nullable=True),
+    )
+    op.create_table(
+        "cost_layers",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("item_id", sa.Integer(), nullable=False),
+        sa.Column("received_at", sa.DateTime(), nullable=False),
+        sa.Column("quantity", sa.Integer(), nullable=False),
+        sa.Column("quantity_remaining", sa.Integer(), nullable=False),
+        sa.Column("unit_cost", sa.Numeric(precision=12, scale=4), nullable=True),
+        sa.ForeignKeyConstraint(["item_id"], ["items.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_cost_layers_open",
+        "cost_layers",
+        ["item_id", "received_at", "id"],
+        postgresql_where=sa.text("quantity_remaining > 0"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_cost_layers_open", table_name="cost_layers")
+    op.drop_table("cost_layers")
+    op.drop_column("inventory_transactions", "unit_cost")
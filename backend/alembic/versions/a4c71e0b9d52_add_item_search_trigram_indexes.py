@@ -0,0 +1,47 @@
+"""add item search trigram indexes
+
+Revision ID: a4c71e0b9d52
+Revises: 5d2f8a91c3e7
+Create Date: 2026-10-19 14:03:17.554920
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "a4c71e0b9d52"
+down_revision: Union[str, Sequence[str], None] = "5d2f8a91c3e7"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Other databases fall back to the in-process search index
+    if op.get_bind().dialect.name != "postgresql":
+        return
+
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.execute(
+        "CREATE INDEX ix_items_name_trgm ON items USING gin (lower(name) gin_trgm_ops)"
+    )
+    op.execute(
+        "CREATE INDEX ix_items_sku_trgm ON items USING gin (lower(sku) gin_trgm_ops)"
+    )
+    op.execute(
+        "CREATE INDEX ix_items_barcode_trgm ON items "
+        "USING gin (lower(coalesce(barcode, '')) gin_trgm_ops)"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != "postgresql":
+        return
+
+    op.execute("DROP INDEX IF EXISTS ix_items_barcode_trgm")
+    op.execute("DROP INDEX IF EXISTS ix_items_sku_trgm")
+    op.execute("DROP INDEX IF EXISTS ix_items_name_trgm")
@@ -0,0 +1,36 @@
+"""add inventory summary deltas
+
+Revision ID: b5e2c8a17d43
+Revises: 9a3d5e7f1c26
+Create Date: 2026-10-19 23:12:37.418265
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "b5e2c8a17d43"
+down_revision: Union[str, Sequence[str], None] = "9a3d5e7f1c26"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "inventory_summary_deltas",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("metric", sa.String(length=50), nullable=False),
+        sa.Column("dimension", sa.String(length=50), nullable=False),
+        sa.Column("value", sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("inventory_summary_deltas")
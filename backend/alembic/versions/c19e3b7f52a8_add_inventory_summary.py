@@ -0,0 +1,65 @@
+"""add inventory summary
+
+Revision ID: c19e3b7f52a8
+Revises: a4c71e0b9d52
+Create Date: 2026-10-19 16:41:52.730184
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "c19e3b7f52a8"
+down_revision: Union[str, Sequence[str], None] = "a4c71e0b9d52"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "inventory_summary",
+        sa.Column("metric", sa.String(length=50), nullable=False),
+        sa.Column("dimension", sa.String(length=50), nullable=False),
+        sa.Column("value", sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint("metric", "dimension"),
+    )
+
+    # Backfill from the base tables; writes keep it current from here on
+    for metric, column in (
+        ("on_hand", "quantity_on_hand"),
+        ("reserved", "quantity_reserved"),
+        ("on_order", "quantity_on_order"),
+    ):
+        op.execute(
+            "INSERT INTO inventory_summary (metric, dimension, value) "
+            f"SELECT '{metric}', type, COALESCE(SUM({column}), 0) "
+            "FROM items GROUP BY type"
+        )
+    op.execute(
+        "INSERT INTO inventory_summary (metric, dimension, value) "
+        "SELECT 'items', type, COUNT(*) FROM items GROUP BY type"
+    )
+    op.execute(
+        "INSERT INTO inventory_summary (metric, dimension, value) "
+        "SELECT 'assemblies', status, COUNT(*) FROM ("
+        "SELECT status FROM assemblies "
+        "UNION ALL SELECT status FROM assemblies_archive"
+        ") AS statuses GROUP BY status"
+    )
+    op.execute(
+        "INSERT INTO inventory_summary (metric, dimension, value) "
+        "SELECT 'configurations', "
+        "CASE WHEN archived THEN 'archived' ELSE 'active' END, COUNT(*) "
+        "FROM configurations "
+        "GROUP BY CASE WHEN archived THEN 'archived' ELSE 'active' END"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("inventory_summary")
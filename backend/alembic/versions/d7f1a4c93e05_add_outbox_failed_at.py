@@ -0,0 +1,43 @@
+"""add outbox failed_at
+
+Revision ID: d7f1a4c93e05
+Revises: b5e2c8a17d43
+Create Date: 2026-10-19 23:48:05.216934
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "d7f1a4c93e05"
+down_revision: Union[str, Sequence[str], None] = "b5e2c8a17d43"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("outbox_events", sa.Column("failed_at", sa.DateTime(), nullable=True))
+    op.drop_index("ix_outbox_events_pending", table_name="outbox_events")
+    op.create_index(
+        "ix_outbox_events_pending",
+        "outbox_events",
+        ["id"],
+        postgresql_where=sa.text("delivered_at IS NULL AND failed_at IS NULL"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_outbox_events_pending", table_name="outbox_events")
+    op.create_index(
+        "ix_outbox_events_pending",
+        "outbox_events",
+        ["id"],
+        postgresql_where=sa.text("delivered_at IS NULL"),
+    )
+    op.drop_column("outbox_events", "failed_at")
@@ -0,0 +1,34 @@
+"""add outbox pending aggregate index
+
+Revision ID: e4b9c2d7a618
+Revises: d7f1a4c93e05
+Create Date: 2026-10-19 23:59:12.804417
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e4b9c2d7a618"
+down_revision: Union[str, Sequence[str], None] = "d7f1a4c93e05"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        "ix_outbox_events_pending_aggregate",
+        "outbox_events",
+        ["aggregate_type", "aggregate_id", "id"],
+        postgresql_where=sa.text("delivered_at IS NULL AND failed_at IS NULL"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_outbox_events_pending_aggregate", table_name="outbox_events")
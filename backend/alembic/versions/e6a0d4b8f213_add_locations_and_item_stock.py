@@ -0,0 +1,88 @@
+"""add locations and item stock
+
+Revision ID: e6a0d4b8f213
+Revises: c19e3b7f52a8
+Create Date: 2026-10-19 18:05:27.614902
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e6a0d4b8f213"
+down_revision: Union[str, Sequence[str], None] = "c19e3b7f52a8"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+STOCK_PARTITIONS = 8
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "locations",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("code", sa.String(length=50), nullable=False),
+        sa.Column("name", sa.String(length=255), nullable=False),
+        sa.Column(
+            "created_at",
+            sa.DateTime(),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("code"),
+    )
+    op.create_table(
+        "item_stock",
+        sa.Column("location_id", sa.Integer(), nullable=False),
+        sa.Column("item_id", sa.Integer(), nullable=False),
+        sa.Column("quantity_on_hand", sa.Integer(), nullable=False),
+        sa.Column("quantity_reserved", sa.Integer(), nullable=False),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.ForeignKeyConstraint(["item_id"], ["items.id"]),
+        sa.ForeignKeyConstraint(["location_id"], ["locations.id"]),
+        sa.PrimaryKeyConstraint("location_id", "item_id"),
+        postgresql_partition_by="HASH (location_id)",
+    )
+    if op.get_bind().dialect.name == "postgresql":
+        for remainder in range(STOCK_PARTITIONS):
+            op.execute(
+                f"CREATE TABLE item_stock_p{remainder} PARTITION OF item_stock "
+                f"FOR VALUES WITH (MODULUS {STOCK_PARTITIONS}, "
+                f"REMAINDER {remainder})"
+            )
+    op.create_index("ix_item_stock_item_id", "item_stock", ["item_id"])
+
+    op.add_column("assemblies", sa.Column("location_id", sa.Integer(), nullable=True))
+    op.create_foreign_key(
+        "assemblies_location_id_fkey",
+        "assemblies",
+        "locations",
+        ["location_id"],
+        ["id"],
+    )
+    op.create_index("ix_assemblies_location_id", "assemblies", ["location_id"])
+    op.add_column(
+        "assemblies_archive", sa.Column("location_id", sa.Integer(), nullable=True)
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("assemblies_archive", "location_id")
+    op.drop_index("ix_assemblies_location_id", "assemblies")
+    op.drop_constraint("assemblies_location_id_fkey", "assemblies", type_="foreignkey")
+    op.drop_column("assemblies", "location_id")
+    op.drop_index("ix_item_stock_item_id", "item_stock")
+    op.drop_table("item_stock")
+    op.drop_table("locations")
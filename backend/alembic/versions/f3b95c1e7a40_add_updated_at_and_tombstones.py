@@ -0,0 +1,63 @@
+"""add updated_at cursors and tombstones
+
+Revision ID: f3b95c1e7a40
+Revises: e6a0d4b8f213
+Create Date: 2026-10-19 19:22:10.418377
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "f3b95c1e7a40"
+down_revision: Union[str, Sequence[str], None] = "e6a0d4b8f213"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table in ("configurations", "assemblies"):
+        op.add_column(
+            table,
+            sa.Column(
+                "updated_at",
+                sa.DateTime(),
+                server_default=sa.text("now()"),
+                nullable=False,
+            ),
+        )
+        # Existing rows last changed no later than they were created
+        op.execute(f"UPDATE {table} SET updated_at = created_at")
+    for table in ("items", "configurations", "assemblies"):
+        op.create_index(f"ix_{table}_updated_at", table, ["updated_at"])
+
+    op.create_table(
+        "tombstones",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("entity", sa.String(length=50), nullable=False),
+        sa.Column("entity_id", sa.Integer(), nullable=False),
+        sa.Column(
+            "deleted_at",
+            sa.DateTime(),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_tombstones_entity_deleted_at", "tombstones", ["entity", "deleted_at"]
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("tombstones")
+    for table in ("items", "configurations", "assemblies"):
+        op.drop_index(f"ix_{table}_updated_at", table)
+    for table in ("configurations", "assemblies"):
+        op.drop_column(table, "updated_at")
@@ -0,0 +1,64 @@
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+
+from app.core.database import get_db
+from app.schemas.analytics import (
+    InventoryValuation,
+    ItemConsumption,
+    ItemValuation,
+)
+from app.services.consumption import forecast_consumption
+from app.services.valuation import inventory_valuation
+
+router = APIRouter(prefix="/analytics", tags=["analytics"])
+
+# Beyond this a stockout date is noise from a near-zero smoothed rate
+MAX_FORECAST_DAYS = 3650
+
+
+@router.get("/consumption", response_model=list[ItemConsumption])
+def get_consumption(
+    history_days: int = Query(365, ge=90, le=3650),
+    alpha: float = Query(0.3, gt=0, le=1),
+    db: Session = Depends(get_db),
+):
+    """Get per-item consumption and days of cover, shortest cover first."""
+    today = datetime.now(timezone.utc).date()
+    forecasts = forecast_consumption(db, history_days, alpha, today)
+    forecasts.sort(
+        key=lambda f: (f.days_of_cover is None, f.days_of_cover or 0, f.item_id)
+    )
+    return [
+        ItemConsumption(
+            item_id=f.item_id,
+            item_name=f.item_name,
+            item_sku=f.item_sku,
+            quantity_available=f.quantity_available,
+            consumed_7d=f.consumed[7],
+            consumed_30d=f.consumed[30],
+            consumed_90d=f.consumed[90],
+            daily_rate=round(f.daily_rate, 4),
+            days_of_cover=(
+                round(f.days_of_cover, 1) if f.days_of_cover is not None else None
+            ),
+            stockout_date=(
+                today + timedelta(days=int(f.days_of_cover))
+                if f.days_of_cover is not None and f.days_of_cover < MAX_FORECAST_DAYS
+                else None
+            ),
+        )
+        for f in forecasts
+    ]
+
+
+@router.get("/valuation", response_model=InventoryValuation)
+def get_valuation(db: Session = Depends(get_db)):
+    """Get the FIFO value of stock on hand per item and in total."""
+    items = inventory_valuation(db)
+    return InventoryValuation(
+        total_value=sum((item.value for item in items), Decimal("0.00")),
+        items=[ItemValuation(**vars(item)) for item in items],
+    )
@@ -1,20 +1,68 @@
+import csv
+import io
 from datetime import datetime, timezone
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 
-from app.core.database import get_db
-from app.models import Assembly, AssemblyComponent, Item, ConfigurationComponent
+from app.api.fieldsets import parse_fields, parse_include, sparse_response
+from app.core.config import settings
+from app.core.database import SessionLocal, get_db
+from app.models import (
+    ArchivedAssembly,
+    ArchivedAssemblyComponent,
+    Assembly,
+    AssemblyComponent,
+    Item,
+    Configuration,
+    ConfigurationComponent,
+    Location,
+    Tombstone,
+)
 from app.schemas.assembly import (
+    AssemblyBulkCreate,
+    AssemblyBulkResponse,
+    AssemblyShortage,
     AssemblyCreate,
     AssemblyUpdate,
     AssemblyResponse,
     AssemblyComponentResponse,
     AssemblyComponentBase,
+    ArchivedAssemblyResponse,
+    PickListLine,
+)
+from app.services.bulk_assembly import create_assemblies
+from app.services.capacity_index import capacity_index
+from app.services.locations import (
+    StockError,
+    consume_location_stock,
+    release_location_stock,
+    reserve_location_stock,
 )
+from app.services.outbox import record_event
+from app.services.reservation_queue import ReservationError, ReservationQueue
+from app.services.valuation import consume_cost_layers
 
 router = APIRouter(prefix="/assemblies", tags=["assemblies"])
 
+MAX_BULK_ASSEMBLIES = 500
+
+PICK_LIST_COLUMNS = (
+    "item_id",
+    "item_sku",
+    "item_name",
+    "quantity",
+    "assemblies",
+    "quantity_on_hand",
+)
+
+reservation_queue = ReservationQueue(
+    SessionLocal,
+    window=settings.intake_batch_window_ms / 1000,
+    max_batch=settings.intake_max_batch,
+)
+
 
 def get_assembly_with_components(db: Session, assembly_id: int) -> dict | None:
     """Get assembly with component details."""
@@ -42,77 +90,223 @@ def get_assembly_with_components(db: Session, assembly_id: int) -> dict | None:
     return {
         "id": assembly.id,
         "configuration_id": assembly.configuration_id,
+        "location_id": assembly.location_id,
         "status": assembly.status,
         "order_reference": assembly.order_reference,
         "notes": assembly.notes,
         "created_at": assembly.created_at,
+        "updated_at": assembly.updated_at,
         "completed_at": assembly.completed_at,
         "shipped_at": assembly.shipped_at,
+        "cancelled_at": assembly.cancelled_at,
         "components": components,
     }
 
 
-@router.get("/stats/build-capacity")
-def get_build_capacity(db: Session = Depends(get_db)):
-    """Calculate how many of each configuration can be built with current stock."""
-    from app.models import Configuration
+def get_components_for_assemblies(
+    db: Session, assembly_ids: list[int]
+) -> dict[int, list[AssemblyComponentResponse]]:
+    """Component details for many assemblies in a single query."""
+    components: dict[int, list[AssemblyComponentResponse]] = {
+        assembly_id: [] for assembly_id in assembly_ids
+    }
+    if not components:
+        return components
+
+    rows = (
+        db.query(AssemblyComponent, Item.name, Item.sku)
+        .outerjoin(Item, Item.id == AssemblyComponent.item_id)
+        .filter(AssemblyComponent.assembly_id.in_(components))
+        .order_by(AssemblyComponent.id)
+    )
+    for ac, item_name, item_sku in rows:
+        components[ac.assembly_id].append(
+            AssemblyComponentResponse(
+                id=ac.id,
+                item_id=ac.item_id,
+                quantity=ac.quantity,
+                item_name=item_name,
+                item_sku=item_sku,
+            )
+        )
+    return components
 
-    configurations = db.query(Configuration).all()
-    result = []
 
-    for config in configurations:
-        config_components = (
-            db.query(ConfigurationComponent)
-            .filter(ConfigurationComponent.configuration_id == config.id)
-            .all()
+def get_archived_assemblies_with_components(
+    db: Session, archived: list[ArchivedAssembly]
+) -> list[dict]:
+    """Attach component details to archived assemblies in a single query."""
+    components: dict[int, list[AssemblyComponentResponse]] = {
+        a.id: [] for a in archived
+    }
+    rows = (
+        db.query(ArchivedAssemblyComponent, Item.name, Item.sku)
+        .outerjoin(Item, Item.id == ArchivedAssemblyComponent.item_id)
+        .filter(ArchivedAssemblyComponent.assembly_id.in_(components))
+        .order_by(ArchivedAssemblyComponent.id)
+    )
+    for ac, item_name, item_sku in rows:
+        components[ac.assembly_id].append(
+            AssemblyComponentResponse(
+                id=ac.id,
+                item_id=ac.item_id,
+                quantity=ac.quantity,
+                item_name=item_name,
+                item_sku=item_sku,
+            )
         )
 
-        if not config_components:
-            result.append(
-                {
-                    "configuration_id": config.id,
-                    "configuration_name": config.name,
-                    "can_build": 0,
-                }
-            )
-            continue
+    return [
+        {
+            "id": a.id,
+            "configuration_id": a.configuration_id,
+            "location_id": a.location_id,
+            "status": a.status,
+            "order_reference": a.order_reference,
+            "notes": a.notes,
+            "created_at": a.created_at,
+            "completed_at": a.completed_at,
+            "shipped_at": a.shipped_at,
+            "cancelled_at": a.cancelled_at,
+            "archived_at": a.archived_at,
+            "components": components[a.id],
+        }
+        for a in archived
+    ]
 
-        # Find minimum builds possible based on available stock
-        min_builds = float("inf")
-        for cc in config_components:
-            item = db.query(Item).filter(Item.id == cc.item_id).first()
-            if not item or cc.quantity == 0:
-                min_builds = 0
-                break
-            builds_possible = item.quantity_available // cc.quantity
-            min_builds = min(min_builds, builds_possible)
-
-        result.append(
-            {
-                "configuration_id": config.id,
-                "configuration_name": config.name,
-                "can_build": int(min_builds) if min_builds != float("inf") else 0,
-            }
-        )
 
-    return result
+@router.get("/stats/build-capacity")
+def get_build_capacity(db: Session = Depends(get_db)):
+    """Calculate how many of each configuration can be built with current stock."""
+    capacity_index.ensure_fresh(db)
+    return capacity_index.capacity()
 
 
 @router.get("/", response_model=list[AssemblyResponse])
-def list_assemblies(status: str | None = None, db: Session = Depends(get_db)):
-    """Get all assemblies, optionally filtered by status."""
-    query = db.query(Assembly)
+def list_assemblies(
+    status: str | None = None,
+    fields: str | None = None,
+    include: str | None = None,
+    db: Session = Depends(get_db),
+):
+    """Get all assemblies, optionally filtered by status.
+
+    ``fields=id,status`` selects columns and ``include=components`` embeds
+    components; without either the full assemblies are returned.
+    """
+    columns = parse_fields(fields, AssemblyResponse)
+    embed = parse_include(include, fields)
+    selected = columns or [
+        name for name in AssemblyResponse.model_fields if name != "components"
+    ]
+
+    query = db.query(*(getattr(Assembly, name) for name in selected))
     if status:
         query = query.filter(Assembly.status == status)
-    assemblies = query.order_by(Assembly.created_at.desc()).all()
-    return [get_assembly_with_components(db, a.id) for a in assemblies]
+    rows = [dict(row._mapping) for row in query.order_by(Assembly.created_at.desc())]
+
+    if "components" in embed:
+        components = get_components_for_assemblies(db, [row["id"] for row in rows])
+        for row in rows:
+            row["components"] = components[row["id"]]
+    if columns is None and "components" in embed:
+        return rows
+    return sparse_response(rows)
+
+
+@router.get("/history", response_model=list[ArchivedAssemblyResponse])
+def list_assembly_history(
+    status: str | None = None,
+    configuration_id: int | None = None,
+    limit: int = Query(100, ge=1, le=1000),
+    offset: int = Query(0, ge=0),
+    db: Session = Depends(get_db),
+):
+    """Get archived assemblies, newest first."""
+    query = db.query(ArchivedAssembly)
+    if status:
+        query = query.filter(ArchivedAssembly.status == status)
+    if configuration_id is not None:
+        query = query.filter(ArchivedAssembly.configuration_id == configuration_id)
+    archived = (
+        query.order_by(ArchivedAssembly.created_at.desc(), ArchivedAssembly.id.desc())
+        .offset(offset)
+        .limit(limit)
+        .all()
+    )
+    return get_archived_assemblies_with_components(db, archived)
+
+
+def sum_pick_list(
+    db: Session, assembly_ids: list[int] | None, status: str | None
+) -> list[dict]:
+    """Component quantities per item over the selected assemblies, by SKU."""
+    query = (
+        db.query(
+            Item.id.label("item_id"),
+            Item.sku.label("item_sku"),
+            Item.name.label("item_name"),
+            func.sum(AssemblyComponent.quantity).label("quantity"),
+            func.count(func.distinct(AssemblyComponent.assembly_id)).label(
+                "assemblies"
+            ),
+            Item.quantity_on_hand,
+        )
+        .join(Item, Item.id == AssemblyComponent.item_id)
+        .group_by(Item.id, Item.sku, Item.name, Item.quantity_on_hand)
+        .order_by(Item.sku)
+    )
+    if assembly_ids:
+        query = query.filter(AssemblyComponent.assembly_id.in_(assembly_ids))
+    if status:
+        query = query.join(Assembly, Assembly.id == AssemblyComponent.assembly_id)
+        query = query.filter(Assembly.status == status)
+    return [dict(row._mapping) for row in query]
+
+
+@router.get("/pick-list", response_model=list[PickListLine])
+def get_pick_list(
+    ids: list[int] | None = Query(None),
+    status: str | None = None,
+    format: str = Query("json", pattern="^(json|csv)$"),
+    db: Session = Depends(get_db),
+):
+    """Get the components to pull for a set of assemblies, totalled per item.
+
+    Select assemblies with repeated ``ids`` and/or a ``status``;
+    ``format=csv`` downloads the list as CSV.
+    """
+    if not ids and not status:
+        raise HTTPException(status_code=400, detail="Give assembly ids or a status")
+    if ids and len(ids) > MAX_BULK_ASSEMBLIES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {MAX_BULK_ASSEMBLIES} assemblies per pick list",
+        )
+
+    lines = sum_pick_list(db, ids, status)
+    if format == "json":
+        return lines
+
+    out = io.StringIO()
+    writer = csv.DictWriter(out, fieldnames=PICK_LIST_COLUMNS)
+    writer.writeheader()
+    writer.writerows(lines)
+    return Response(
+        content=out.getvalue(),
+        media_type="text/csv",
+        headers={"Content-Disposition": 'attachment; filename="pick-list.csv"'},
+    )
 
 
 @router.get("/{assembly_id}", response_model=AssemblyResponse)
 def get_assembly(assembly_id: int, db: Session = Depends(get_db)):
-    """Get a single assembly by ID."""
+    """Get a single assembly by ID, falling back to the archive."""
     result = get_assembly_with_components(db, assembly_id)
     if not result:
+        archived = db.get(ArchivedAssembly, assembly_id)
+        if archived:
+            return get_archived_assemblies_with_components(db, [archived])[0]
         raise HTTPException(status_code=404, detail="Assembly not found")
     return result
 
@@ -120,6 +314,19 @@ def get_assembly(assembly_id: int, db: Session = Depends(get_db)):
 @router.post("/", response_model=AssemblyResponse, status_code=201)
 def create_assembly(assembly_in: AssemblyCreate, db: Session = Depends(get_db)):
     """Create a new assembly and reserve components."""
+    if settings.assembly_intake_queue and assembly_in.location_id is None:
+        try:
+            assembly_id = reservation_queue.reserve(
+                assembly_in, timeout=settings.intake_timeout_s
+            )
+        except ReservationError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        except TimeoutError:
+            raise HTTPException(
+                status_code=503, detail="Reservation queue is busy, retry later"
+            )
+        return get_assembly_with_components(db, assembly_id)
+
     # If configuration provided, load default components
     components_to_reserve: list[AssemblyComponentBase] = list(assembly_in.components)
 
@@ -136,6 +343,9 @@ def create_assembly(assembly_in: AssemblyCreate, db: Session = Depends(get_db)):
                 AssemblyComponentBase(item_id=cc.item_id, quantity=cc.quantity)
             )
 
+    if assembly_in.location_id is not None:
+        return create_location_assembly(db, assembly_in, components_to_reserve)
+
     # Check availability for all components
     for comp in components_to_reserve:
         item = db.query(Item).filter(Item.id == comp.item_id).first()
@@ -178,6 +388,124 @@ def create_assembly(assembly_in: AssemblyCreate, db: Session = Depends(get_db)):
     return get_assembly_with_components(db, assembly.id)
 
 
+@router.post("/bulk", response_model=AssemblyBulkResponse, status_code=201)
+def create_assemblies_bulk(bulk_in: AssemblyBulkCreate, db: Session = Depends(get_db)):
+    """Create many assemblies of one configuration, reserving stock once."""
+    references: list[str | None]
+    if bulk_in.order_references is not None:
+        references = list(bulk_in.order_references)
+        if bulk_in.quantity is not None and bulk_in.quantity != len(references):
+            raise HTTPException(
+                status_code=400,
+                detail="Quantity must match the number of order references",
+            )
+    else:
+        references = [None] * (bulk_in.quantity or 0)
+    if not 1 <= len(references) <= MAX_BULK_ASSEMBLIES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Create between 1 and {MAX_BULK_ASSEMBLIES} assemblies",
+        )
+    if not db.get(Configuration, bulk_in.configuration_id):
+        raise HTTPException(status_code=404, detail="Configuration not found")
+
+    try:
+        result = create_assemblies(
+            db,
+            bulk_in.configuration_id,
+            references,
+            notes=bulk_in.notes,
+            partial=bulk_in.partial,
+        )
+    except ReservationError as e:
+        db.rollback()
+        raise HTTPException(status_code=400, detail=str(e))
+    return AssemblyBulkResponse(
+        requested=len(references),
+        created=len(result.assembly_ids),
+        assembly_ids=result.assembly_ids,
+        unfulfilled=result.unfulfilled,
+        shortages=[AssemblyShortage(**vars(shortage)) for shortage in result.shortages],
+    )
+
+
+def create_location_assembly(
+    db: Session,
+    assembly_in: AssemblyCreate,
+    components: list[AssemblyComponentBase],
+) -> dict | None:
+    """Create an assembly reserving stock at its location only."""
+    location = db.get(Location, assembly_in.location_id)
+    if not location:
+        raise HTTPException(
+            status_code=400, detail=f"Location {assembly_in.location_id} not found"
+        )
+
+    needed: dict[int, int] = {}
+    for comp in components:
+        needed[comp.item_id] = needed.get(comp.item_id, 0) + comp.quantity
+    try:
+        reserve_location_stock(db, location, needed)
+    except StockError as e:
+        db.rollback()
+        raise HTTPException(status_code=400, detail=str(e))
+
+    assembly = Assembly(
+        configuration_id=assembly_in.configuration_id,
+        location_id=location.id,
+        order_reference=assembly_in.order_reference,
+        notes=assembly_in.notes,
+        status="reserved",
+    )
+    db.add(assembly)
+    db.flush()
+    db.add_all(
+        AssemblyComponent(
+            assembly_id=assembly.id, item_id=comp.item_id, quantity=comp.quantity
+        )
+        for comp in components
+    )
+
+    db.commit()
+    return get_assembly_with_components(db, assembly.id)
+
+
+def component_quantities(db: Session, assembly_id: int) -> dict[int, int]:
+    """Units per item held by an assembly."""
+    quantities: dict[int, int] = {}
+    for ac in db.query(AssemblyComponent).filter(
+        AssemblyComponent.assembly_id == assembly_id
+    ):
+        quantities[ac.item_id] = quantities.get(ac.item_id, 0) + ac.quantity
+    return quantities
+
+
+def record_assembly_event(
+    db: Session, assembly: Assembly, event_type: str, quantities: dict[int, int]
+) -> None:
+    """Queue an integration event for an assembly status change."""
+    record_event(
+        db,
+        "assembly",
+        assembly.id,
+        event_type,
+        {
+            "id": assembly.id,
+            "configuration_id": assembly.configuration_id,
+            "location_id": assembly.location_id,
+            "order_reference": assembly.order_reference,
+            "status": assembly.status,
+            "completed_at": assembly.completed_at,
+            "shipped_at": assembly.shipped_at,
+            "cancelled_at": assembly.cancelled_at,
+            "components": [
+                {"item_id": item_id, "quantity": quantity}
+                for item_id, quantity in sorted(quantities.items())
+            ],
+        },
+    )
+
+
 @router.patch("/{assembly_id}", response_model=AssemblyResponse)
 def update_assembly(
     assembly_id: int, assembly_in: AssemblyUpdate, db: Session = Depends(get_db)
@@ -227,19 +555,26 @@ def complete_assembly(assembly_id: int, db: Session = Depends(get_db)):
             detail=f"Cannot complete assembly with status '{assembly.status}'",
         )
 
-    # Consume components
-    for ac in (
-        db.query(AssemblyComponent)
-        .filter(AssemblyComponent.assembly_id == assembly_id)
-        .all()
-    ):
-        item = db.query(Item).filter(Item.id == ac.item_id).first()
-        if item:
-            item.quantity_on_hand -= ac.quantity
-            item.quantity_reserved -= ac.quantity
+    # Consume components; central stock also draws down its oldest cost
+    # layers (location stock has none)
+    quantities = component_quantities(db, assembly_id)
+    if assembly.location_id is not None:
+        consume_location_stock(db, assembly.location_id, quantities)
+    else:
+        consume_cost_layers(db, quantities)
+        for ac in (
+            db.query(AssemblyComponent)
+            .filter(AssemblyComponent.assembly_id == assembly_id)
+            .all()
+        ):
+            item = db.query(Item).filter(Item.id == ac.item_id).first()
+            if item:
+                item.quantity_on_hand -= ac.quantity
+                item.quantity_reserved -= ac.quantity
 
     assembly.status = "completed"
     assembly.completed_at = datetime.now(timezone.utc)
+    record_assembly_event(db, assembly, "assembly.completed", quantities)
 
     db.commit()
     return get_assembly_with_components(db, assembly.id)
@@ -260,6 +595,9 @@ def ship_assembly(assembly_id: int, db: Session = Depends(get_db)):
 
     assembly.status = "shipped"
     assembly.shipped_at = datetime.now(timezone.utc)
+    record_assembly_event(
+        db, assembly, "assembly.shipped", component_quantities(db, assembly_id)
+    )
 
     db.commit()
     return get_assembly_with_components(db, assembly.id)
@@ -279,16 +617,22 @@ def cancel_assembly(assembly_id: int, db: Session = Depends(get_db)):
         )
 
     # Release reserved components
-    for ac in (
-        db.query(AssemblyComponent)
-        .filter(AssemblyComponent.assembly_id == assembly_id)
-        .all()
-    ):
-        item = db.query(Item).filter(Item.id == ac.item_id).first()
-        if item:
-            item.quantity_reserved -= ac.quantity
+    quantities = component_quantities(db, assembly_id)
+    if assembly.location_id is not None:
+        release_location_stock(db, assembly.location_id, quantities)
+    else:
+        for ac in (
+            db.query(AssemblyComponent)
+            .filter(AssemblyComponent.assembly_id == assembly_id)
+            .all()
+        ):
+            item = db.query(Item).filter(Item.id == ac.item_id).first()
+            if item:
+                item.quantity_reserved -= ac.quantity
 
     assembly.status = "cancelled"
+    assembly.cancelled_at = datetime.now(timezone.utc)
+    record_assembly_event(db, assembly, "assembly.cancelled", quantities)
 
     db.commit()
     return get_assembly_with_components(db, assembly.id)
@@ -312,4 +656,5 @@ def delete_assembly(assembly_id: int, db: Session = Depends(get_db)):
     ).delete()
 
     db.delete(assembly)
+    db.add(Tombstone(entity="assembly", entity_id=assembly_id))
     db.commit()
@@ -0,0 +1,107 @@
+import json
+import logging
+from contextlib import AsyncExitStack
+from urllib.parse import urlencode
+
+from fastapi import APIRouter, HTTPException, Request
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from starlette.types import Message
+
+from app.core.database import SessionLocal, shared_session
+from app.schemas.batch import BatchRequest, BatchSubRequest, BatchSubResponse
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/batch", tags=["batch"])
+
+MAX_SUBREQUESTS = 20
+
+
+def open_snapshot() -> Session:
+    db = SessionLocal()
+    if db.get_bind().dialect.name == "postgresql":
+        # Every sub-request sees the same committed state
+        db.connection(
+            execution_options={
+                "isolation_level": "REPEATABLE READ",
+                "postgresql_readonly": True,
+            }
+        )
+    return db
+
+
+def close_snapshot(db: Session) -> None:
+    db.rollback()
+    db.close()
+
+
+async def dispatch(request: Request, sub: BatchSubRequest) -> BatchSubResponse:
+    """Run one GET through the app's routes without another round trip."""
+    path, _, query = sub.path.partition("?")
+    if sub.params:
+        query = "&".join(filter(None, (query, urlencode(sub.params, doseq=True))))
+    scope = {
+        "type": "http",
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": request.url.scheme,
+        "server": request.scope.get("server"),
+        "client": request.scope.get("client"),
+        "root_path": "",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": query.encode(),
+        "headers": [(b"accept", b"application/json")],
+        "app": request.app,
+        "starlette.exception_handlers": request.scope.get(
+            "starlette.exception_handlers"
+        ),
+    }
+    status, body = 500, b""
+
+    async def receive() -> Message:
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message: Message) -> None:
+        nonlocal status, body
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        elif message["type"] == "http.response.body":
+            body += message.get("body", b"")
+
+    try:
+        async with AsyncExitStack() as stack:
+            scope["fastapi_middleware_astack"] = stack
+            await request.app.router(scope, receive, send)
+    except Exception:
+        logger.exception("Batched request for %s failed", sub.path)
+        return BatchSubResponse(id=sub.id, path=sub.path, status=500)
+
+    try:
+        decoded = json.loads(body) if body else None
+    except ValueError:
+        decoded = body.decode(errors="replace")
+    return BatchSubResponse(id=sub.id, path=sub.path, status=status, body=decoded)
+
+
+@router.post("/", response_model=list[BatchSubResponse])
+async def run_batch(batch_in: BatchRequest, request: Request):
+    """Run several reads on one session and snapshot, in order."""
+    if len(batch_in.requests) > MAX_SUBREQUESTS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {MAX_SUBREQUESTS} requests per batch",
+        )
+    for sub in batch_in.requests:
+        if not sub.path.startswith("/api/") or sub.path.startswith("/api/batch"):
+            raise HTTPException(
+                status_code=400, detail=f"Cannot batch request for {sub.path}"
+            )
+
+    db = await run_in_threadpool(open_snapshot)
+    try:
+        with shared_session(db):
+            return [await dispatch(request, sub) for sub in batch_in.requests]
+    finally:
+        await run_in_threadpool(close_snapshot, db)
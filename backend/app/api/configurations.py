@@ -1,8 +1,12 @@
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import delete, insert, update
 from sqlalchemy.orm import Session
 
+from app.api.fieldsets import parse_fields, parse_include, sparse_response
 from app.core.database import get_db
 from app.models import Configuration, ConfigurationComponent, Item
+from app.models.base import utcnow
+from app.services.capacity_index import mark_capacity_changes
 from app.schemas.configuration import (
     ConfigurationCreate,
     ConfigurationUpdate,
@@ -20,22 +24,21 @@ def get_config_with_components(db: Session, config_id: int) -> dict | None:
     if not config:
         return None
 
-    components = []
-    for cc in (
-        db.query(ConfigurationComponent)
-        .filter(ConfigurationComponent.configuration_id == config_id)
-        .all()
-    ):
-        item = db.query(Item).filter(Item.id == cc.item_id).first()
-        components.append(
-            ConfigurationComponentResponse(
-                id=cc.id,
-                item_id=cc.item_id,
-                quantity=cc.quantity,
-                item_name=item.name if item else None,
-                item_sku=item.sku if item else None,
-            )
+    components = [
+        ConfigurationComponentResponse(
+            id=cc.id,
+            item_id=cc.item_id,
+            quantity=cc.quantity,
+            item_name=item_name,
+            item_sku=item_sku,
+        )
+        for cc, item_name, item_sku in db.query(
+            ConfigurationComponent, Item.name, Item.sku
         )
+        .outerjoin(Item, Item.id == ConfigurationComponent.item_id)
+        .filter(ConfigurationComponent.configuration_id == config_id)
+        .order_by(ConfigurationComponent.id)
+    ]
 
     return {
         "id": config.id,
@@ -43,18 +46,70 @@ def get_config_with_components(db: Session, config_id: int) -> dict | None:
         "description": config.description,
         "archived": config.archived,
         "created_at": config.created_at,
+        "updated_at": config.updated_at,
         "components": components,
     }
 
 
+def get_components_for_configs(
+    db: Session, config_ids: list[int]
+) -> dict[int, list[ConfigurationComponentResponse]]:
+    """Component details for many configurations in a single query."""
+    components: dict[int, list[ConfigurationComponentResponse]] = {
+        config_id: [] for config_id in config_ids
+    }
+    if not components:
+        return components
+
+    rows = (
+        db.query(ConfigurationComponent, Item.name, Item.sku)
+        .outerjoin(Item, Item.id == ConfigurationComponent.item_id)
+        .filter(ConfigurationComponent.configuration_id.in_(components))
+        .order_by(ConfigurationComponent.id)
+    )
+    for cc, item_name, item_sku in rows:
+        components[cc.configuration_id].append(
+            ConfigurationComponentResponse(
+                id=cc.id,
+                item_id=cc.item_id,
+                quantity=cc.quantity,
+                item_name=item_name,
+                item_sku=item_sku,
+            )
+        )
+    return components
+
+
 @router.get("/", response_model=list[ConfigurationResponse])
-def list_configurations(archived: bool | None = None, db: Session = Depends(get_db)):
-    """Get all configurations, optionally filtered by archived status."""
-    query = db.query(Configuration)
+def list_configurations(
+    archived: bool | None = None,
+    fields: str | None = None,
+    include: str | None = None,
+    db: Session = Depends(get_db),
+):
+    """Get all configurations, optionally filtered by archived status.
+
+    ``fields=id,name`` selects columns and ``include=components`` embeds
+    components; without either the full configurations are returned.
+    """
+    columns = parse_fields(fields, ConfigurationResponse)
+    embed = parse_include(include, fields)
+    selected = columns or [
+        name for name in ConfigurationResponse.model_fields if name != "components"
+    ]
+
+    query = db.query(*(getattr(Configuration, name) for name in selected))
     if archived is not None:
         query = query.filter(Configuration.archived == archived)
-    configs = query.order_by(Configuration.name).all()
-    return [get_config_with_components(db, c.id) for c in configs]
+    rows = [dict(row._mapping) for row in query.order_by(Configuration.name)]
+
+    if "components" in embed:
+        components = get_components_for_configs(db, [row["id"] for row in rows])
+        for row in rows:
+            row["components"] = components[row["id"]]
+    if columns is None and "components" in embed:
+        return rows
+    return sparse_response(rows)
 
 
 @router.get("/{config_id}", response_model=ConfigurationResponse)
@@ -206,6 +261,81 @@ def add_component(
         )
         db.add(cc)
 
+    # Component changes count as changes to the configuration for delta sync
+    config.updated_at = utcnow()
+    db.commit()
+    return get_config_with_components(db, config_id)
+
+
+@router.put("/{config_id}/components", response_model=ConfigurationResponse)
+def replace_components(
+    config_id: int,
+    components: list[ConfigurationComponentInput],
+    db: Session = Depends(get_db),
+):
+    """Replace a configuration's whole component list in one transaction.
+
+    Only the difference against the stored rows is written, as one bulk
+    insert, update and delete each.
+    """
+    config = db.query(Configuration).filter(Configuration.id == config_id).first()
+    if not config:
+        raise HTTPException(status_code=404, detail="Configuration not found")
+
+    wanted: dict[int, int] = {}
+    for comp in components:
+        if comp.item_id in wanted:
+            raise HTTPException(
+                status_code=400, detail=f"Item {comp.item_id} listed more than once"
+            )
+        wanted[comp.item_id] = comp.quantity
+
+    found = {item_id for (item_id,) in db.query(Item.id).filter(Item.id.in_(wanted))}
+    missing = sorted(set(wanted) - found)
+    if missing:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Items not found: {', '.join(str(i) for i in missing)}",
+        )
+
+    updates: list[dict] = []
+    deletes: list[int] = []
+    kept: set[int] = set()
+    for row_id, item_id, quantity in (
+        db.query(
+            ConfigurationComponent.id,
+            ConfigurationComponent.item_id,
+            ConfigurationComponent.quantity,
+        )
+        .filter(ConfigurationComponent.configuration_id == config_id)
+        .order_by(ConfigurationComponent.id)
+    ):
+        # Also drops stray duplicate rows for the same item
+        if item_id not in wanted or item_id in kept:
+            deletes.append(row_id)
+            continue
+        kept.add(item_id)
+        if quantity != wanted[item_id]:
+            updates.append({"id": row_id, "quantity": wanted[item_id]})
+
+    inserts = [
+        {"configuration_id": config_id, "item_id": item_id, "quantity": quantity}
+        for item_id, quantity in wanted.items()
+        if item_id not in kept
+    ]
+
+    if deletes:
+        db.execute(
+            delete(ConfigurationComponent).where(ConfigurationComponent.id.in_(deletes))
+        )
+    if updates:
+        db.execute(update(ConfigurationComponent), updates)
+    if inserts:
+        db.execute(insert(ConfigurationComponent), inserts)
+
+    config.updated_at = utcnow()
+    # The bulk statements bypass the flush hooks
+    mark_capacity_changes(db, config_ids={config_id})
     db.commit()
     return get_config_with_components(db, config_id)
 
@@ -231,5 +361,6 @@ def remove_component(config_id: int, component_id: int, db: Session = Depends(ge
         raise HTTPException(status_code=404, detail="Component not found")
 
     db.delete(cc)
+    config.updated_at = utcnow()
     db.commit()
     return get_config_with_components(db, config_id)
@@ -0,0 +1,48 @@
+"""``fields=`` and ``include=`` query parameters for list endpoints.
+
+``fields`` is a comma-separated list of columns to return; ``include`` names
+embedded relations (only ``components`` today). Without either parameter a
+list endpoint returns its full response with components, as it always has.
+"""
+
+from fastapi import HTTPException
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+EMBEDDABLE = ("components",)
+
+
+def parse_fields(fields: str | None, model: type[BaseModel]) -> list[str] | None:
+    """Validated column names from ``fields``; ``None`` means all columns.
+
+    ``id`` is always returned so rows stay addressable.
+    """
+    if fields is None:
+        return None
+    allowed = [name for name in model.model_fields if name not in EMBEDDABLE]
+    requested = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = sorted(requested - set(allowed))
+    if unknown:
+        raise HTTPException(
+            status_code=400, detail=f"Unknown fields: {', '.join(unknown)}"
+        )
+    return [name for name in allowed if name in requested or name == "id"]
+
+
+def parse_include(include: str | None, fields: str | None) -> set[str]:
+    """Relations to embed; all of them when neither parameter is given."""
+    if include is None:
+        return set(EMBEDDABLE) if fields is None else set()
+    requested = {name.strip() for name in include.split(",") if name.strip()}
+    unknown = sorted(requested - set(EMBEDDABLE))
+    if unknown:
+        raise HTTPException(
+            status_code=400, detail=f"Unknown include: {', '.join(unknown)}"
+        )
+    return requested
+
+
+def sparse_response(rows: list[dict]) -> JSONResponse:
+    """Serialize rows as-is, bypassing the full response model."""
+    return JSONResponse(jsonable_encoder(rows))
@@ -1,9 +1,25 @@
-from fastapi import APIRouter, Depends, HTTPException
+from datetime import timedelta
+
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 
 from app.core.database import get_db
-from app.models import Item
-from app.schemas.item import ItemCreate, ItemResponse, ItemUpdate
+from app.models import CostLayer, InventoryTransaction, Item, ItemStock, Tombstone
+from app.models.base import utcnow
+from app.schemas.item import (
+    ItemCreate,
+    ItemResponse,
+    ItemSearchResult,
+    ItemUpdate,
+    ItemWhereUsed,
+    ReceiveLineResult,
+    ReceiveRequest,
+    StockHistory,
+)
+from app.services import receiving
+from app.services.capacity_index import capacity_index
+from app.services.item_search import search_items
+from app.services.stock_history import downsample, stock_history, window
 
 router = APIRouter(prefix="/items", tags=["items"])
 
@@ -14,6 +30,23 @@ def list_items(db: Session = Depends(get_db)):
     return db.query(Item).all()
 
 
+@router.get("/search", response_model=list[ItemSearchResult])
+def search(
+    q: str = Query(min_length=1, max_length=100),
+    limit: int = Query(20, ge=1, le=100),
+    type: str | None = None,
+    db: Session = Depends(get_db),
+):
+    """Ranked prefix and typo-tolerant search on name, SKU and barcode."""
+    # Over-fetch when filtering by type so the filter doesn't starve the page
+    ids = search_items(db, q, limit * 5 if type else limit)
+    items = {item.id: item for item in db.query(Item).filter(Item.id.in_(ids))}
+    ranked = [items[i] for i in ids if i in items]
+    if type:
+        ranked = [item for item in ranked if item.type == type]
+    return ranked[:limit]
+
+
 @router.get("/{item_id}", response_model=ItemResponse)
 def get_item(item_id: int, db: Session = Depends(get_db)):
     """Get a single item by ID."""
@@ -23,6 +56,50 @@ def get_item(item_id: int, db: Session = Depends(get_db)):
     return item
 
 
+@router.get("/{item_id}/where-used", response_model=list[ItemWhereUsed])
+def get_where_used(item_id: int, db: Session = Depends(get_db)):
+    """Get the configurations that use an item and how many of each can be built."""
+    capacity_index.ensure_fresh(db)
+    used = capacity_index.where_used(item_id)
+    if used is None:
+        raise HTTPException(status_code=404, detail="Item not found")
+    return used
+
+
+@router.get("/{item_id}/stock-history", response_model=StockHistory)
+def get_stock_history(
+    item_id: int,
+    days: int = Query(365, ge=1, le=3650),
+    points: int = Query(300, ge=3, le=5000),
+    method: str = Query("lttb", pattern="^(lttb|minmax)$"),
+    db: Session = Depends(get_db),
+):
+    """Get an item's central stock levels over time, downsampled to ``points``."""
+    series = stock_history.get(db, item_id)
+    if series is None:
+        raise HTTPException(status_code=404, detail="Item not found")
+
+    end = utcnow()
+    start = end - timedelta(days=days)
+    recent = window(series, start, end)
+    sampled = downsample(recent, points, method)
+    return {
+        "item_id": item_id,
+        "start": start,
+        "end": end,
+        "method": method,
+        "events": len(recent),
+        "points": [
+            {"at": at, "quantity_on_hand": on_hand, "quantity_reserved": reserved}
+            for at, on_hand, reserved in zip(
+                sampled.times.tolist(),
+                sampled.on_hand.tolist(),
+                sampled.reserved.tolist(),
+            )
+        ],
+    }
+
+
 @router.post("/", response_model=ItemResponse, status_code=201)
 def create_item(item_in: ItemCreate, db: Session = Depends(get_db)):
     """Create a new item."""
@@ -38,6 +115,25 @@ def create_item(item_in: ItemCreate, db: Session = Depends(get_db)):
     return item
 
 
+@router.post("/receive", response_model=list[ReceiveLineResult])
+def receive_items(receive_in: ReceiveRequest, db: Session = Depends(get_db)):
+    """Receive purchase orders and adjust stock for many items at once."""
+    for line in receive_in.lines:
+        if line.item_id is None and not line.sku:
+            raise HTTPException(
+                status_code=400, detail="Each line needs item_id or sku"
+            )
+        if line.received < 0:
+            raise HTTPException(status_code=400, detail="Received cannot be negative")
+        if line.unit_cost is not None and line.unit_cost < 0:
+            raise HTTPException(status_code=400, detail="Unit cost cannot be negative")
+
+    lines = [receiving.ReceiveLine(**line.model_dump()) for line in receive_in.lines]
+    return receiving.receive_stock(
+        db, lines, reference_id=receive_in.reference_id, notes=receive_in.notes
+    )
+
+
 @router.patch("/{item_id}", response_model=ItemResponse)
 def update_item(item_id: int, item_in: ItemUpdate, db: Session = Depends(get_db)):
     """Update an item. Only sent fields are updated."""
@@ -60,6 +156,25 @@ def delete_item(item_id: int, db: Session = Depends(get_db)):
     item = db.query(Item).filter(Item.id == item_id).first()
     if not item:
         raise HTTPException(status_code=404, detail="Item not found")
+    if db.query(ItemStock).filter(ItemStock.item_id == item_id).first():
+        raise HTTPException(
+            status_code=400, detail="Cannot delete item stocked at a location"
+        )
+
+    # Its history and cost layers are the audit trail and the stock value
+    if (
+        db.query(InventoryTransaction)
+        .filter(InventoryTransaction.item_id == item_id)
+        .first()
+    ):
+        raise HTTPException(
+            status_code=400, detail="Cannot delete item with transaction history"
+        )
+    if db.query(CostLayer).filter(CostLayer.item_id == item_id).first():
+        raise HTTPException(
+            status_code=400, detail="Cannot delete item with cost layers"
+        )
 
     db.delete(item)
+    db.add(Tombstone(entity="item", entity_id=item_id))
     db.commit()
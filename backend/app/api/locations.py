@@ -0,0 +1,98 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+
+from app.core.database import get_db
+from app.models import Item, ItemStock, Location
+from app.schemas.location import (
+    ItemStockResponse,
+    ItemStockUpdate,
+    LocationBuildCapacity,
+    LocationCreate,
+    LocationResponse,
+)
+from app.services.locations import build_capacity
+
+router = APIRouter(prefix="/locations", tags=["locations"])
+
+
+def stock_response(stock: ItemStock, item: Item | None) -> ItemStockResponse:
+    return ItemStockResponse(
+        location_id=stock.location_id,
+        item_id=stock.item_id,
+        item_name=item.name if item else None,
+        item_sku=item.sku if item else None,
+        quantity_on_hand=stock.quantity_on_hand,
+        quantity_reserved=stock.quantity_reserved,
+        quantity_available=stock.quantity_available,
+    )
+
+
+@router.get("/", response_model=list[LocationResponse])
+def list_locations(db: Session = Depends(get_db)):
+    """Get all locations."""
+    return db.query(Location).order_by(Location.code).all()
+
+
+@router.post("/", response_model=LocationResponse, status_code=201)
+def create_location(location_in: LocationCreate, db: Session = Depends(get_db)):
+    """Create a new location."""
+    existing = db.query(Location).filter(Location.code == location_in.code).first()
+    if existing:
+        raise HTTPException(status_code=400, detail="Location code already exists")
+
+    location = Location(**location_in.model_dump())
+    db.add(location)
+    db.commit()
+    db.refresh(location)
+    return location
+
+
+@router.get("/build-capacity", response_model=list[LocationBuildCapacity])
+def get_location_build_capacity(db: Session = Depends(get_db)):
+    """Calculate builds possible per location and network-wide."""
+    return build_capacity(db)
+
+
+@router.get("/{location_id}/stock", response_model=list[ItemStockResponse])
+def list_location_stock(location_id: int, db: Session = Depends(get_db)):
+    """Get the stock held at a location."""
+    if not db.get(Location, location_id):
+        raise HTTPException(status_code=404, detail="Location not found")
+
+    rows = (
+        db.query(ItemStock, Item)
+        .outerjoin(Item, Item.id == ItemStock.item_id)
+        .filter(ItemStock.location_id == location_id)
+        .order_by(Item.name)
+    )
+    return [stock_response(stock, item) for stock, item in rows]
+
+
+@router.put("/{location_id}/stock/{item_id}", response_model=ItemStockResponse)
+def set_location_stock(
+    location_id: int,
+    item_id: int,
+    stock_in: ItemStockUpdate,
+    db: Session = Depends(get_db),
+):
+    """Set the units of an item on hand at a location."""
+    if not db.get(Location, location_id):
+        raise HTTPException(status_code=404, detail="Location not found")
+    item = db.get(Item, item_id)
+    if not item:
+        raise HTTPException(status_code=404, detail="Item not found")
+
+    stock = db.get(ItemStock, (location_id, item_id), with_for_update=True)
+    if stock is None:
+        stock = ItemStock(location_id=location_id, item_id=item_id, quantity_reserved=0)
+        db.add(stock)
+    if stock_in.quantity_on_hand < stock.quantity_reserved:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Cannot set on hand below the {stock.quantity_reserved} reserved",
+        )
+    stock.quantity_on_hand = stock_in.quantity_on_hand
+
+    db.commit()
+    db.refresh(stock)
+    return stock_response(stock, item)
@@ -0,0 +1,62 @@
+from datetime import timedelta
+
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal, get_db
+from app.models import ReportJob
+from app.models.base import utcnow
+from app.schemas.report import ReportJobCreate, ReportJobResponse
+from app.services.reports import REPORTS, ReportRunner
+
+router = APIRouter(prefix="/reports", tags=["reports"])
+
+report_runner = ReportRunner(
+    SessionLocal,
+    settings.database_url,
+    workers=settings.report_workers,
+    ttl=timedelta(seconds=settings.report_ttl_s),
+)
+
+
+def get_live_job(db: Session, job_id: str) -> ReportJob:
+    job = db.get(ReportJob, job_id)
+    if not job or (job.expires_at and job.expires_at < utcnow()):
+        raise HTTPException(status_code=404, detail="Report job not found")
+    return job
+
+
+@router.post("/", response_model=ReportJobResponse, status_code=202)
+def submit_report(job_in: ReportJobCreate, db: Session = Depends(get_db)):
+    """Start a report job, reusing an identical pending or cached one."""
+    if job_in.kind not in REPORTS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown report '{job_in.kind}'. "
+            f"Available: {', '.join(sorted(REPORTS))}",
+        )
+    return report_runner.submit(db, job_in.kind, job_in.params)
+
+
+@router.get("/{job_id}", response_model=ReportJobResponse)
+def get_report(job_id: str, db: Session = Depends(get_db)):
+    """Get a report job's status."""
+    return get_live_job(db, job_id)
+
+
+@router.get("/{job_id}/result")
+def get_report_result(job_id: str, request: Request, db: Session = Depends(get_db)):
+    """Get a finished report's result, with its content hash as ETag."""
+    job = get_live_job(db, job_id)
+    if job.status == "failed":
+        raise HTTPException(status_code=409, detail=f"Report failed: {job.error}")
+    if job.status != "done" or job.result is None:
+        raise HTTPException(status_code=409, detail="Report is not finished yet")
+
+    etag = f'"{job.content_hash}"'
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    return Response(
+        content=job.result, media_type="application/json", headers={"ETag": etag}
+    )
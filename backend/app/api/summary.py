@@ -0,0 +1,25 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+
+from app.core.database import get_db
+from app.schemas.summary import InventorySummaryResponse, ItemTypeSummary
+from app.services.summary import read_summary
+
+router = APIRouter(prefix="/summary", tags=["summary"])
+
+
+@router.get("/", response_model=InventorySummaryResponse)
+def get_summary(db: Session = Depends(get_db)):
+    """Get dashboard totals without scanning items or assemblies."""
+    result = InventorySummaryResponse()
+    for (metric, dimension), value in read_summary(db).items():
+        if metric in ("assemblies", "configurations"):
+            getattr(result, metric)[dimension] = value
+            continue
+        item_type = result.items.setdefault(dimension, ItemTypeSummary())
+        field = "count" if metric == "items" else metric
+        setattr(item_type, field, value)
+
+    for item_type in result.items.values():
+        item_type.available = item_type.on_hand - item_type.reserved
+    return result
@@ -0,0 +1,92 @@
+from datetime import timedelta
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+
+from app.api.assemblies import get_components_for_assemblies
+from app.api.configurations import get_components_for_configs
+from app.core.config import settings
+from app.core.database import get_db
+from app.models import Assembly, Configuration, Item
+from app.schemas.assembly import AssemblyResponse
+from app.schemas.configuration import ConfigurationResponse
+from app.schemas.sync import AssemblyChanges, ConfigurationChanges, ItemChanges
+from app.services.sync import ChangePage, InvalidCursor, changes_since
+
+router = APIRouter(prefix="/sync", tags=["sync"])
+
+
+def load_changes(
+    db: Session, model, entity: str, updated_since: str | None, limit: int
+) -> ChangePage:
+    try:
+        return changes_since(
+            db,
+            model,
+            entity,
+            updated_since,
+            limit,
+            lag=timedelta(seconds=settings.sync_safety_lag_s),
+        )
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/items", response_model=ItemChanges)
+def sync_items(
+    updated_since: str | None = None,
+    limit: int = Query(500, ge=1, le=5000),
+    db: Session = Depends(get_db),
+):
+    """Get items changed or deleted since a cursor."""
+    page = load_changes(db, Item, "item", updated_since, limit)
+    return ItemChanges(
+        items=page.rows,
+        deleted=page.deleted,
+        cursor=page.cursor,
+        has_more=page.has_more,
+    )
+
+
+@router.get("/configurations", response_model=ConfigurationChanges)
+def sync_configurations(
+    updated_since: str | None = None,
+    limit: int = Query(500, ge=1, le=5000),
+    db: Session = Depends(get_db),
+):
+    """Get configurations changed or deleted since a cursor."""
+    page = load_changes(db, Configuration, "configuration", updated_since, limit)
+    components = get_components_for_configs(db, [c.id for c in page.rows])
+    return ConfigurationChanges(
+        configurations=[
+            ConfigurationResponse.model_validate(c).model_copy(
+                update={"components": components[c.id]}
+            )
+            for c in page.rows
+        ],
+        deleted=page.deleted,
+        cursor=page.cursor,
+        has_more=page.has_more,
+    )
+
+
+@router.get("/assemblies", response_model=AssemblyChanges)
+def sync_assemblies(
+    updated_since: str | None = None,
+    limit: int = Query(500, ge=1, le=5000),
+    db: Session = Depends(get_db),
+):
+    """Get assemblies changed or deleted since a cursor."""
+    page = load_changes(db, Assembly, "assembly", updated_since, limit)
+    components = get_components_for_assemblies(db, [a.id for a in page.rows])
+    return AssemblyChanges(
+        assemblies=[
+            AssemblyResponse.model_validate(a).model_copy(
+                update={"components": components[a.id]}
+            )
+            for a in page.rows
+        ],
+        deleted=page.deleted,
+        cursor=page.cursor,
+        has_more=page.has_more,
+    )
@@ -0,0 +1,131 @@
+"""Maintenance commands.
+
+python -m app.cli archive-assemblies --older-than-days 90
+python -m app.cli reconcile-summary [--fix]
+python -m app.cli fold-summary
+python -m app.cli rebuild-cost-layers
+python -m app.cli deliver-outbox
+"""
+
+import argparse
+import sys
+from datetime import timedelta
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.services.archive import archive_assemblies
+from app.services.outbox import OutboxWorker
+from app.services.summary import fold_summary_deltas, reconcile_summary
+from app.services.valuation import rebuild_cost_layers
+
+
+def archive_command(args: argparse.Namespace) -> int:
+    with SessionLocal() as db:
+        moved = archive_assemblies(
+            db, timedelta(days=args.older_than_days), args.batch_size
+        )
+    print(f"Archived {moved} assemblies")
+    return 0
+
+
+def reconcile_command(args: argparse.Namespace) -> int:
+    with SessionLocal() as db:
+        mismatches = reconcile_summary(db, fix=args.fix)
+    if not mismatches:
+        print("Inventory summary matches the base tables")
+        return 0
+
+    for (metric, dimension), (stored, actual) in sorted(mismatches.items()):
+        print(f"{metric}[{dimension}]: summary {stored}, actual {actual}")
+    if args.fix:
+        print(f"Corrected {len(mismatches)} summary rows")
+        return 0
+    return 1
+
+
+def fold_summary_command(args: argparse.Namespace) -> int:
+    total = 0
+    with SessionLocal() as db:
+        while folded := fold_summary_deltas(db, args.batch_size):
+            total += folded
+    print(f"Folded {total} summary deltas")
+    return 0
+
+
+def rebuild_cost_layers_command(args: argparse.Namespace) -> int:
+    with SessionLocal() as db:
+        layers = rebuild_cost_layers(db, args.batch_size)
+    print(f"Rebuilt cost layers: {layers} open")
+    return 0
+
+
+def deliver_outbox_command(args: argparse.Namespace) -> int:
+    if not settings.outbox_url:
+        print("OUTBOX_URL is not set")
+        return 1
+    worker = OutboxWorker(
+        SessionLocal,
+        settings.outbox_url,
+        batch_size=settings.outbox_batch_size,
+        interval=settings.outbox_interval_s,
+        backoff_base=settings.outbox_backoff_base_s,
+        backoff_max=settings.outbox_backoff_max_s,
+        timeout=settings.outbox_timeout_s,
+        max_attempts=settings.outbox_max_attempts,
+    )
+    try:
+        worker.run()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.cli")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    archive = commands.add_parser(
+        "archive-assemblies",
+        help="move long-shipped and cancelled assemblies to the archive tables",
+    )
+    archive.add_argument(
+        "--older-than-days", type=int, default=settings.archive_after_days
+    )
+    archive.add_argument("--batch-size", type=int, default=settings.archive_batch_size)
+    archive.set_defaults(handler=archive_command)
+
+    reconcile = commands.add_parser(
+        "reconcile-summary",
+        help="verify the inventory summary against the base tables",
+    )
+    reconcile.add_argument(
+        "--fix", action="store_true", help="correct any mismatched totals"
+    )
+    reconcile.set_defaults(handler=reconcile_command)
+
+    fold = commands.add_parser(
+        "fold-summary",
+        help="fold pending inventory summary deltas into the summary",
+    )
+    fold.add_argument("--batch-size", type=int, default=10000)
+    fold.set_defaults(handler=fold_summary_command)
+
+    rebuild = commands.add_parser(
+        "rebuild-cost-layers",
+        help="recompute FIFO cost layers from receipt and consumption history",
+    )
+    rebuild.add_argument("--batch-size", type=int, default=1000)
+    rebuild.set_defaults(handler=rebuild_cost_layers_command)
+
+    outbox = commands.add_parser(
+        "deliver-outbox",
+        help="run the worker that delivers outbox events to OUTBOX_URL",
+    )
+    outbox.set_defaults(handler=deliver_outbox_command)
+
+    args = parser.parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,226 @@
+"""Admission control in front of the request handlers.
+
+Every API request belongs to a route group: ``write`` (mutations), ``read``
+(ordinary GETs) or ``export`` (bulk reads, sync pages, analytics and
+reports). Each group has its own concurrency limit and all of them share a
+total sized to the connection pool, so requests wait here, in a bounded
+queue, instead of piling up in the threadpool waiting for a connection.
+The total leaves headroom for the background threads that take their own
+connections (reservation queue, capacity index, summary folder, report
+workers, metrics scrapes), and writes are capped below it so a burst of
+them can't hold every slot.
+When a slot frees, queued writes go first, then reads, then exports. A full
+queue or a wait past the queue timeout is answered at once with 503 and
+``Retry-After``. ``/health`` and ``/metrics`` are never queued.
+"""
+
+import asyncio
+import threading
+import time
+from collections import deque
+
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.metrics import REGISTRY, Counter, Gauge, Histogram
+
+# Highest priority first
+GROUPS = ("write", "read", "export")
+EXPORT_PATHS = (
+    "/api/reports",
+    "/api/sync/",
+    "/api/analytics/",
+    "/api/assemblies/history",
+)
+# POSTs that only read
+READ_PATHS = ("/api/batch",)
+
+ADMISSION_ACTIVE = Gauge(
+    "admission_active_requests", "Requests admitted and running.", ("group",)
+)
+ADMISSION_QUEUED = Gauge(
+    "admission_queued_requests", "Requests waiting for admission.", ("group",)
+)
+ADMISSION_LIMIT = Gauge(
+    "admission_limit", "Concurrent requests allowed per route group.", ("group",)
+)
+ADMISSION_REJECTED = Counter(
+    "admission_rejected_total",
+    "Requests rejected with 503 by admission control.",
+    ("group", "reason"),
+)
+ADMISSION_WAIT = Histogram(
+    "admission_wait_seconds", "Time queued before admission.", ("group",)
+)
+
+
+def route_group(method: str, path: str) -> str | None:
+    """The admission group of a request, or ``None`` if it is not limited."""
+    if not path.startswith("/api/") or method == "OPTIONS":
+        return None
+    if path.startswith(EXPORT_PATHS):
+        return "export"
+    if method in ("GET", "HEAD") or path.startswith(READ_PATHS):
+        return "read"
+    return "write"
+
+
+def _grant(future: asyncio.Future) -> None:
+    if not future.done():
+        future.set_result(True)
+
+
+class AdmissionController:
+    """Per-group concurrency limits with bounded, prioritized wait queues.
+
+    Thread-safe: waiters may belong to different event loops and are woken
+    on their own loop.
+    """
+
+    def __init__(
+        self,
+        limits: dict[str, int],
+        total: int,
+        queue_size: int,
+        queue_timeout: float,
+    ) -> None:
+        self.limits = {group: limits[group] for group in GROUPS}
+        self.total = total
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self._lock = threading.Lock()
+        self._active = {group: 0 for group in GROUPS}
+        self._queues: dict[str, deque] = {group: deque() for group in GROUPS}
+
+    def _has_slot(self, group: str) -> bool:
+        return (
+            self._active[group] < self.limits[group]
+            and sum(self._active.values()) < self.total
+        )
+
+    def _queued_ahead(self, group: str) -> bool:
+        for other in GROUPS:
+            if self._queues[other]:
+                return True
+            if other == group:
+                return False
+        return False
+
+    async def acquire(self, group: str) -> bool:
+        """Wait for a slot; ``False`` if the request should be rejected."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if not self._queued_ahead(group) and self._has_slot(group):
+                self._active[group] += 1
+                return True
+            if len(self._queues[group]) >= self.queue_size:
+                ADMISSION_REJECTED.inc(group=group, reason="queue_full")
+                return False
+            waiter = (loop, loop.create_future())
+            self._queues[group].append(waiter)
+
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter[1]), self.queue_timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as exc:
+            with self._lock:
+                granted = waiter not in self._queues[group]
+                if not granted:
+                    self._queues[group].remove(waiter)
+            if isinstance(exc, asyncio.CancelledError):
+                if granted:
+                    self.release(group)
+                raise
+            if not granted:
+                ADMISSION_REJECTED.inc(group=group, reason="timeout")
+                return False
+        ADMISSION_WAIT.observe(time.perf_counter() - start, group=group)
+        return True
+
+    def release(self, group: str) -> None:
+        with self._lock:
+            self._active[group] -= 1
+            for candidate in GROUPS:
+                queue = self._queues[candidate]
+                while queue and self._has_slot(candidate):
+                    loop, future = queue.popleft()
+                    self._active[candidate] += 1
+                    loop.call_soon_threadsafe(_grant, future)
+
+    def collect(self) -> None:
+        with self._lock:
+            for group in GROUPS:
+                ADMISSION_ACTIVE.set(self._active[group], group=group)
+                ADMISSION_QUEUED.set(len(self._queues[group]), group=group)
+                ADMISSION_LIMIT.set(self.limits[group], group=group)
+
+
+def pool_limits(
+    pool_size: int,
+    max_overflow: int,
+    headroom: int,
+    total: int | None = None,
+    write: int | None = None,
+) -> tuple[int, int]:
+    """The total and write limits for a pool, filling in the unset ones."""
+    if total is None:
+        total = max(pool_size + max_overflow - headroom, 1)
+    if write is None:
+        write = total - 2
+    return total, min(max(write, 1), total)
+
+
+_total_limit, _write_limit = pool_limits(
+    settings.db_pool_size,
+    settings.db_max_overflow,
+    settings.admission_pool_headroom,
+    settings.admission_total_limit,
+    settings.admission_write_limit,
+)
+admission_controller = AdmissionController(
+    limits={
+        "write": _write_limit,
+        "read": settings.admission_read_limit,
+        "export": settings.admission_export_limit,
+    },
+    total=_total_limit,
+    queue_size=settings.admission_queue_size,
+    queue_timeout=settings.admission_queue_timeout_s,
+)
+REGISTRY.add_collector(admission_controller.collect)
+
+
+class AdmissionMiddleware:
+    """Admit API requests through an :class:`AdmissionController`."""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        controller: AdmissionController = admission_controller,
+        retry_after: int | None = None,
+    ) -> None:
+        self.app = app
+        self.controller = controller
+        self.retry_after = retry_after or settings.admission_retry_after_s
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        group = None
+        if scope["type"] == "http":
+            group = route_group(scope["method"], scope["path"])
+        if group is None:
+            await self.app(scope, receive, send)
+            return
+
+        if not await self.controller.acquire(group):
+            response = JSONResponse(
+                {"detail": "Server busy, retry later"},
+                status_code=503,
+                headers={"Retry-After": str(self.retry_after)},
+            )
+            await response(scope, receive, send)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.controller.release(group)
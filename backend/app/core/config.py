@@ -5,6 +5,73 @@ class Settings(BaseSettings):
     database_url: str = "postgresql://postgres:postgres@db:5432/invsys"
     environment: str = "development"
 
+    # Query instrumentation
+    slow_query_ms: float = 100.0
+    n_plus_one_threshold: int = 5
+
+    # Archival of shipped/cancelled assemblies
+    archive_after_days: int = 90
+    archive_batch_size: int = 500
+
+    # Background folding of inventory summary deltas; 0 leaves it to the CLI.
+    # A read finding more deltas than the backlog limit folds them itself.
+    summary_fold_interval_s: float = 1.0
+    summary_max_backlog: int = 10000
+
+    # Queued (group-commit) assembly intake
+    assembly_intake_queue: bool = False
+    intake_batch_window_ms: float = 5.0
+    intake_max_batch: int = 100
+    intake_timeout_s: float = 30.0
+
+    # Delta sync only serves changes this old, so slow commits aren't skipped
+    sync_safety_lag_s: float = 5.0
+
+    # Full rebuild interval of the in-memory build capacity index
+    capacity_index_max_age_s: float = 300.0
+    # How long a read waits for changes committed before it to be indexed
+    capacity_refresh_wait_s: float = 1.0
+
+    # Reconstructed stock level history, cached per item
+    stock_history_max_age_s: float = 60.0
+    stock_history_cache_items: int = 1024
+
+    # Background report jobs
+    report_workers: int = 2
+    report_ttl_s: int = 3600
+
+    # Connection pool of each process
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+
+    # Admission control: concurrent API requests per route group. Unset, the
+    # total is the pool less the headroom kept for background threads and
+    # writes get two slots less than the total, so reads are never locked out.
+    admission_control: bool = True
+    admission_total_limit: int | None = None
+    admission_pool_headroom: int = 6
+    admission_write_limit: int | None = None
+    admission_read_limit: int = 10
+    admission_export_limit: int = 2
+    admission_queue_size: int = 100
+    admission_queue_timeout_s: float = 5.0
+    admission_retry_after_s: int = 1
+
+    # Outbox delivery of integration events; no URL means events only queue
+    outbox_url: str | None = None
+    outbox_batch_size: int = 100
+    outbox_interval_s: float = 1.0
+    outbox_backoff_base_s: float = 1.0
+    outbox_backoff_max_s: float = 300.0
+    outbox_timeout_s: float = 10.0
+    outbox_max_attempts: int = 10
+
+    # Request profiling: on demand with the token, or a random fraction
+    profile_token: str | None = None
+    profile_sample_rate: float = 0.0
+    profile_dir: str = "profiles"
+    profile_keep: int = 200
+
     model_config = SettingsConfigDict(env_file=".env")
 
 
@@ -1,13 +1,61 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from sqlalchemy import create_engine, exc
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import QueuePool
 
 from app.core.config import settings
+from app.core.metrics import DB_POOL_TIMEOUTS, DB_POOL_WAIT
+from app.services.summary import track_summary
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waits for a connection."""
 
-engine = create_engine(settings.database_url)
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            DB_POOL_TIMEOUTS.inc()
+            raise
+        finally:
+            DB_POOL_WAIT.observe(time.perf_counter() - start)
+
+
+engine = create_engine(
+    settings.database_url,
+    poolclass=InstrumentedQueuePool,
+    pool_size=settings.db_pool_size,
+    max_overflow=settings.db_max_overflow,
+)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+track_summary(SessionLocal)
+
+
+# Set while a batch request runs its sub-requests on one session
+_shared_session: ContextVar[Session | None] = ContextVar("shared_session", default=None)
+
+
+@contextmanager
+def shared_session(db: Session) -> Iterator[None]:
+    """Make ``get_db`` hand out ``db`` instead of opening new sessions."""
+    token = _shared_session.set(db)
+    try:
+        yield
+    finally:
+        _shared_session.reset(token)
 
 
 def get_db():
+    shared = _shared_session.get()
+    if shared is not None:
+        yield shared
+        return
+
     db = SessionLocal()
     try:
         yield db
@@ -0,0 +1,271 @@
+"""Prometheus text-format metrics.
+
+A small in-process registry: request latency histograms and in-flight gauges
+from the middleware, plus connection pool stats and business gauges refreshed
+at scrape time. Business gauges come from the incrementally maintained
+inventory summary, so nothing here scans the base tables on a scrape.
+"""
+
+import threading
+import time
+from collections.abc import Callable, Iterable
+
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import Pool
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.services.summary import read_summary
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", r"\\").replace('"', r"\"").replace("\n", r"\n")
+
+
+def _format_labels(names: tuple[str, ...], values: tuple[str, ...]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+class _Metric:
+    type = ""
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        registry: "Registry | None" = None,
+    ) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        (registry or REGISTRY).register(self)
+
+    def _key(self, labels: dict[str, str]) -> tuple[str, ...]:
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def samples(self) -> list[str]:
+        raise NotImplementedError
+
+    def render(self) -> list[str]:
+        return [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type}",
+            *self.samples(),
+        ]
+
+
+class Counter(_Metric):
+    type = "counter"
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self) -> list[str]:
+        with self._lock:
+            values = list(self._values.items())
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {value:g}"
+            for key, value in values
+        ]
+
+
+class Gauge(Counter):
+    type = "gauge"
+
+    def dec(self, amount: float = 1, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels: str) -> None:
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+
+class Histogram(_Metric):
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+        registry: "Registry | None" = None,
+    ) -> None:
+        super().__init__(name, documentation, labelnames, registry)
+        self.buckets = buckets
+        # Per label set: [bucket counts..., +Inf count], sum
+        self._values: dict[tuple[str, ...], tuple[list[int], list[float]]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            counts, total = self._values.setdefault(
+                key, ([0] * (len(self.buckets) + 1), [0.0])
+            )
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+            counts[-1] += 1
+            total[0] += value
+
+    def samples(self) -> list[str]:
+        lines = []
+        names = (*self.labelnames, "le")
+        with self._lock:
+            values = [(k, list(c), t[0]) for k, (c, t) in self._values.items()]
+        for key, counts, total in values:
+            for bound, count in zip((*self.buckets, "+Inf"), counts):
+                le = bound if isinstance(bound, str) else f"{bound:g}"
+                labels = _format_labels(names, (*key, le))
+                lines.append(f"{self.name}_bucket{labels} {count}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {total:g}")
+            lines.append(f"{self.name}_count{labels} {counts[-1]}")
+        return lines
+
+
+class Registry:
+    def __init__(self) -> None:
+        self._metrics: list[_Metric] = []
+        self._collectors: list[Callable[[], None]] = []
+
+    def register(self, metric: _Metric) -> None:
+        self._metrics.append(metric)
+
+    def add_collector(self, collector: Callable[[], None]) -> None:
+        """Register a cheap callback that refreshes gauges before each scrape."""
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        for collector in self._collectors:
+            collector()
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+HTTP_REQUESTS = Counter(
+    "http_requests_total", "HTTP requests handled.", ("method", "route", "status")
+)
+HTTP_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route.",
+    ("method", "route"),
+)
+HTTP_IN_FLIGHT = Gauge("http_requests_in_flight", "HTTP requests being handled.")
+
+DB_POOL_SIZE = Gauge("db_pool_size", "Configured connection pool size.")
+DB_POOL_CHECKED_OUT = Gauge(
+    "db_pool_checked_out", "Connections currently checked out of the pool."
+)
+DB_POOL_OVERFLOW = Gauge(
+    "db_pool_overflow", "Connections open beyond the pool size (negative if idle)."
+)
+DB_POOL_WAIT = Histogram(
+    "db_pool_wait_seconds", "Time spent obtaining a connection from the pool."
+)
+DB_POOL_TIMEOUTS = Counter(
+    "db_pool_timeouts_total", "Checkouts that timed out waiting for a connection."
+)
+
+INVENTORY_ON_HAND = Gauge(
+    "inventory_on_hand_units", "Units on hand by item type.", ("type",)
+)
+INVENTORY_RESERVED = Gauge(
+    "inventory_reserved_units", "Units reserved for assemblies by item type.", ("type",)
+)
+ASSEMBLIES = Gauge("assemblies", "Assemblies by status.", ("status",))
+
+
+def render_metrics() -> str:
+    return REGISTRY.render()
+
+
+class MetricsMiddleware:
+    """Record latency, status and in-flight count for every HTTP request."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = "500"
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = str(message["status"])
+            await send(message)
+
+        HTTP_IN_FLIGHT.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            HTTP_IN_FLIGHT.dec()
+            # Label by route template, not raw path, to keep cardinality bounded
+            route = getattr(scope.get("route"), "path", "unmatched")
+            method = scope["method"]
+            HTTP_DURATION.observe(
+                time.perf_counter() - start, method=method, route=route
+            )
+            HTTP_REQUESTS.inc(method=method, route=route, status=status)
+
+
+def track_pool(pool: Pool) -> None:
+    """Report pool occupancy on every scrape."""
+
+    def collect() -> None:
+        size = getattr(pool, "size", None)
+        if size is None:
+            return
+        DB_POOL_SIZE.set(size())
+        DB_POOL_CHECKED_OUT.set(pool.checkedout())  # type: ignore[attr-defined]
+        DB_POOL_OVERFLOW.set(pool.overflow())  # type: ignore[attr-defined]
+
+    REGISTRY.add_collector(collect)
+
+
+def track_business_metrics(session_factory: sessionmaker) -> None:
+    """Report stock and assembly gauges from the inventory summary table.
+
+    The summary is maintained incrementally by every write, so a scrape reads
+    a handful of rows instead of aggregating the base tables.
+    """
+
+    def collect() -> None:
+        with session_factory() as db:
+            summary = read_summary(db)
+        for gauge in (INVENTORY_ON_HAND, INVENTORY_RESERVED, ASSEMBLIES):
+            gauge.clear()
+        for (metric, dimension), value in summary.items():
+            if metric == "on_hand":
+                INVENTORY_ON_HAND.set(value, type=dimension)
+            elif metric == "reserved":
+                INVENTORY_RESERVED.set(value, type=dimension)
+            elif metric == "assemblies":
+                ASSEMBLIES.set(value, status=dimension)
+
+    REGISTRY.add_collector(collect)
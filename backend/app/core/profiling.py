@@ -0,0 +1,266 @@
+"""Per-request profiling with cProfile.
+
+Two ways in, both off by default:
+
+- On demand: with ``PROFILE_TOKEN`` set, a request carrying that token in an
+  ``X-Profile`` header or a ``profile`` query parameter runs under the
+  profiler. Its response body is replaced by a text report of the hottest
+  functions (the original status is in ``X-Profiled-Status``) and the raw
+  profile is saved like a sampled one.
+- Sampling: with ``PROFILE_SAMPLE_RATE`` above zero, that fraction of
+  requests is profiled and saved to ``PROFILE_DIR`` as ``.prof`` files
+  (``python -m pstats`` or snakeviz read them), keeping the newest
+  ``PROFILE_KEEP``.
+
+A request gets exactly one profiler. Sync endpoints run in a worker thread,
+out of sight of a profiler started in the middleware, so
+:func:`profile_endpoints` wraps them and a request routed to one profiles
+only that thread; the rest is profiled on the event loop, where it also
+picks up any other requests interleaved while the profiled one awaits.
+Since Python 3.12 cProfile is a ``sys.monitoring`` tool and only one can be
+active per process, so profiled requests take turns: while one runs, a
+sampled request just runs unprofiled and an on-demand one gets 503 with
+``Retry-After``.
+
+When neither is configured the middleware isn't installed and the endpoint
+wrappers are not applied, so there is no overhead at all.
+"""
+
+import cProfile
+import functools
+import hmac
+import io
+import logging
+import os
+import pstats
+import random
+import re
+import threading
+import time
+from collections.abc import Callable
+from contextvars import ContextVar
+from inspect import iscoroutinefunction
+from pathlib import Path
+from urllib.parse import parse_qsl
+
+from fastapi import FastAPI
+from fastapi.routing import APIRoute
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import JSONResponse
+from starlette.routing import Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.metrics import Counter
+
+logger = logging.getLogger(__name__)
+
+REPORT_LIMIT = 60
+
+PROFILED_REQUESTS = Counter(
+    "profiled_requests_total",
+    "Requests run under the profiler.",
+    ("mode",),
+)
+
+_SLUG = re.compile(r"[^A-Za-z0-9]+")
+
+# Held by the one request being profiled in this process
+_profiling = threading.Lock()
+# Endpoint wrappers installed by profile_endpoints
+_wrapped: set[Callable] = set()
+
+
+class RequestProfile:
+    """The profile of one request, on the event loop or its endpoint thread."""
+
+    def __init__(self) -> None:
+        self.profile = cProfile.Profile()
+
+    def run(self, call: Callable, *args, **kwargs):
+        """Call ``call`` under the profiler, in the current thread."""
+        return self.profile.runcall(call, *args, **kwargs)
+
+    def stats(self) -> pstats.Stats:
+        self.profile.create_stats()
+        # pstats refuses profiles that recorded nothing
+        return pstats.Stats(self.profile) if self.profile.stats else pstats.Stats()
+
+
+_current_profile: ContextVar[RequestProfile | None] = ContextVar(
+    "request_profile", default=None
+)
+
+
+def profiled(call: Callable) -> Callable:
+    """Wrap a sync endpoint to profile its thread while its request is profiled."""
+
+    @functools.wraps(call)
+    def wrapper(*args, **kwargs):
+        profile = _current_profile.get()
+        if profile is None:
+            return call(*args, **kwargs)
+        return profile.run(call, *args, **kwargs)
+
+    _wrapped.add(wrapper)
+    return wrapper
+
+
+def profile_endpoints(app: FastAPI) -> None:
+    """Wrap every sync endpoint of ``app``; call after including the routers."""
+    for route in app.routes:
+        if not isinstance(route, APIRoute):
+            continue
+        call = route.dependant.call
+        if call is not None and not iscoroutinefunction(call):
+            route.dependant.call = profiled(call)
+
+
+def in_thread(scope: Scope) -> bool:
+    """Whether the request is routed to a sync endpoint wrapped for profiling."""
+    app = scope.get("app")
+    for route in getattr(app, "routes", ()):
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return isinstance(route, APIRoute) and route.dependant.call in _wrapped
+    return False
+
+
+def report(stats: pstats.Stats, limit: int = REPORT_LIMIT) -> str:
+    """The ``limit`` functions with the most cumulative time, as text."""
+    out = io.StringIO()
+    printed = pstats.Stats(stream=out)
+    printed.add(stats)
+    printed.sort_stats("cumulative").print_stats(limit)
+    return out.getvalue()
+
+
+def save_profile(
+    stats: pstats.Stats, directory: str, keep: int, method: str, path: str, ms: float
+) -> Path:
+    """Dump ``stats`` into ``directory``, then drop all but the newest ``keep``."""
+    folder = Path(directory)
+    folder.mkdir(parents=True, exist_ok=True)
+    slug = _SLUG.sub("_", path).strip("_") or "root"
+    now = time.time_ns()
+    # Names sort by time, which is what rotation goes by
+    stamp = time.strftime("%Y%m%dT%H%M%S", time.gmtime(now // 10**9))
+    target = folder / f"{stamp}.{now % 10**9:09d}-{method}-{slug}-{ms:.0f}ms.prof"
+    stats.dump_stats(target)
+
+    saved = sorted(folder.glob("*.prof"))
+    for old in saved[: max(len(saved) - keep, 0)]:
+        try:
+            os.remove(old)
+        except FileNotFoundError:
+            pass  # Another worker rotated it first
+    return target
+
+
+class ProfilingMiddleware:
+    """Profile requests on demand or at random and keep the results."""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        token: str | None = None,
+        sample_rate: float | None = None,
+        directory: str | None = None,
+        keep: int | None = None,
+    ) -> None:
+        self.app = app
+        self.token = settings.profile_token if token is None else token
+        self.sample_rate = (
+            settings.profile_sample_rate if sample_rate is None else sample_rate
+        )
+        self.directory = settings.profile_dir if directory is None else directory
+        self.keep = settings.profile_keep if keep is None else keep
+
+    def requested(self, scope: Scope) -> bool:
+        """Whether the request carries the profiling token."""
+        if not self.token:
+            return False
+        given = next((v for k, v in scope["headers"] if k == b"x-profile"), b"").decode(
+            "latin-1"
+        )
+        if not given:
+            query = scope.get("query_string", b"").decode("latin-1")
+            given = dict(parse_qsl(query)).get("profile", "")
+        return bool(given) and hmac.compare_digest(given, self.token)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        on_demand = self.requested(scope)
+        if not on_demand and not (
+            self.sample_rate > 0 and random.random() < self.sample_rate
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        if not _profiling.acquire(blocking=False):
+            # Another request holds the profiler
+            if on_demand:
+                busy = JSONResponse(
+                    {"detail": "Another request is being profiled, retry later"},
+                    status_code=503,
+                    headers={"Retry-After": "1"},
+                )
+                await busy(scope, receive, send)
+            else:
+                await self.app(scope, receive, send)
+            return
+
+        PROFILED_REQUESTS.inc(mode="on_demand" if on_demand else "sampled")
+        profile = RequestProfile()
+        status = 500
+
+        async def record_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            # The report replaces the body
+
+        downstream = record_status if on_demand else send
+        on_loop = not in_thread(scope)
+        token = _current_profile.set(None if on_loop else profile)
+        start = time.perf_counter()
+        if on_loop:
+            profile.profile.enable()
+        try:
+            await self.app(scope, receive, downstream)
+        finally:
+            if on_loop:
+                profile.profile.disable()
+            _profiling.release()
+            _current_profile.reset(token)
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            stats = profile.stats()
+            try:
+                await run_in_threadpool(
+                    save_profile,
+                    stats,
+                    self.directory,
+                    self.keep,
+                    scope["method"],
+                    scope["path"],
+                    elapsed_ms,
+                )
+            except OSError as exc:
+                logger.warning("Could not save profile: %s", exc)
+
+        if on_demand:
+            body = report(stats).encode()
+            await send(
+                {
+                    "type": "http.response.start",
+                    "status": 200,
+                    "headers": [
+                        (b"content-type", b"text/plain; charset=utf-8"),
+                        (b"content-length", str(len(body)).encode()),
+                        (b"x-profiled-status", str(status).encode()),
+                    ],
+                }
+            )
+            await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,160 @@
+"""Single-flight coalescing of identical concurrent work.
+
+While a call for a key is in flight, further calls for the same key wait for
+it and share its result (or exception) instead of running their own copy.
+Nothing is cached: once the call finishes the next caller starts afresh.
+Callers may be threads (:meth:`SingleFlight.do`) or coroutines on any event
+loop (:meth:`SingleFlight.do_async`).
+
+:class:`SingleFlightMiddleware` applies this to designated expensive GET
+endpoints, keyed by path, normalized query string and ``Origin``, so
+dashboards loading at the same moment share one response. Requests asking
+for a profile (``X-Profile`` or ``profile=``) always run on their own:
+their response is the profile, not something another request can share.
+"""
+
+import asyncio
+import threading
+from collections.abc import Awaitable, Callable, Hashable
+from concurrent.futures import Future
+from typing import Any
+from urllib.parse import parse_qsl, urlencode
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.metrics import Counter
+
+COALESCED_PATHS = frozenset(
+    {
+        "/api/assemblies/",
+        "/api/assemblies/stats/build-capacity",
+        "/api/configurations/",
+        "/api/locations/build-capacity",
+    }
+)
+
+SINGLE_FLIGHT_SHARED = Counter(
+    "single_flight_shared_total",
+    "Requests answered with the result of an identical in-flight request.",
+    ("route",),
+)
+
+
+class SingleFlight:
+    """Run at most one call per key at a time; concurrent callers share it."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._calls: dict[Hashable, Future] = {}
+
+    def _join(self, key: Hashable) -> tuple[Future, bool]:
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                return future, False
+            future = self._calls[key] = Future()
+            # Running futures cannot be cancelled by a waiter giving up
+            future.set_running_or_notify_cancel()
+            return future, True
+
+    def _settle(
+        self, key: Hashable, future: Future, result: Any, exc: BaseException | None
+    ) -> None:
+        with self._lock:
+            del self._calls[key]
+        if exc is not None:
+            future.set_exception(exc)
+        else:
+            future.set_result(result)
+
+    def do(self, key: Hashable, fn: Callable[..., Any], *args) -> tuple[Any, bool]:
+        """Call ``fn(*args)`` or wait for the in-flight call for ``key``.
+
+        Returns the result and whether it was shared from another caller.
+        """
+        future, leader = self._join(key)
+        if not leader:
+            return future.result(), True
+        try:
+            result = fn(*args)
+        except BaseException as exc:
+            self._settle(key, future, None, exc)
+            raise
+        self._settle(key, future, result, None)
+        return result, False
+
+    async def do_async(
+        self, key: Hashable, fn: Callable[..., Awaitable[Any]], *args
+    ) -> tuple[Any, bool]:
+        """Await ``fn(*args)`` or the in-flight call for ``key``."""
+        future, leader = self._join(key)
+        if not leader:
+            return await asyncio.shield(asyncio.wrap_future(future)), True
+        try:
+            result = await fn(*args)
+        except BaseException as exc:
+            self._settle(key, future, None, exc)
+            raise
+        self._settle(key, future, result, None)
+        return result, False
+
+
+def _copy(message: Message) -> Message:
+    # Outer middleware may add headers in place; each request gets its own
+    if "headers" in message:
+        return {**message, "headers": list(message["headers"])}
+    return message
+
+
+def _header(scope: Scope, name: bytes) -> bytes | None:
+    return next((v for k, v in scope["headers"] if k == name), None)
+
+
+class SingleFlightMiddleware:
+    """Share one response between identical concurrent GETs to ``paths``."""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        paths: frozenset[str] = COALESCED_PATHS,
+        flights: SingleFlight | None = None,
+    ) -> None:
+        self.app = app
+        self.paths = paths
+        self.flights = flights or SingleFlight()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or scope["method"] != "GET"
+            or scope["path"] not in self.paths
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        params = sorted(parse_qsl(scope["query_string"].decode("latin-1")))
+        if _header(scope, b"x-profile") is not None or any(
+            name == "profile" for name, _ in params
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        key = (scope["path"], urlencode(params), _header(scope, b"origin"))
+        (messages, route), shared = await self.flights.do_async(
+            key, self._capture, scope, receive
+        )
+        if shared:
+            # Let outer middleware label the request like the one it shared
+            scope["route"] = route
+            SINGLE_FLIGHT_SHARED.inc(route=scope["path"])
+        for message in messages:
+            await send(_copy(message))
+
+    async def _capture(self, scope: Scope, receive: Receive) -> tuple[list, Any]:
+        messages: list[Message] = []
+
+        async def collect(message: Message) -> None:
+            messages.append(message)
+
+        await self.app(scope, receive, collect)
+        return messages, scope.get("route")
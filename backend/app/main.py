@@ -1,30 +1,103 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 
 from app.api.items import router as items_router
 from app.api.configurations import router as configurations_router
 from app.api.assemblies import router as assemblies_router
+from app.api.summary import router as summary_router
+from app.api.analytics import router as analytics_router
+from app.api.locations import router as locations_router
+from app.api.sync import router as sync_router
+from app.api.reports import router as reports_router
+from app.api.batch import router as batch_router
+from app.core.admission import AdmissionMiddleware
+from app.core.config import settings
+from app.core.database import SessionLocal, engine
+from app.core.instrumentation import QueryStatsMiddleware, instrument_engine
+from app.core.metrics import (
+    MetricsMiddleware,
+    render_metrics,
+    track_business_metrics,
+    track_pool,
+)
+from app.core.profiling import ProfilingMiddleware, profile_endpoints
+from app.core.single_flight import SingleFlightMiddleware
+from app.services.capacity_index import track_capacity
+from app.services.item_search import track_item_changes
+from app.services.summary import SummaryFolder
+
+summary_folder = SummaryFolder(SessionLocal, settings.summary_fold_interval_s)
+
 
-app = FastAPI(title="inv-sys", version="0.1.0")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if settings.summary_fold_interval_s > 0:
+        summary_folder.start()
+    yield
+    summary_folder.stop()
+
+
+app = FastAPI(title="inv-sys", version="0.1.0", lifespan=lifespan)
 
 origins = [
     "http://localhost:5173",
     "https://inv.pgskov.tech",
 ]
 
+# Innermost, so a profile covers the application rather than the middleware
+if settings.profile_token or settings.profile_sample_rate > 0:
+    app.add_middleware(ProfilingMiddleware)
+
+instrument_engine(engine)
+app.add_middleware(QueryStatsMiddleware)
+
+if settings.admission_control:
+    app.add_middleware(AdmissionMiddleware)
+# Outside admission control, so requests that share a response use no slot
+app.add_middleware(SingleFlightMiddleware)
+
+track_pool(engine.pool)
+track_business_metrics(SessionLocal)
+app.add_middleware(MetricsMiddleware)
+
+# Outermost, so responses made by any middleware (503s from admission
+# control, shared single-flight responses) carry the CORS headers too
 app.add_middleware(
     CORSMiddleware,
     allow_origins=origins,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing", "Retry-After"],
 )
 
+track_item_changes(SessionLocal)
+track_capacity(SessionLocal)
+
 app.include_router(items_router, prefix="/api")
 app.include_router(configurations_router, prefix="/api")
 app.include_router(assemblies_router, prefix="/api")
+app.include_router(summary_router, prefix="/api")
+app.include_router(analytics_router, prefix="/api")
+app.include_router(locations_router, prefix="/api")
+app.include_router(sync_router, prefix="/api")
+app.include_router(reports_router, prefix="/api")
+app.include_router(batch_router, prefix="/api")
+
+if settings.profile_token or settings.profile_sample_rate > 0:
+    profile_endpoints(app)
 
 
 @app.get("/health")
 def health_check():
     return {"status": "ok"}
+
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    return PlainTextResponse(
+        render_metrics(), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
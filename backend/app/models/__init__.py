@@ -5,6 +5,16 @@ from app.models.configuration import Configuration
 from app.models.configuration_component import ConfigurationComponent
 from app.models.assembly import Assembly
 from app.models.assembly_component import AssemblyComponent
+from app.models.archived_assembly import ArchivedAssembly
+from app.models.archived_assembly_component import ArchivedAssemblyComponent
+from app.models.inventory_summary import InventorySummary
+from app.models.inventory_summary_delta import InventorySummaryDelta
+from app.models.location import Location
+from app.models.item_stock import ItemStock
+from app.models.tombstone import Tombstone
+from app.models.report_job import ReportJob
+from app.models.cost_layer import CostLayer
+from app.models.outbox_event import OutboxEvent
 
 __all__ = [
     "Base",
@@ -14,4 +24,14 @@ __all__ = [
     "ConfigurationComponent",
     "Assembly",
     "AssemblyComponent",
+    "ArchivedAssembly",
+    "ArchivedAssemblyComponent",
+    "InventorySummary",
+    "InventorySummaryDelta",
+    "Location",
+    "ItemStock",
+    "Tombstone",
+    "ReportJob",
+    "CostLayer",
+    "OutboxEvent",
 ]
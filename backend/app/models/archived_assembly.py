@@ -0,0 +1,30 @@
+from datetime import datetime
+
+from sqlalchemy import String, DateTime, Integer, Text, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base import Base
+
+
+class ArchivedAssembly(Base):
+    """Shipped or cancelled assembly moved out of the hot ``assemblies`` table.
+
+    Rows keep their original id. There are no foreign keys so cold history
+    never blocks changes to configurations.
+    """
+
+    __tablename__ = "assemblies_archive"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+    configuration_id: Mapped[int | None] = mapped_column(
+        Integer, nullable=True, index=True
+    )
+    location_id: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    status: Mapped[str] = mapped_column(String(50))
+    order_reference: Mapped[str | None] = mapped_column(String(100), nullable=True)
+    notes: Mapped[str | None] = mapped_column(Text, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime)
+    completed_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    shipped_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    cancelled_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    archived_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now())
@@ -1,7 +1,7 @@
 from datetime import datetime
 from sqlalchemy import String, DateTime, ForeignKey, Text, func
 from sqlalchemy.orm import Mapped, mapped_column
-from app.models.base import Base
+from app.models.base import Base, utcnow
 
 
 class Assembly(Base):
@@ -11,9 +11,20 @@ class Assembly(Base):
     configuration_id: Mapped[int] = mapped_column(
         ForeignKey("configurations.id"), nullable=True
     )
-    status: Mapped[str] = mapped_column(String(50), default="reserved")
+    location_id: Mapped[int | None] = mapped_column(
+        ForeignKey("locations.id"), nullable=True, index=True
+    )
+    status: Mapped[str] = mapped_column(String(50), default="reserved", index=True)
     order_reference: Mapped[str | None] = mapped_column(String(100), nullable=True)
     notes: Mapped[str | None] = mapped_column(Text, nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now())
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime,
+        default=utcnow,
+        server_default=func.now(),
+        onupdate=utcnow,
+        index=True,
+    )
     completed_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
     shipped_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    cancelled_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
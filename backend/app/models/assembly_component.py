@@ -8,6 +8,6 @@ class AssemblyComponent(Base):
     __tablename__ = "assembly_components"
 
     id: Mapped[int] = mapped_column(primary_key=True)
-    assembly_id: Mapped[int] = mapped_column(ForeignKey("assemblies.id"))
+    assembly_id: Mapped[int] = mapped_column(ForeignKey("assemblies.id"), index=True)
     item_id: Mapped[int] = mapped_column(ForeignKey("items.id"))
     quantity: Mapped[int] = mapped_column(Integer, default=1)
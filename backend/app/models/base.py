@@ -1,5 +1,16 @@
+from datetime import datetime, timezone
+
 from sqlalchemy.orm import DeclarativeBase
 
 
 class Base(DeclarativeBase):
     pass
+
+
+def utcnow() -> datetime:
+    """Naive UTC now, as timestamps are stored.
+
+    Used for ``updated_at`` sync cursors: set by the application with
+    microsecond precision, also on Core UPDATE statements via ``onupdate``.
+    """
+    return datetime.now(timezone.utc).replace(tzinfo=None)
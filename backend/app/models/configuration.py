@@ -3,7 +3,7 @@ from datetime import datetime
 from sqlalchemy import String, DateTime, Text, Boolean, func
 from sqlalchemy.orm import Mapped, mapped_column
 
-from app.models.base import Base
+from app.models.base import Base, utcnow
 
 
 class Configuration(Base):
@@ -14,3 +14,10 @@ class Configuration(Base):
     description: Mapped[str | None] = mapped_column(Text, nullable=True)
     archived: Mapped[bool] = mapped_column(Boolean, default=False)
     created_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now())
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime,
+        default=utcnow,
+        server_default=func.now(),
+        onupdate=utcnow,
+        index=True,
+    )
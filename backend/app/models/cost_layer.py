@@ -0,0 +1,34 @@
+from datetime import datetime
+from decimal import Decimal
+
+from sqlalchemy import DateTime, ForeignKey, Index, Integer, Numeric, text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base import Base, utcnow
+
+
+class CostLayer(Base):
+    """Units of one receipt still on hand, at the unit cost they came in at.
+
+    Consumption draws down the oldest open layers of an item first (FIFO).
+    Layers with no unit cost hold stock received without a price.
+    """
+
+    __tablename__ = "cost_layers"
+    __table_args__ = (
+        Index(
+            "ix_cost_layers_open",
+            "item_id",
+            "received_at",
+            "id",
+            postgresql_where=text("quantity_remaining > 0"),
+            sqlite_where=text("quantity_remaining > 0"),
+        ),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    item_id: Mapped[int] = mapped_column(ForeignKey("items.id"))
+    received_at: Mapped[datetime] = mapped_column(DateTime, default=utcnow)
+    quantity: Mapped[int] = mapped_column(Integer)
+    quantity_remaining: Mapped[int] = mapped_column(Integer)
+    unit_cost: Mapped[Decimal | None] = mapped_column(Numeric(12, 4), nullable=True)
@@ -0,0 +1,18 @@
+from sqlalchemy import BigInteger, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base import Base
+
+
+class InventorySummary(Base):
+    """Running totals kept in step with the base tables.
+
+    ``metric`` is what is counted (``on_hand``, ``assemblies``, ...) and
+    ``dimension`` what it is grouped by (item type, assembly status, ...).
+    """
+
+    __tablename__ = "inventory_summary"
+
+    metric: Mapped[str] = mapped_column(String(50), primary_key=True)
+    dimension: Mapped[str] = mapped_column(String(50), primary_key=True)
+    value: Mapped[int] = mapped_column(BigInteger, default=0)
@@ -0,0 +1,19 @@
+from sqlalchemy import BigInteger, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base import Base
+
+
+class InventorySummaryDelta(Base):
+    """A change to an ``inventory_summary`` total not yet folded into it.
+
+    Writers only ever insert here, so concurrent transactions never wait on
+    each other for the shared summary rows.
+    """
+
+    __tablename__ = "inventory_summary_deltas"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    metric: Mapped[str] = mapped_column(String(50))
+    dimension: Mapped[str] = mapped_column(String(50))
+    value: Mapped[int] = mapped_column(BigInteger)
@@ -0,0 +1,37 @@
+from datetime import datetime
+
+from sqlalchemy import DateTime, ForeignKey, Integer, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base import Base
+
+STOCK_PARTITIONS = 8
+
+
+class ItemStock(Base):
+    """Stock of one item held at one location.
+
+    ``Item`` quantities remain the unlocated (central) pool; network-wide
+    stock is that pool plus every location's rows. On Postgres the table is
+    hash-partitioned by location so each site's rows, indexes and vacuum work
+    stay separate.
+    """
+
+    __tablename__ = "item_stock"
+    __table_args__ = {"postgresql_partition_by": "HASH (location_id)"}
+
+    location_id: Mapped[int] = mapped_column(
+        ForeignKey("locations.id"), primary_key=True
+    )
+    item_id: Mapped[int] = mapped_column(
+        ForeignKey("items.id"), primary_key=True, index=True
+    )
+    quantity_on_hand: Mapped[int] = mapped_column(Integer, default=0)
+    quantity_reserved: Mapped[int] = mapped_column(Integer, default=0)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime, server_default=func.now(), onupdate=func.now()
+    )
+
+    @property
+    def quantity_available(self) -> int:
+        return self.quantity_on_hand - self.quantity_reserved
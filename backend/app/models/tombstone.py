@@ -0,0 +1,20 @@
+from datetime import datetime
+
+from sqlalchemy import DateTime, Index, Integer, String, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base import Base, utcnow
+
+
+class Tombstone(Base):
+    """Record of a deleted row, so delta sync clients can drop it too."""
+
+    __tablename__ = "tombstones"
+    __table_args__ = (Index("ix_tombstones_entity_deleted_at", "entity", "deleted_at"),)
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    entity: Mapped[str] = mapped_column(String(50))  # "item", "assembly", ...
+    entity_id: Mapped[int] = mapped_column(Integer)
+    deleted_at: Mapped[datetime] = mapped_column(
+        DateTime, default=utcnow, server_default=func.now()
+    )
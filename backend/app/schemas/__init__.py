@@ -1,4 +1,15 @@
-from app.schemas.item import ItemCreate, ItemUpdate, ItemResponse
+from app.schemas.item import (
+    ItemCreate,
+    ItemUpdate,
+    ItemResponse,
+    ItemSearchResult,
+    ItemWhereUsed,
+    ReceiveLine,
+    ReceiveRequest,
+    ReceiveLineResult,
+    StockHistory,
+    StockHistoryPoint,
+)
 from app.schemas.configuration import (
     ConfigurationCreate,
     ConfigurationUpdate,
@@ -6,20 +17,65 @@ from app.schemas.configuration import (
 )
 from app.schemas.assembly import (
     AssemblyCreate,
+    AssemblyBulkCreate,
+    AssemblyBulkResponse,
     AssemblyUpdate,
     AssemblyResponse,
     AssemblyComponentResponse,
+    ArchivedAssemblyResponse,
+    PickListLine,
+)
+from app.schemas.analytics import ItemConsumption, ItemValuation, InventoryValuation
+from app.schemas.location import (
+    LocationCreate,
+    LocationResponse,
+    ItemStockUpdate,
+    ItemStockResponse,
+    LocationBuildCapacity,
 )
+from app.schemas.sync import ItemChanges, ConfigurationChanges, AssemblyChanges
+from app.schemas.report import ReportJobCreate, ReportJobResponse
+from app.schemas.batch import BatchRequest, BatchSubRequest, BatchSubResponse
+from app.schemas.summary import InventorySummaryResponse, ItemTypeSummary
 
 __all__ = [
     "ItemCreate",
     "ItemUpdate",
     "ItemResponse",
+    "ItemSearchResult",
+    "ItemWhereUsed",
+    "ReceiveLine",
+    "ReceiveRequest",
+    "ReceiveLineResult",
+    "StockHistory",
+    "StockHistoryPoint",
     "ConfigurationCreate",
     "ConfigurationUpdate",
     "ConfigurationResponse",
     "AssemblyCreate",
+    "AssemblyBulkCreate",
+    "AssemblyBulkResponse",
     "AssemblyUpdate",
     "AssemblyResponse",
     "AssemblyComponentResponse",
+    "ArchivedAssemblyResponse",
+    "PickListLine",
+    "InventorySummaryResponse",
+    "ItemTypeSummary",
+    "ItemConsumption",
+    "ItemValuation",
+    "InventoryValuation",
+    "LocationCreate",
+    "LocationResponse",
+    "ItemStockUpdate",
+    "ItemStockResponse",
+    "LocationBuildCapacity",
+    "ItemChanges",
+    "ConfigurationChanges",
+    "AssemblyChanges",
+    "ReportJobCreate",
+    "ReportJobResponse",
+    "BatchRequest",
+    "BatchSubRequest",
+    "BatchSubResponse",
 ]
@@ -0,0 +1,37 @@
+from datetime import date
+from decimal import Decimal
+
+from pydantic import BaseModel
+
+
+class ItemConsumption(BaseModel):
+    """Consumption rates and forecast days of cover for one item."""
+
+    item_id: int
+    item_name: str | None = None
+    item_sku: str | None = None
+    quantity_available: int
+    consumed_7d: int
+    consumed_30d: int
+    consumed_90d: int
+    daily_rate: float
+    days_of_cover: float | None = None
+    stockout_date: date | None = None
+
+
+class ItemValuation(BaseModel):
+    """FIFO value of one item's stock on hand."""
+
+    item_id: int
+    item_name: str
+    item_sku: str
+    quantity_on_hand: int
+    quantity_costed: int
+    value: Decimal
+
+
+class InventoryValuation(BaseModel):
+    """FIFO value of the whole catalog."""
+
+    total_value: Decimal
+    items: list[ItemValuation]
@@ -25,6 +25,7 @@ class AssemblyBase(BaseModel):
     """Shared fields for assemblies."""
 
     configuration_id: int | None = None
+    location_id: int | None = None
     order_reference: str | None = None
     notes: str | None = None
 
@@ -35,6 +36,50 @@ class AssemblyCreate(AssemblyBase):
     components: list[AssemblyComponentBase] = []
 
 
+class AssemblyBulkCreate(BaseModel):
+    """Many assemblies of one configuration.
+
+    Give either ``quantity`` or one ``order_references`` entry per unit.
+    ``partial`` creates as many as stock allows instead of none.
+    """
+
+    configuration_id: int
+    quantity: int | None = None
+    order_references: list[str] | None = None
+    notes: str | None = None
+    partial: bool = False
+
+
+class AssemblyShortage(BaseModel):
+    """An item short for a bulk order."""
+
+    item_id: int
+    item_name: str | None = None
+    needed: int
+    available: int
+
+
+class AssemblyBulkResponse(BaseModel):
+    """Assemblies created by a bulk order and what could not be built."""
+
+    requested: int
+    created: int
+    assembly_ids: list[int]
+    unfulfilled: list[str | None] = []
+    shortages: list[AssemblyShortage] = []
+
+
+class PickListLine(BaseModel):
+    """Total quantity of one item to pull for a set of assemblies."""
+
+    item_id: int
+    item_sku: str
+    item_name: str
+    quantity: int
+    assemblies: int
+    quantity_on_hand: int
+
+
 class AssemblyUpdate(BaseModel):
     """Fields for updating an assembly."""
 
@@ -48,9 +93,17 @@ class AssemblyResponse(AssemblyBase):
     id: int
     status: str
     created_at: datetime
+    updated_at: datetime | None = None
     completed_at: datetime | None = None
     shipped_at: datetime | None = None
+    cancelled_at: datetime | None = None
     components: list[AssemblyComponentResponse] = []
 
     class Config:
         from_attributes = True
+
+
+class ArchivedAssemblyResponse(AssemblyResponse):
+    """An assembly read from the archive."""
+
+    archived_at: datetime
@@ -0,0 +1,26 @@
+from typing import Any
+
+from pydantic import BaseModel
+
+
+class BatchSubRequest(BaseModel):
+    """One read in a batch: a GET path with optional query parameters."""
+
+    id: str | None = None
+    path: str
+    params: dict[str, str | int | bool | list[str | int]] = {}
+
+
+class BatchRequest(BaseModel):
+    """Reads to run against one database snapshot."""
+
+    requests: list[BatchSubRequest]
+
+
+class BatchSubResponse(BaseModel):
+    """Status and decoded body of one batched read."""
+
+    id: str | None = None
+    path: str
+    status: int
+    body: Any = None
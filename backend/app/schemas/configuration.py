@@ -48,6 +48,7 @@ class ConfigurationResponse(ConfigurationBase):
     id: int
     archived: bool
     created_at: datetime
+    updated_at: datetime | None = None
     components: list[ConfigurationComponentResponse] = []
 
     class Config:
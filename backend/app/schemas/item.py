@@ -1,4 +1,5 @@
 from datetime import datetime
+from decimal import Decimal
 
 from pydantic import BaseModel
 
@@ -47,3 +48,82 @@ class ItemResponse(ItemBase):
 
     class Config:
         from_attributes = True
+
+
+class ItemWhereUsed(BaseModel):
+    """A configuration that uses an item."""
+
+    configuration_id: int
+    configuration_name: str
+    quantity: int
+    can_build: int
+
+
+class ItemSearchResult(BaseModel):
+    """Compact item row for autocomplete."""
+
+    id: int
+    name: str
+    sku: str
+    barcode: str | None = None
+    type: str
+    quantity_available: int
+
+    class Config:
+        from_attributes = True
+
+
+class ReceiveLine(BaseModel):
+    """Units received against purchase orders and/or a manual adjustment.
+
+    Identify the item by ``item_id`` or ``sku``. ``unit_cost`` prices the
+    received units for FIFO valuation.
+    """
+
+    item_id: int | None = None
+    sku: str | None = None
+    received: int = 0
+    adjustment: int = 0
+    unit_cost: Decimal | None = None
+
+
+class ReceiveRequest(BaseModel):
+    """A batch of receiving lines applied in one statement."""
+
+    lines: list[ReceiveLine]
+    reference_id: int | None = None
+    notes: str | None = None
+
+
+class ReceiveLineResult(BaseModel):
+    """Outcome of one receiving line."""
+
+    line: int
+    status: str
+    item_id: int | None = None
+    sku: str | None = None
+    detail: str | None = None
+    quantity_on_hand: int | None = None
+    quantity_on_order: int | None = None
+
+    class Config:
+        from_attributes = True
+
+
+class StockHistoryPoint(BaseModel):
+    """Central stock levels after an event."""
+
+    at: datetime
+    quantity_on_hand: int
+    quantity_reserved: int
+
+
+class StockHistory(BaseModel):
+    """An item's stock level history, downsampled for charting."""
+
+    item_id: int
+    start: datetime
+    end: datetime
+    method: str
+    events: int
+    points: list[StockHistoryPoint]
@@ -0,0 +1,55 @@
+from datetime import datetime
+
+from pydantic import BaseModel
+
+
+class LocationCreate(BaseModel):
+    """Fields for creating a location."""
+
+    code: str
+    name: str
+
+
+class LocationResponse(LocationCreate):
+    """Fields returned when reading a location."""
+
+    id: int
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class ItemStockUpdate(BaseModel):
+    """Set the units of an item on hand at a location."""
+
+    quantity_on_hand: int
+
+
+class ItemStockResponse(BaseModel):
+    """Stock of one item at one location."""
+
+    location_id: int
+    item_id: int
+    item_name: str | None = None
+    item_sku: str | None = None
+    quantity_on_hand: int
+    quantity_reserved: int
+    quantity_available: int
+
+
+class LocationCapacity(BaseModel):
+    """Builds of a configuration possible from one location's stock."""
+
+    location_id: int
+    location_code: str
+    can_build: int
+
+
+class LocationBuildCapacity(BaseModel):
+    """Builds possible network-wide and per location."""
+
+    configuration_id: int
+    configuration_name: str
+    can_build: int
+    locations: list[LocationCapacity] = []
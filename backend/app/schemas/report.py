@@ -0,0 +1,26 @@
+from datetime import datetime
+
+from pydantic import BaseModel
+
+
+class ReportJobCreate(BaseModel):
+    """A report to run in the background."""
+
+    kind: str
+    params: dict = {}
+
+
+class ReportJobResponse(BaseModel):
+    """Status of a report job; fetch the result once it is done."""
+
+    id: str
+    kind: str
+    status: str
+    content_hash: str | None = None
+    error: str | None = None
+    created_at: datetime
+    finished_at: datetime | None = None
+    expires_at: datetime | None = None
+
+    class Config:
+        from_attributes = True
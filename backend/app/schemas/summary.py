@@ -0,0 +1,19 @@
+from pydantic import BaseModel
+
+
+class ItemTypeSummary(BaseModel):
+    """Stock totals for one item type."""
+
+    count: int = 0
+    on_hand: int = 0
+    reserved: int = 0
+    on_order: int = 0
+    available: int = 0
+
+
+class InventorySummaryResponse(BaseModel):
+    """Dashboard totals from the incrementally maintained summary."""
+
+    items: dict[str, ItemTypeSummary] = {}
+    assemblies: dict[str, int] = {}
+    configurations: dict[str, int] = {}
@@ -0,0 +1,25 @@
+from pydantic import BaseModel
+
+from app.schemas.assembly import AssemblyResponse
+from app.schemas.configuration import ConfigurationResponse
+from app.schemas.item import ItemResponse
+
+
+class SyncPage(BaseModel):
+    """Changes since a cursor; pass ``cursor`` back as ``updated_since``."""
+
+    deleted: list[int] = []
+    cursor: str | None = None
+    has_more: bool = False
+
+
+class ItemChanges(SyncPage):
+    items: list[ItemResponse] = []
+
+
+class ConfigurationChanges(SyncPage):
+    configurations: list[ConfigurationResponse] = []
+
+
+class AssemblyChanges(SyncPage):
+    assemblies: list[AssemblyResponse] = []
@@ -0,0 +1,105 @@
+"""Move long-terminal assemblies out of the hot tables.
+
+Shipped and cancelled assemblies that have been terminal for longer than the
+configured age are copied into ``assemblies_archive`` and
+``assembly_components_archive`` with INSERT ... SELECT and then deleted from
+the hot tables, one batch per transaction. Each moved assembly gets a
+tombstone in the same transaction, so delta sync clients drop it.
+"""
+
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.orm import Session
+
+from app.models import (
+    ArchivedAssembly,
+    ArchivedAssemblyComponent,
+    Assembly,
+    AssemblyComponent,
+    Tombstone,
+)
+
+TERMINAL_STATUSES = ("shipped", "cancelled")
+
+# When the assembly became terminal; older rows have no cancelled_at.
+terminal_at = func.coalesce(
+    Assembly.shipped_at, Assembly.cancelled_at, Assembly.created_at
+)
+
+
+def archive_batch(db: Session, cutoff: datetime, batch_size: int) -> int:
+    """Archive up to ``batch_size`` assemblies terminal since before ``cutoff``."""
+    ids = list(
+        db.scalars(
+            select(Assembly.id)
+            .where(Assembly.status.in_(TERMINAL_STATUSES), terminal_at < cutoff)
+            .order_by(Assembly.id)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        )
+    )
+    if not ids:
+        return 0
+
+    db.execute(
+        insert(ArchivedAssembly).from_select(
+            [
+                "id",
+                "configuration_id",
+                "location_id",
+                "status",
+                "order_reference",
+                "notes",
+                "created_at",
+                "completed_at",
+                "shipped_at",
+                "cancelled_at",
+            ],
+            select(
+                Assembly.id,
+                Assembly.configuration_id,
+                Assembly.location_id,
+                Assembly.status,
+                Assembly.order_reference,
+                Assembly.notes,
+                Assembly.created_at,
+                Assembly.completed_at,
+                Assembly.shipped_at,
+                Assembly.cancelled_at,
+            ).where(Assembly.id.in_(ids)),
+        )
+    )
+    db.execute(
+        insert(ArchivedAssemblyComponent).from_select(
+            ["id", "assembly_id", "item_id", "quantity"],
+            select(
+                AssemblyComponent.id,
+                AssemblyComponent.assembly_id,
+                AssemblyComponent.item_id,
+                AssemblyComponent.quantity,
+            ).where(AssemblyComponent.assembly_id.in_(ids)),
+        )
+    )
+    db.execute(delete(AssemblyComponent).where(AssemblyComponent.assembly_id.in_(ids)))
+    db.execute(delete(Assembly).where(Assembly.id.in_(ids)))
+    db.execute(
+        insert(Tombstone),
+        [{"entity": "assembly", "entity_id": assembly_id} for assembly_id in ids],
+    )
+    db.commit()
+    return len(ids)
+
+
+def archive_assemblies(
+    db: Session, older_than: timedelta, batch_size: int = 500
+) -> int:
+    """Archive every eligible assembly in batches. Returns the number moved."""
+    # Timestamps are stored as naive UTC
+    cutoff = datetime.now(timezone.utc).replace(tzinfo=None) - older_than
+    total = 0
+    while True:
+        moved = archive_batch(db, cutoff, batch_size)
+        total += moved
+        if moved < batch_size:
+            return total
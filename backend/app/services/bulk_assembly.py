@@ -0,0 +1,136 @@
+"""Create many identical assemblies of one configuration at once.
+
+The configuration is read once and availability is checked once, for the
+aggregated requirement, against a single locked read of its items. Stock is
+reserved with one update per item, and the assemblies and their components
+are written with two bulk INSERTs. The assembly INSERT bypasses the ORM
+flush, so its summary delta is applied here.
+"""
+
+from collections import Counter
+from dataclasses import dataclass, field
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.models import Assembly, AssemblyComponent, ConfigurationComponent, Item
+from app.services.reservation_queue import ReservationError
+from app.services.summary import apply_summary_deltas
+
+
+@dataclass
+class Shortage:
+    item_id: int
+    item_name: str | None
+    needed: int
+    available: int
+
+
+@dataclass
+class BulkCreateResult:
+    assembly_ids: list[int] = field(default_factory=list)
+    unfulfilled: list[str | None] = field(default_factory=list)
+    shortages: list[Shortage] = field(default_factory=list)
+
+
+def create_assemblies(
+    db: Session,
+    configuration_id: int,
+    order_references: list[str | None],
+    notes: str | None = None,
+    partial: bool = False,
+) -> BulkCreateResult:
+    """Create one assembly per order reference and commit.
+
+    All or nothing by default: a shortage for the whole order raises
+    :class:`ReservationError`. With ``partial`` as many units as stock allows
+    are created, in order, and the rest are reported as unfulfilled.
+    """
+    per_unit: Counter[int] = Counter()
+    lines = (
+        db.query(ConfigurationComponent)
+        .filter(ConfigurationComponent.configuration_id == configuration_id)
+        .order_by(ConfigurationComponent.id)
+        .all()
+    )
+    for cc in lines:
+        per_unit[cc.item_id] += cc.quantity
+
+    items = {
+        item.id: item
+        for item in db.query(Item)
+        .filter(Item.id.in_(per_unit))
+        .order_by(Item.id)
+        .with_for_update()
+    }
+    missing = sorted(set(per_unit) - set(items))
+    if missing:
+        raise ReservationError(f"Item {missing[0]} not found")
+
+    units = len(order_references)
+    buildable = min(
+        (
+            items[item_id].quantity_available // quantity if quantity > 0 else units
+            for item_id, quantity in per_unit.items()
+        ),
+        default=units,
+    )
+    result = BulkCreateResult(
+        shortages=[
+            Shortage(
+                item_id=item_id,
+                item_name=items[item_id].name,
+                needed=quantity * units,
+                available=items[item_id].quantity_available,
+            )
+            for item_id, quantity in sorted(per_unit.items())
+            if items[item_id].quantity_available < quantity * units
+        ]
+    )
+    if result.shortages and not partial:
+        shortage = result.shortages[0]
+        raise ReservationError(
+            f"Insufficient stock for {shortage.item_name}: "
+            f"need {shortage.needed}, have {shortage.available}"
+        )
+
+    fulfilled = order_references[: max(0, min(units, buildable))]
+    result.unfulfilled = order_references[len(fulfilled) :]
+    if not fulfilled:
+        db.rollback()
+        return result
+
+    # One update per item for the whole order
+    for item_id, quantity in per_unit.items():
+        items[item_id].quantity_reserved += quantity * len(fulfilled)
+
+    result.assembly_ids = list(
+        db.scalars(
+            insert(Assembly).returning(Assembly.id, sort_by_parameter_order=True),
+            [
+                {
+                    "configuration_id": configuration_id,
+                    "order_reference": reference,
+                    "notes": notes,
+                    "status": "reserved",
+                }
+                for reference in fulfilled
+            ],
+        )
+    )
+    if lines:
+        db.execute(
+            insert(AssemblyComponent),
+            [
+                {
+                    "assembly_id": assembly_id,
+                    "item_id": cc.item_id,
+                    "quantity": cc.quantity,
+                }
+                for assembly_id in result.assembly_ids
+                for cc in lines
+            ],
+        )
+    apply_summary_deltas(db, {("assemblies", "reserved"): len(fulfilled)})
+    db.commit()
+    return result
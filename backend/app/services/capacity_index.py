@@ -0,0 +1,302 @@
+"""Incrementally maintained build capacity.
+
+The index keeps each configuration's component lines, a reverse where-used
+map (item -> configurations using it), central stock available per item and
+the resulting builds per configuration. A stock change only recomputes the
+configurations that use the item, so reading capacity is a dictionary read.
+
+Changes are collected from ORM flushes and, once committed, queued for one
+background thread that re-reads the touched rows, so concurrent commits
+converge on the committed state. The hook must not do the reads itself:
+during ``after_commit`` the writer's connection is still checked out, and
+taking a second one per writer can exhaust the pool. Readers wait up to
+``capacity_refresh_wait_s`` for refreshes queued before them, so a client
+sees its own writes. Code that changes items or configuration components
+with bulk statements must call :func:`mark_capacity_changes`. The index is
+rebuilt from scratch when it is older than ``capacity_index_max_age_s``,
+which bounds drift from writers in other processes.
+"""
+
+import logging
+import threading
+import time
+
+from sqlalchemy import event, inspect, select
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.core.config import settings
+from app.core.single_flight import SingleFlight
+from app.models import Configuration, ConfigurationComponent, Item
+
+logger = logging.getLogger(__name__)
+
+_CHANGES_KEY = "capacity_index_changes"
+_STOCK_FIELDS = ("quantity_on_hand", "quantity_reserved")
+
+
+class CapacityIndex:
+    """In-memory build capacity with a where-used reverse map."""
+
+    def __init__(self) -> None:
+        self._lock = threading.RLock()
+        # Serializes loads and refreshes, each reading and applying as a
+        # unit, so an older snapshot is never applied over a newer one
+        self._writes = threading.Lock()
+        self._refreshed = threading.Condition(self._lock)
+        self._loads = SingleFlight()
+        self._pending_items: set[int] = set()
+        self._pending_configs: set[int] = set()
+        self._queued = 0
+        self._applied = 0
+        self._session_factory: sessionmaker | None = None
+        self._worker: threading.Thread | None = None
+        self._reset()
+
+    def _reset(self) -> None:
+        self._loaded_at: float | None = None
+        self._names: dict[int, str] = {}
+        self._components: dict[int, list[tuple[int, int]]] = {}
+        self._where_used: dict[int, set[int]] = {}
+        self._available: dict[int, int] = {}
+        self._capacity: dict[int, int] = {}
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded_at is not None
+
+    def load(self, db: Session) -> None:
+        with self._writes:
+            self._load(db)
+
+    def _load(self, db: Session) -> None:
+        configs = db.execute(select(Configuration.id, Configuration.name)).all()
+        lines = db.execute(
+            select(
+                ConfigurationComponent.configuration_id,
+                ConfigurationComponent.item_id,
+                ConfigurationComponent.quantity,
+            ).order_by(ConfigurationComponent.id)
+        ).all()
+        stock = db.execute(
+            select(Item.id, Item.quantity_on_hand - Item.quantity_reserved)
+        ).all()
+        with self._lock:
+            self._reset()
+            self._names = {config_id: name for config_id, name in configs}
+            self._components = {config_id: [] for config_id in self._names}
+            for config_id, item_id, quantity in lines:
+                if config_id in self._components:
+                    self._add_line(config_id, item_id, quantity)
+            self._available = {item_id: available for item_id, available in stock}
+            for config_id in self._names:
+                self._recompute(config_id)
+            self._loaded_at = time.monotonic()
+
+    def ensure_fresh(self, db: Session) -> None:
+        age = settings.capacity_index_max_age_s
+        if self._loaded_at is None or time.monotonic() - self._loaded_at > age:
+            # Requests finding the index stale together share one rebuild
+            self._loads.do("load", self.load, db)
+        self.wait_for_refreshes(settings.capacity_refresh_wait_s)
+
+    def queue_refresh(
+        self, session_factory: sessionmaker, item_ids: set[int], config_ids: set[int]
+    ) -> None:
+        """Have the background thread refresh these items and configurations."""
+        with self._refreshed:
+            self._pending_items |= item_ids
+            self._pending_configs |= config_ids
+            self._queued += 1
+            self._session_factory = session_factory
+            self._refreshed.notify_all()
+            if self._worker is None:
+                self._worker = threading.Thread(
+                    target=self._run_refreshes,
+                    name="capacity-index",
+                    daemon=True,
+                )
+                self._worker.start()
+
+    def wait_for_refreshes(self, timeout: float) -> bool:
+        """Wait until the refreshes queued so far are applied."""
+        with self._refreshed:
+            target = self._queued
+            return self._refreshed.wait_for(lambda: self._applied >= target, timeout)
+
+    def _run_refreshes(self) -> None:
+        while True:
+            with self._refreshed:
+                self._refreshed.wait_for(lambda: self._applied < self._queued)
+                session_factory = self._session_factory
+                target = self._queued
+                items, configs = self._pending_items, self._pending_configs
+                self._pending_items, self._pending_configs = set(), set()
+            try:
+                with session_factory() as db:  # type: ignore[misc]
+                    self.refresh(db, items, configs)
+            except Exception:
+                logger.exception("Capacity index refresh failed")
+                # Rebuild on the next read rather than serve a partial update
+                with self._lock:
+                    self._loaded_at = None
+            with self._refreshed:
+                self._applied = target
+                self._refreshed.notify_all()
+
+    def _add_line(self, config_id: int, item_id: int, quantity: int) -> None:
+        self._components[config_id].append((item_id, quantity))
+        self._where_used.setdefault(item_id, set()).add(config_id)
+
+    def _drop_config(self, config_id: int) -> None:
+        for item_id, _ in self._components.pop(config_id, ()):
+            users = self._where_used.get(item_id)
+            if users is not None:
+                users.discard(config_id)
+                if not users:
+                    del self._where_used[item_id]
+
+    def _recompute(self, config_id: int) -> None:
+        # Same rules as the original full scan: no components, a missing item
+        # or a zero quantity line means nothing can be built.
+        builds = None
+        for item_id, quantity in self._components.get(config_id, ()):
+            available = self._available.get(item_id)
+            if available is None or quantity == 0:
+                builds = 0
+                break
+            line_builds = available // quantity
+            builds = line_builds if builds is None else min(builds, line_builds)
+        self._capacity[config_id] = builds or 0
+
+    def refresh(self, db: Session, item_ids: set[int], config_ids: set[int]) -> None:
+        """Re-read the given items and configurations and recompute."""
+        with self._writes:
+            self._refresh(db, item_ids, config_ids)
+
+    def _refresh(self, db: Session, item_ids: set[int], config_ids: set[int]) -> None:
+        configs, lines, stock = [], [], []
+        if config_ids:
+            configs = db.execute(
+                select(Configuration.id, Configuration.name).where(
+                    Configuration.id.in_(config_ids)
+                )
+            ).all()
+            lines = db.execute(
+                select(
+                    ConfigurationComponent.configuration_id,
+                    ConfigurationComponent.item_id,
+                    ConfigurationComponent.quantity,
+                )
+                .where(ConfigurationComponent.configuration_id.in_(config_ids))
+                .order_by(ConfigurationComponent.id)
+            ).all()
+        if item_ids:
+            stock = db.execute(
+                select(Item.id, Item.quantity_on_hand - Item.quantity_reserved).where(
+                    Item.id.in_(item_ids)
+                )
+            ).all()
+
+        with self._lock:
+            for config_id in config_ids:
+                self._drop_config(config_id)
+                self._names.pop(config_id, None)
+                self._capacity.pop(config_id, None)
+            for config_id, name in configs:
+                self._names[config_id] = name
+                self._components[config_id] = []
+            for config_id, item_id, quantity in lines:
+                self._add_line(config_id, item_id, quantity)
+
+            for item_id in item_ids:
+                self._available.pop(item_id, None)
+            for item_id, available in stock:
+                self._available[item_id] = available
+
+            affected = {c for c in config_ids if c in self._names}
+            for item_id in item_ids:
+                affected |= self._where_used.get(item_id, set())
+            for config_id in affected:
+                self._recompute(config_id)
+
+    def capacity(self) -> list[dict]:
+        with self._lock:
+            return [
+                {
+                    "configuration_id": config_id,
+                    "configuration_name": self._names[config_id],
+                    "can_build": self._capacity[config_id],
+                }
+                for config_id in sorted(self._names)
+            ]
+
+    def where_used(self, item_id: int) -> list[dict] | None:
+        """Configurations using an item, or ``None`` for an unknown item."""
+        with self._lock:
+            if item_id not in self._available:
+                return None
+            return [
+                {
+                    "configuration_id": config_id,
+                    "configuration_name": self._names[config_id],
+                    "quantity": sum(
+                        quantity
+                        for line_item, quantity in self._components[config_id]
+                        if line_item == item_id
+                    ),
+                    "can_build": self._capacity[config_id],
+                }
+                for config_id in sorted(self._where_used.get(item_id, ()))
+            ]
+
+
+capacity_index = CapacityIndex()
+
+
+def _changes(session: Session) -> tuple[set[int], set[int]]:
+    return session.info.setdefault(_CHANGES_KEY, (set(), set()))
+
+
+def mark_capacity_changes(
+    session: Session,
+    item_ids: set[int] | None = None,
+    config_ids: set[int] | None = None,
+) -> None:
+    """Queue index updates for rows changed outside the ORM flush."""
+    items, configs = _changes(session)
+    items.update(item_ids or ())
+    configs.update(config_ids or ())
+
+
+def _collect_changes(session: Session, flush_context) -> None:
+    items, configs = _changes(session)
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, Item):
+            if obj in session.dirty and not any(
+                inspect(obj).attrs[field].history.has_changes()
+                for field in _STOCK_FIELDS
+            ):
+                continue
+            items.add(obj.id)
+        elif isinstance(obj, Configuration):
+            configs.add(obj.id)
+        elif isinstance(obj, ConfigurationComponent):
+            history = inspect(obj).attrs["configuration_id"].history
+            configs.update(c for c in (*history.deleted, obj.configuration_id) if c)
+
+
+def track_capacity(session_factory: sessionmaker) -> None:
+    """Keep the capacity index current from committed changes."""
+
+    def apply_changes(session: Session) -> None:
+        items, configs = session.info.pop(_CHANGES_KEY, (set(), set()))
+        if not (items or configs) or not capacity_index.loaded:
+            return
+        capacity_index.queue_refresh(session_factory, items, configs)
+
+    def discard_changes(session: Session) -> None:
+        session.info.pop(_CHANGES_KEY, None)
+
+    event.listen(session_factory, "after_flush", _collect_changes)
+    event.listen(session_factory, "after_commit", apply_changes)
+    event.listen(session_factory, "after_rollback", discard_changes)
@@ -0,0 +1,162 @@
+"""Component consumption rates and days-of-cover forecasts.
+
+Completing an assembly consumes its components, so consumption history is the
+component quantities of assemblies with a ``completed_at``, live and archived.
+One grouped query returns units consumed per item per day; everything after
+that is vectorised over an items x days NumPy matrix.
+"""
+
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+
+import numpy as np
+from sqlalchemy import func, select, union_all
+from sqlalchemy.orm import Session
+
+from app.models import (
+    ArchivedAssembly,
+    ArchivedAssemblyComponent,
+    Assembly,
+    AssemblyComponent,
+    Item,
+    ItemStock,
+)
+
+WINDOWS = (7, 30, 90)
+
+
+@dataclass
+class ConsumptionForecast:
+    item_id: int
+    item_name: str | None
+    item_sku: str | None
+    quantity_available: int
+    consumed: dict[int, int]  # units consumed per rolling window (days)
+    daily_rate: float  # exponentially smoothed units per day
+    days_of_cover: float | None  # None when nothing is being consumed
+
+
+def daily_consumption(db: Session, since: date) -> list[tuple[int, date, int]]:
+    """Units consumed per item per day since ``since``, in one query."""
+    cutoff = datetime.combine(since, datetime.min.time())
+    consumed = union_all(
+        select(
+            AssemblyComponent.item_id,
+            Assembly.completed_at,
+            AssemblyComponent.quantity,
+        )
+        .join(Assembly, Assembly.id == AssemblyComponent.assembly_id)
+        .where(Assembly.completed_at >= cutoff),
+        select(
+            ArchivedAssemblyComponent.item_id,
+            ArchivedAssembly.completed_at,
+            ArchivedAssemblyComponent.quantity,
+        )
+        .join(
+            ArchivedAssembly,
+            ArchivedAssembly.id == ArchivedAssemblyComponent.assembly_id,
+        )
+        .where(ArchivedAssembly.completed_at >= cutoff),
+    ).subquery()
+
+    day = func.date(consumed.c.completed_at)
+    rows = db.execute(
+        select(consumed.c.item_id, day, func.sum(consumed.c.quantity)).group_by(
+            consumed.c.item_id, day
+        )
+    )
+    # SQLite returns the day as an ISO string, Postgres as a date
+    return [
+        (item_id, date.fromisoformat(str(day)), int(quantity))
+        for item_id, day, quantity in rows
+    ]
+
+
+def smoothed_rates(matrix: np.ndarray, alpha: float) -> np.ndarray:
+    """Simple exponential smoothing of each row, evaluated at the last day.
+
+    Uses the closed form ``s_n = sum(alpha * (1 - alpha)**(n-1-t) * x_t) +
+    (1 - alpha)**n * s_0`` so all items are smoothed in one matrix product.
+    The series is seeded with its own mean.
+    """
+    days = matrix.shape[1]
+    decay = (1 - alpha) ** np.arange(days - 1, -1, -1, dtype=float)
+    return matrix @ (alpha * decay) + (1 - alpha) ** days * matrix.mean(axis=1)
+
+
+def forecast_consumption(
+    db: Session,
+    history_days: int = 365,
+    alpha: float = 0.3,
+    today: date | None = None,
+) -> list[ConsumptionForecast]:
+    """Consumption over rolling windows and days of cover for consumed items."""
+    today = today or datetime.now(timezone.utc).date()
+    start = today - timedelta(days=history_days - 1)
+    rows = [row for row in daily_consumption(db, start) if row[1] <= today]
+    if not rows:
+        return []
+
+    item_ids = sorted({item_id for item_id, _, _ in rows})
+    row_index = {item_id: i for i, item_id in enumerate(item_ids)}
+    matrix = np.zeros((len(item_ids), history_days))
+    np.add.at(
+        matrix,
+        (
+            np.fromiter((row_index[r[0]] for r in rows), dtype=np.intp),
+            np.fromiter(((r[1] - start).days for r in rows), dtype=np.intp),
+        ),
+        np.fromiter((r[2] for r in rows), dtype=float),
+    )
+
+    consumed = {
+        window: matrix[:, -window:].sum(axis=1)
+        for window in WINDOWS
+        if window <= history_days
+    }
+    rates = smoothed_rates(matrix, alpha)
+
+    # Network-wide availability of the consumed items: the central pool plus
+    # every location.
+    # Items deleted since they were consumed keep their history, unnamed.
+    located = (
+        select(
+            ItemStock.item_id,
+            func.sum(ItemStock.quantity_on_hand - ItemStock.quantity_reserved).label(
+                "available"
+            ),
+        )
+        .where(ItemStock.item_id.in_(item_ids))
+        .group_by(ItemStock.item_id)
+        .subquery()
+    )
+    items = {item_id: (None, None, 0) for item_id in item_ids}
+    for item_id, name, sku, available in db.execute(
+        select(
+            Item.id,
+            Item.name,
+            Item.sku,
+            Item.quantity_on_hand
+            - Item.quantity_reserved
+            + func.coalesce(located.c.available, 0),
+        )
+        .outerjoin(located, located.c.item_id == Item.id)
+        .where(Item.id.in_(item_ids))
+    ):
+        items[item_id] = (name, sku, available)
+    stock = np.fromiter((items[i][2] for i in item_ids), dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cover = np.where(rates > 0, np.maximum(stock, 0) / rates, np.nan)
+
+    return [
+        ConsumptionForecast(
+            item_id=item_id,
+            item_name=items[item_id][0],
+            item_sku=items[item_id][1],
+            quantity_available=items[item_id][2],
+            consumed={w: int(totals[i]) for w, totals in consumed.items()},
+            daily_rate=float(rates[i]),
+            days_of_cover=None if np.isnan(cover[i]) else float(cover[i]),
+        )
+        for i, item_id in enumerate(item_ids)
+    ]
@@ -0,0 +1,305 @@
+"""Ranked prefix and typo-tolerant item search for autocomplete.
+
+On Postgres the search runs in the database against pg_trgm GIN indexes on
+name, SKU and barcode. Other databases (SQLite in development and tests) use
+an in-process index instead: a sorted token list for prefix lookups and a
+trigram posting list for fuzzy matches. The in-process index is built on
+first use and kept current from committed ORM changes to items.
+
+Both paths only rank ids; callers load the matching rows so stock figures are
+always fresh.
+"""
+
+import bisect
+import heapq
+import re
+import threading
+from collections import Counter, defaultdict
+
+from sqlalchemy import case, event, func, inspect, literal, or_, select
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.models import Item
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+_SEARCHED_FIELDS = ("name", "sku", "barcode")
+
+# Minimum trigram similarity for a fuzzy match, as pg_trgm's default.
+SIMILARITY_THRESHOLD = 0.3
+# Cap on tokens expanded per prefix so one-letter queries stay fast.
+MAX_PREFIX_EXPANSION = 5000
+
+EXACT_SCORE = 3.0
+PREFIX_SCORE = 2.0
+
+
+def _tokens(text: str | None) -> list[str]:
+    return _TOKEN.findall(text.lower()) if text else []
+
+
+def _trigrams(token: str) -> set[str]:
+    padded = f"  {token} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+class ItemSearchIndex:
+    """In-memory search index over item name, SKU and barcode."""
+
+    def __init__(self) -> None:
+        self._lock = threading.RLock()
+        self._reset()
+
+    def _reset(self) -> None:
+        self._loaded = False
+        self._item_tokens: dict[int, set[str]] = {}
+        self._item_codes: dict[int, set[str]] = {}
+        self._token_items: dict[str, set[int]] = defaultdict(set)
+        self._sorted_tokens: list[str] = []
+        self._trigram_tokens: dict[str, set[str]] = defaultdict(set)
+        self._token_trigrams: dict[str, int] = {}
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+    def load(self, db: Session) -> None:
+        rows = db.execute(select(Item.id, Item.name, Item.sku, Item.barcode))
+        with self._lock:
+            self._reset()
+            for item_id, name, sku, barcode in rows:
+                self._add(item_id, name, sku, barcode, bulk=True)
+            self._sorted_tokens.sort()
+            self._loaded = True
+
+    def upsert(self, item_id: int, name: str, sku: str, barcode: str | None) -> None:
+        with self._lock:
+            self._remove(item_id)
+            self._add(item_id, name, sku, barcode)
+
+    def remove(self, item_id: int) -> None:
+        with self._lock:
+            self._remove(item_id)
+
+    def _add(
+        self,
+        item_id: int,
+        name: str,
+        sku: str,
+        barcode: str | None,
+        bulk: bool = False,
+    ) -> None:
+        # Whole SKU/barcode strings are kept as codes for exact matches
+        codes = {code.lower() for code in (sku, barcode) if code}
+        tokens = {*_tokens(name), *_tokens(sku), *_tokens(barcode), *codes}
+        self._item_tokens[item_id] = tokens
+        self._item_codes[item_id] = codes
+        for token in tokens:
+            if not self._token_items[token]:
+                if bulk:
+                    self._sorted_tokens.append(token)
+                else:
+                    bisect.insort(self._sorted_tokens, token)
+                # Typos in pure numbers aren't worth matching; they only
+                # bloat the trigram postings.
+                if not token.isdigit():
+                    trigrams = _trigrams(token)
+                    self._token_trigrams[token] = len(trigrams)
+                    for trigram in trigrams:
+                        self._trigram_tokens[trigram].add(token)
+            self._token_items[token].add(item_id)
+
+    def _remove(self, item_id: int) -> None:
+        for token in self._item_tokens.pop(item_id, ()):
+            holders = self._token_items[token]
+            holders.discard(item_id)
+            if not holders:
+                del self._token_items[token]
+                index = bisect.bisect_left(self._sorted_tokens, token)
+                del self._sorted_tokens[index]
+                if self._token_trigrams.pop(token, None) is not None:
+                    for trigram in _trigrams(token):
+                        self._trigram_tokens[trigram].discard(token)
+        self._item_codes.pop(item_id, None)
+
+    def _match_word(
+        self, word: str, limit: int, top_only: bool = False
+    ) -> dict[int, float]:
+        """Best score per item for one query word.
+
+        Fuzzy matching is a fallback for words with fewer than ``limit``
+        prefix hits, which is what keeps common prefixes cheap. With
+        ``top_only`` only enough items to fill ``limit`` are scored.
+        """
+        scores: dict[int, float] = {}
+
+        start = bisect.bisect_left(self._sorted_tokens, word)
+        end = min(start + MAX_PREFIX_EXPANSION, len(self._sorted_tokens))
+        completions = []
+        for token in self._sorted_tokens[start:end]:
+            if not token.startswith(word):
+                break
+            completions.append(token)
+
+        # Shorter completions rank higher: "cam" prefers "camera" over
+        # "camerabracket". Walking them shortest first lets a lone word stop
+        # as soon as the best ``limit`` items are settled.
+        completions.sort(key=len)
+        for i, token in enumerate(completions):
+            score = PREFIX_SCORE - (len(token) - len(word)) / (len(token) + 1)
+            if not scores:
+                scores = dict.fromkeys(self._token_items[token], score)
+            else:
+                for item_id in self._token_items[token]:
+                    if score > scores.get(item_id, 0):
+                        scores[item_id] = score
+            if (
+                top_only
+                and len(scores) >= limit
+                and i + 1 < len(completions)
+                and len(completions[i + 1]) > len(token)
+            ):
+                break
+
+        if len(word) < 3 or len(scores) >= limit:
+            return scores
+
+        query_trigrams = _trigrams(word)
+        shared: Counter[str] = Counter()
+        for trigram in query_trigrams:
+            shared.update(self._trigram_tokens.get(trigram, ()))
+        for token, hits in shared.items():
+            union = len(query_trigrams) + self._token_trigrams[token] - hits
+            similarity = hits / union
+            if similarity < SIMILARITY_THRESHOLD:
+                continue
+            for item_id in self._token_items[token]:
+                if similarity > scores.get(item_id, 0):
+                    scores[item_id] = similarity
+        return scores
+
+    def search(self, query: str, limit: int) -> list[tuple[int, float]]:
+        """Rank items matching every word of ``query``; best first."""
+        words = _tokens(query)
+        if not words:
+            return []
+        code = query.strip().lower()
+
+        with self._lock:
+            totals: dict[int, float] | None = None
+            for word in words:
+                scores = self._match_word(word, limit, top_only=len(words) == 1)
+                if totals is None:
+                    totals = scores
+                else:
+                    totals = {
+                        item_id: totals[item_id] + score
+                        for item_id, score in scores.items()
+                        if item_id in totals
+                    }
+                if not totals:
+                    return []
+
+            ranked = {
+                item_id: total / len(words)
+                + (EXACT_SCORE if code in self._item_codes[item_id] else 0)
+                for item_id, total in (totals or {}).items()
+            }
+
+        return heapq.nsmallest(
+            limit, ranked.items(), key=lambda entry: (-entry[1], entry[0])
+        )
+
+
+search_index = ItemSearchIndex()
+
+
+def search_items_postgres(db: Session, query: str, limit: int) -> list[int]:
+    """Rank item ids with pg_trgm; uses the GIN trigram indexes."""
+    q = query.strip().lower()
+    name = func.lower(Item.name)
+    sku = func.lower(Item.sku)
+    barcode = func.lower(func.coalesce(Item.barcode, ""))
+
+    score = (
+        func.greatest(
+            func.word_similarity(q, name),
+            func.similarity(sku, q),
+            func.similarity(barcode, q),
+        )
+        + case((or_(sku == q, barcode == q), EXACT_SCORE), else_=0)
+        + case(
+            (
+                or_(
+                    name.startswith(q, autoescape=True),
+                    sku.startswith(q, autoescape=True),
+                    barcode.startswith(q, autoescape=True),
+                ),
+                PREFIX_SCORE,
+            ),
+            else_=0,
+        )
+    )
+    rows = db.execute(
+        select(Item.id)
+        .where(
+            or_(
+                literal(q).op("<%")(name),
+                sku.op("%")(q),
+                barcode.op("%")(q),
+                name.startswith(q, autoescape=True),
+                sku.startswith(q, autoescape=True),
+                barcode.startswith(q, autoescape=True),
+            )
+        )
+        .order_by(score.desc(), Item.name)
+        .limit(limit)
+    )
+    return list(rows.scalars())
+
+
+def search_items(db: Session, query: str, limit: int) -> list[int]:
+    """Return up to ``limit`` matching item ids, best match first."""
+    if db.get_bind().dialect.name == "postgresql":
+        return search_items_postgres(db, query, limit)
+
+    if not search_index.loaded:
+        search_index.load(db)
+    return [item_id for item_id, _ in search_index.search(query, limit)]
+
+
+def _collect_item_changes(session: Session, flush_context) -> None:
+    changes = session.info.setdefault("search_index_changes", {})
+    for obj in session.new:
+        if isinstance(obj, Item):
+            changes[obj.id] = (obj.name, obj.sku, obj.barcode)
+    for obj in session.dirty:
+        if isinstance(obj, Item) and any(
+            inspect(obj).attrs[field].history.has_changes()
+            for field in _SEARCHED_FIELDS
+        ):
+            changes[obj.id] = (obj.name, obj.sku, obj.barcode)
+    for obj in session.deleted:
+        if isinstance(obj, Item):
+            changes[obj.id] = None
+
+
+def _apply_item_changes(session: Session) -> None:
+    changes = session.info.pop("search_index_changes", None)
+    if not changes or not search_index.loaded:
+        return
+    for item_id, fields in changes.items():
+        if fields is None:
+            search_index.remove(item_id)
+        else:
+            search_index.upsert(item_id, *fields)
+
+
+def _discard_item_changes(session: Session) -> None:
+    session.info.pop("search_index_changes", None)
+
+
+def track_item_changes(session_factory: sessionmaker) -> None:
+    """Keep the in-process index current from committed item changes."""
+    event.listen(session_factory, "after_flush", _collect_item_changes)
+    event.listen(session_factory, "after_commit", _apply_item_changes)
+    event.listen(session_factory, "after_rollback", _discard_item_changes)
@@ -0,0 +1,221 @@
+"""Per-location stock movements and build capacity.
+
+Assemblies built at a location reserve and consume that location's
+``item_stock`` rows, never the shared ``items`` rows, so sites only contend
+with themselves. Movements are relative, guarded UPDATEs rather than
+read-modify-write, and summary deltas are recorded alongside them because
+they bypass the ORM flush hooks. Recording a delta is an insert, so it takes
+no lock another site could wait on.
+"""
+
+from collections import Counter
+
+from sqlalchemy import and_, case, func, select, true, update
+from sqlalchemy.orm import Session
+
+from app.models import (
+    Configuration,
+    ConfigurationComponent,
+    Item,
+    ItemStock,
+    Location,
+)
+from app.services.summary import apply_summary_deltas
+
+
+class StockError(Exception):
+    """Stock at a location cannot cover a request; the message is user-facing."""
+
+
+def _apply_stock_deltas(
+    db: Session, on_hand: dict[int, int], reserved: dict[int, int]
+) -> None:
+    item_ids = on_hand.keys() | reserved.keys()
+    types = dict(
+        db.execute(select(Item.id, Item.type).where(Item.id.in_(item_ids)))
+        .tuples()
+        .all()
+    )
+    deltas: Counter = Counter()
+    for item_id, quantity in on_hand.items():
+        deltas[("on_hand", types[item_id])] += quantity
+    for item_id, quantity in reserved.items():
+        deltas[("reserved", types[item_id])] += quantity
+    apply_summary_deltas(db, deltas)
+
+
+def reserve_location_stock(
+    db: Session, location: Location, needed: dict[int, int]
+) -> None:
+    """Reserve ``needed`` units per item at ``location`` or raise StockError.
+
+    Each row is only updated while it still has the stock, so concurrent
+    reservations at the same site cannot oversell. The caller commits or
+    rolls back.
+    """
+    names = dict(
+        db.execute(select(Item.id, Item.name).where(Item.id.in_(needed))).tuples().all()
+    )
+    for item_id in needed:
+        if item_id not in names:
+            raise StockError(f"Item {item_id} not found")
+
+    # Fixed lock order so overlapping reservations cannot deadlock
+    for item_id in sorted(needed):
+        quantity = needed[item_id]
+        reserved = db.scalar(
+            update(ItemStock)
+            .where(
+                ItemStock.location_id == location.id,
+                ItemStock.item_id == item_id,
+                ItemStock.quantity_on_hand - ItemStock.quantity_reserved >= quantity,
+            )
+            .values(quantity_reserved=ItemStock.quantity_reserved + quantity)
+            .returning(ItemStock.quantity_reserved)
+        )
+        if reserved is None:
+            available = db.scalar(
+                select(ItemStock.quantity_on_hand - ItemStock.quantity_reserved).where(
+                    ItemStock.location_id == location.id,
+                    ItemStock.item_id == item_id,
+                )
+            )
+            raise StockError(
+                f"Insufficient stock for {names[item_id]} at {location.code}: "
+                f"need {quantity}, have {available or 0}"
+            )
+    _apply_stock_deltas(db, {}, needed)
+
+
+def _move_location_stock(
+    db: Session, location_id: int, quantities: dict[int, int], consume: bool
+) -> None:
+    for item_id in sorted(quantities):
+        quantity = quantities[item_id]
+        values = {"quantity_reserved": ItemStock.quantity_reserved - quantity}
+        if consume:
+            values["quantity_on_hand"] = ItemStock.quantity_on_hand - quantity
+        db.execute(
+            update(ItemStock)
+            .where(ItemStock.location_id == location_id, ItemStock.item_id == item_id)
+            .values(values)
+        )
+    released = {item_id: -quantity for item_id, quantity in quantities.items()}
+    _apply_stock_deltas(db, released if consume else {}, released)
+
+
+def consume_location_stock(
+    db: Session, location_id: int, quantities: dict[int, int]
+) -> None:
+    """Turn reservations at a location into consumption."""
+    _move_location_stock(db, location_id, quantities, consume=True)
+
+
+def release_location_stock(
+    db: Session, location_id: int, quantities: dict[int, int]
+) -> None:
+    """Give reserved units at a location back to its available stock."""
+    _move_location_stock(db, location_id, quantities, consume=False)
+
+
+def _builds(available, quantity):
+    """SQL expression for the whole builds one component line allows."""
+    return case(
+        (quantity <= 0, 0),
+        (available <= 0, 0),
+        else_=available // quantity,
+    )
+
+
+def build_capacity(db: Session) -> list[dict]:
+    """Configurations buildable per location and across the whole network.
+
+    Two grouped queries: one over configuration components x locations, one
+    over configuration components against network-wide stock (the unlocated
+    pool plus every location). A configuration without components can build 0.
+    """
+    cc = ConfigurationComponent
+    available = func.coalesce(
+        ItemStock.quantity_on_hand - ItemStock.quantity_reserved, 0
+    )
+    per_location = db.execute(
+        select(
+            cc.configuration_id,
+            Location.id,
+            func.min(_builds(available, cc.quantity)),
+        )
+        .select_from(cc)
+        .join(Location, true())
+        .outerjoin(
+            ItemStock,
+            and_(
+                ItemStock.location_id == Location.id,
+                ItemStock.item_id == cc.item_id,
+            ),
+        )
+        .group_by(cc.configuration_id, Location.id)
+    ).all()
+
+    located = (
+        select(
+            ItemStock.item_id,
+            func.sum(ItemStock.quantity_on_hand - ItemStock.quantity_reserved).label(
+                "available"
+            ),
+        )
+        .group_by(ItemStock.item_id)
+        .subquery()
+    )
+    network_available = (
+        Item.quantity_on_hand
+        - Item.quantity_reserved
+        + func.coalesce(located.c.available, 0)
+    )
+    network = db.execute(
+        select(
+            cc.configuration_id,
+            # A component whose item no longer exists blocks the build
+            func.min(
+                case(
+                    (Item.id.is_(None), 0),
+                    else_=_builds(network_available, cc.quantity),
+                )
+            ),
+        )
+        .select_from(cc)
+        .outerjoin(Item, Item.id == cc.item_id)
+        .outerjoin(located, located.c.item_id == cc.item_id)
+        .group_by(cc.configuration_id)
+    ).all()
+
+    locations = db.execute(select(Location.id, Location.code).order_by(Location.id))
+    codes = dict(locations.tuples().all())
+    result = {
+        config_id: {
+            "configuration_id": config_id,
+            "configuration_name": name,
+            "can_build": 0,
+            "locations": {
+                location_id: {
+                    "location_id": location_id,
+                    "location_code": code,
+                    "can_build": 0,
+                }
+                for location_id, code in codes.items()
+            },
+        }
+        for config_id, name in db.execute(
+            select(Configuration.id, Configuration.name).order_by(Configuration.id)
+        )
+    }
+    for config_id, can_build in network:
+        if config_id in result:
+            result[config_id]["can_build"] = can_build or 0
+    for config_id, location_id, can_build in per_location:
+        if config_id in result:
+            result[config_id]["locations"][location_id]["can_build"] = can_build or 0
+
+    return [
+        {**entry, "locations": list(entry["locations"].values())}
+        for entry in result.values()
+    ]
@@ -0,0 +1,248 @@
+"""Transactional outbox for integration events.
+
+State changes that other systems care about add an ``outbox_events`` row in
+the same transaction, so an event exists exactly when its change committed
+and nothing external runs on the request path. :class:`OutboxWorker` posts
+pending events in batches to ``OUTBOX_URL`` and marks them delivered.
+
+Delivery is at least once: receivers deduplicate on the event ``id``. Events
+of one aggregate are delivered in order; a failed batch is retried with
+exponential backoff, and until it succeeds later events of the same
+aggregates wait behind it while other aggregates carry on. Run a single
+worker per database (``python -m app.cli deliver-outbox``).
+
+A 4xx response other than 408 and 429 means the receiver will never take
+the request as it is, so retrying it would block its aggregates forever.
+A refused batch is split and its events sent one at a time; an event
+refused on its own, or still failing after ``OUTBOX_MAX_ATTEMPTS``, is
+marked failed (``failed_at``) and later events of its aggregate go on
+without it. Failed events stay in the table for inspection and replay.
+"""
+
+import json
+import logging
+import threading
+import urllib.error
+import urllib.request
+from collections.abc import Callable
+from datetime import timedelta
+
+from sqlalchemy import exists, select, update
+from sqlalchemy.orm import Session, aliased, sessionmaker
+
+from app.models import OutboxEvent
+from app.models.base import utcnow
+
+logger = logging.getLogger(__name__)
+
+
+def record_event(
+    db: Session,
+    aggregate_type: str,
+    aggregate_id: int,
+    event_type: str,
+    payload: dict,
+) -> None:
+    """Queue an event; it is only delivered if the caller's transaction commits."""
+    db.add(
+        OutboxEvent(
+            aggregate_type=aggregate_type,
+            aggregate_id=aggregate_id,
+            event_type=event_type,
+            payload=json.dumps(payload, default=str, separators=(",", ":")),
+        )
+    )
+
+
+def post_json(url: str, body: bytes, timeout: float) -> None:
+    """POST ``body``; raises on connection errors and non-2xx responses."""
+    request = urllib.request.Request(
+        url, data=body, headers={"Content-Type": "application/json"}, method="POST"
+    )
+    with urllib.request.urlopen(request, timeout=timeout) as response:
+        response.read()
+
+
+def refused(exc: Exception) -> bool:
+    """Whether a send failed because the receiver won't ever accept the request."""
+    return (
+        isinstance(exc, urllib.error.HTTPError)
+        and 400 <= exc.code < 500
+        and exc.code not in (408, 429)
+    )
+
+
+class OutboxWorker:
+    """Deliver pending outbox events in batches."""
+
+    def __init__(
+        self,
+        session_factory: sessionmaker,
+        url: str,
+        batch_size: int = 100,
+        interval: float = 1.0,
+        backoff_base: float = 1.0,
+        backoff_max: float = 300.0,
+        timeout: float = 10.0,
+        max_attempts: int = 10,
+        send: Callable[[str, bytes, float], None] = post_json,
+    ) -> None:
+        self.session_factory = session_factory
+        self.url = url
+        self.batch_size = batch_size
+        self.interval = interval
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.timeout = timeout
+        self.max_attempts = max_attempts
+        self.send = send
+        self._stop = threading.Event()
+        self._worker: threading.Thread | None = None
+
+    def backoff(self, attempts: int) -> timedelta:
+        delay = self.backoff_base * 2 ** (attempts - 1)
+        return timedelta(seconds=min(delay, self.backoff_max))
+
+    def next_batch(self, db: Session, now) -> list[OutboxEvent]:
+        """Due events in id order, skipping aggregates blocked by a retry.
+
+        An event is held back when it, or an earlier pending event of its
+        aggregate, is waiting out a backoff. That is decided in the query, so
+        a long run of blocked events can't crowd due ones out of the batch.
+        """
+        waiting = aliased(OutboxEvent)
+        return list(
+            db.scalars(
+                select(OutboxEvent)
+                .where(
+                    OutboxEvent.delivered_at.is_(None),
+                    OutboxEvent.failed_at.is_(None),
+                    ~exists().where(
+                        waiting.delivered_at.is_(None),
+                        waiting.failed_at.is_(None),
+                        waiting.aggregate_type == OutboxEvent.aggregate_type,
+                        waiting.aggregate_id == OutboxEvent.aggregate_id,
+                        waiting.id <= OutboxEvent.id,
+                        waiting.next_attempt_at > now,
+                    ),
+                )
+                .order_by(OutboxEvent.id)
+                .limit(self.batch_size)
+            )
+        )
+
+    def _post(self, events: list[dict]) -> Exception | None:
+        """Send ``events``; returns why it failed, or ``None``."""
+        body = json.dumps({"events": events}, separators=(",", ":")).encode()
+        try:
+            self.send(self.url, body, self.timeout)
+        except Exception as exc:
+            return exc
+        return None
+
+    def deliver_once(self, now=None) -> int:
+        """Send one batch; returns the number of events delivered."""
+        now = now or utcnow()
+        with self.session_factory() as db:
+            batch = self.next_batch(db, now)
+            if not batch:
+                return 0
+            attempts = {event.id: event.attempts for event in batch}
+            events = [
+                {
+                    "id": event.id,
+                    "type": event.event_type,
+                    "aggregate_type": event.aggregate_type,
+                    "aggregate_id": event.aggregate_id,
+                    "created_at": event.created_at.isoformat(),
+                    "payload": json.loads(event.payload),
+                }
+                for event in batch
+            ]
+            # Don't hold a transaction open across the HTTP calls
+            db.rollback()
+
+            delivered: list[int] = []
+            errors: dict[int, Exception] = {}
+            error = self._post(events)
+            if error is None:
+                delivered = list(attempts)
+            elif refused(error) and len(events) > 1:
+                # Find the events the receiver refuses by sending them singly
+                blocked: set[tuple[str, int]] = set()
+                for event in events:
+                    aggregate = (event["aggregate_type"], event["aggregate_id"])
+                    if aggregate in blocked:
+                        continue  # Still pending, behind an event to retry
+                    alone = self._post([event])
+                    if alone is None:
+                        delivered.append(event["id"])
+                        continue
+                    errors[event["id"]] = alone
+                    if not refused(alone):
+                        blocked.add(aggregate)
+            else:
+                errors = dict.fromkeys(attempts, error)
+
+            failed = {
+                event_id
+                for event_id, reason in errors.items()
+                if refused(reason) or attempts[event_id] + 1 >= self.max_attempts
+            }
+            if errors:
+                by_reason: dict[str, list[int]] = {}
+                for event_id, reason in errors.items():
+                    by_reason.setdefault(str(reason), []).append(event_id)
+                for reason, event_ids in by_reason.items():
+                    logger.warning(
+                        "Outbox delivery of events %s failed: %s", event_ids, reason
+                    )
+                if failed:
+                    logger.error("Outbox events marked failed: %s", sorted(failed))
+                db.execute(
+                    update(OutboxEvent),
+                    [
+                        {
+                            "id": event_id,
+                            "attempts": attempts[event_id] + 1,
+                            "next_attempt_at": now
+                            + self.backoff(attempts[event_id] + 1),
+                            "failed_at": now if event_id in failed else None,
+                            "last_error": str(reason)[:1000],
+                        }
+                        for event_id, reason in errors.items()
+                    ],
+                )
+            if delivered:
+                db.execute(
+                    update(OutboxEvent)
+                    .where(OutboxEvent.id.in_(delivered))
+                    .values(delivered_at=utcnow(), last_error=None)
+                )
+            db.commit()
+            return len(delivered)
+
+    def run(self) -> None:
+        """Deliver until stopped, straight on while there is a backlog."""
+        while not self._stop.is_set():
+            try:
+                delivered = self.deliver_once()
+            except Exception:
+                logger.exception("Outbox worker iteration failed")
+                delivered = 0
+            if delivered < self.batch_size:
+                self._stop.wait(self.interval)
+
+    def start(self) -> None:
+        if self._worker is None:
+            self._stop.clear()
+            self._worker = threading.Thread(
+                target=self.run, name="outbox-worker", daemon=True
+            )
+            self._worker.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._worker is not None:
+            self._worker.join()
+            self._worker = None
@@ -0,0 +1,212 @@
+"""Bulk goods receiving and stock adjustments.
+
+Lines are checked in order against the locked items: a line is accepted
+if on-hand stock stays at or above what is reserved after it and the lines
+accepted before it, so a rejected line never takes other lines for the same
+item down with it. Accepted lines are applied by one ``UPDATE items ... FROM
+(VALUES ...)`` statement with relative arithmetic, so concurrent writers
+never lose each other's changes and clients never compute new totals
+themselves. The statement bypasses the ORM, so summary totals, the capacity
+index, inventory transactions and FIFO cost layers are written here.
+"""
+
+from collections import Counter
+from dataclasses import dataclass
+from decimal import Decimal
+
+from sqlalchemy import (
+    Integer,
+    case,
+    column,
+    insert,
+    literal,
+    select,
+    union_all,
+    update,
+    values,
+)
+from sqlalchemy.orm import Session
+
+from app.models import InventoryTransaction, Item
+from app.models.base import utcnow
+from app.services.capacity_index import mark_capacity_changes
+from app.services.summary import apply_summary_deltas
+from app.services.valuation import consume_cost_layers, open_cost_layers
+
+
+@dataclass
+class ReceiveLine:
+    item_id: int | None = None
+    sku: str | None = None
+    received: int = 0
+    adjustment: int = 0
+    unit_cost: Decimal | None = None
+
+
+@dataclass
+class LineResult:
+    line: int
+    status: str = "ok"  # "ok", "not_found" or "rejected"
+    item_id: int | None = None
+    sku: str | None = None
+    detail: str | None = None
+    quantity_on_hand: int | None = None
+    quantity_on_order: int | None = None
+
+
+def _values_source(rows: list[tuple[int, int, int]], dialect: str):
+    names = ("item_id", "received", "adjustment")
+    if dialect == "postgresql":
+        return values(*(column(n, Integer) for n in names), name="v").data(rows)
+    # SQLite has no column aliases on VALUES; a UNION ALL of rows is equivalent
+    return union_all(
+        *(
+            select(*(literal(value).label(n) for value, n in zip(row, names)))
+            for row in rows
+        )
+    ).subquery("v")
+
+
+def receive_stock(
+    db: Session,
+    lines: list[ReceiveLine],
+    reference_id: int | None = None,
+    notes: str | None = None,
+) -> list[LineResult]:
+    """Apply receiving/adjustment lines and commit; one result per line."""
+    results = [
+        LineResult(line=i, item_id=line.item_id, sku=line.sku)
+        for i, line in enumerate(lines)
+    ]
+
+    skus = {line.sku for line in lines if line.item_id is None and line.sku}
+    ids = {line.item_id for line in lines if line.item_id is not None}
+    known = db.execute(
+        select(
+            Item.id,
+            Item.sku,
+            Item.type,
+            Item.quantity_on_hand,
+            Item.quantity_reserved,
+            Item.quantity_on_order,
+        )
+        .where(Item.id.in_(ids) | Item.sku.in_(skus))
+        .order_by(Item.id)
+        .with_for_update()
+    ).all()
+    by_sku = {row.sku: row.id for row in known}
+    rows = {row.id: row for row in known}
+
+    # Accepted lines for the same item are applied together; receipts at
+    # different unit costs stay separate cost layers
+    received: Counter[int] = Counter()
+    receipts: Counter[tuple[int, Decimal | None]] = Counter()
+    adjusted: Counter[int] = Counter()
+    line_items: dict[int, int] = {}
+    levels = {row.id: (row.quantity_on_hand, row.quantity_on_order) for row in known}
+    for i, line in enumerate(lines):
+        item_id = line.item_id if line.item_id is not None else by_sku.get(line.sku)
+        if item_id is None or item_id not in rows:
+            results[i].status = "not_found"
+            results[i].detail = "Item not found"
+            continue
+        results[i].item_id = item_id
+        results[i].sku = rows[item_id].sku
+        on_hand, on_order = levels[item_id]
+        on_hand += line.received + line.adjustment
+        if on_hand < rows[item_id].quantity_reserved:
+            results[i].status = "rejected"
+            results[i].detail = "On hand would fall below reserved stock"
+            continue
+        # Receiving more than was on order leaves nothing on order
+        on_order = max(on_order - line.received, 0)
+        levels[item_id] = (on_hand, on_order)
+        results[i].quantity_on_hand = on_hand
+        results[i].quantity_on_order = on_order
+        line_items[i] = item_id
+        received[item_id] += line.received
+        receipts[(item_id, line.unit_cost)] += line.received
+        adjusted[item_id] += line.adjustment
+
+    item_ids = sorted(set(line_items.values()))
+    updated = {}
+    if item_ids:
+        source = _values_source(
+            [(i, received[i], adjusted[i]) for i in item_ids],
+            db.get_bind().dialect.name,
+        )
+        new_on_hand = Item.quantity_on_hand + source.c.received + source.c.adjustment
+        # Receiving more than was on order leaves nothing on order
+        new_on_order = case(
+            (
+                Item.quantity_on_order > source.c.received,
+                Item.quantity_on_order - source.c.received,
+            ),
+            else_=0,
+        )
+        stmt = (
+            update(Item)
+            .where(Item.id == source.c.item_id, new_on_hand >= Item.quantity_reserved)
+            .values(quantity_on_hand=new_on_hand, quantity_on_order=new_on_order)
+            .returning(Item.id, Item.quantity_on_hand, Item.quantity_on_order)
+            .execution_options(synchronize_session=False)
+        )
+        updated = {row.id: row for row in db.execute(stmt)}
+
+    deltas: Counter = Counter()
+    for item_id in updated:
+        row, new = rows[item_id], updated[item_id]
+        deltas[("on_hand", row.type)] += received[item_id] + adjusted[item_id]
+        deltas[("on_order", row.type)] += new.quantity_on_order - row.quantity_on_order
+
+    # Receipts before adjustments, the order rebuild_cost_layers replays them
+    now = utcnow()
+    changes = [
+        ("receive", item_id, quantity, unit_cost)
+        for (item_id, unit_cost), quantity in receipts.items()
+        if item_id in updated and quantity
+    ] + [
+        ("adjustment", item_id, adjusted[item_id], None)
+        for item_id in item_ids
+        if item_id in updated and adjusted[item_id]
+    ]
+    transactions = [
+        {
+            "item_id": item_id,
+            "quantity_change": quantity,
+            "type": kind,
+            "unit_cost": unit_cost,
+            "reference_id": reference_id,
+            "notes": notes,
+            "created_at": now,
+        }
+        for kind, item_id, quantity, unit_cost in changes
+    ]
+    layers = [
+        {"item_id": item_id, "quantity": quantity, "unit_cost": unit_cost}
+        for _, item_id, quantity, unit_cost in changes
+        if quantity > 0
+    ]
+    write_offs = {
+        item_id: -quantity
+        for kind, item_id, quantity, _ in changes
+        if kind == "adjustment" and quantity < 0
+    }
+
+    for i, item_id in line_items.items():
+        if item_id not in updated:
+            # Only if the row changed after it was read, which locking prevents
+            result = results[i]
+            result.status = "rejected"
+            result.detail = "On hand would fall below reserved stock"
+            result.quantity_on_hand = result.quantity_on_order = None
+
+    if updated:
+        apply_summary_deltas(db, deltas)
+        if transactions:
+            db.execute(insert(InventoryTransaction), transactions)
+        open_cost_layers(db, layers, received_at=now)
+        consume_cost_layers(db, write_offs)
+        mark_capacity_changes(db, item_ids=set(updated))
+    db.commit()
+    return results
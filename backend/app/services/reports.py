@@ -0,0 +1,205 @@
+"""Background report jobs.
+
+Heavy reports run in a local process pool, never on a request worker. Each
+job opens its own connection in a read-only snapshot (REPEATABLE READ on
+Postgres) so a report sees one consistent state however long it runs. Jobs
+and their results live in ``report_jobs``: a result is stored as JSON with a
+SHA-256 content hash and an expiry, and any app worker can serve it.
+
+Submitting a report that is already pending, or whose result is still fresh,
+returns the existing job instead of starting another.
+"""
+
+import hashlib
+import json
+import logging
+import multiprocessing
+import threading
+import uuid
+from collections.abc import Callable
+from concurrent.futures import Future, ProcessPoolExecutor
+from datetime import timedelta
+
+from sqlalchemy import create_engine, delete, or_, select, union_all
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import NullPool
+
+from app.models import ArchivedAssembly, Assembly, ReportJob
+from app.models.base import utcnow
+from app.services.consumption import forecast_consumption
+from app.services.locations import build_capacity
+
+logger = logging.getLogger(__name__)
+
+
+def build_capacity_report(db: Session, params: dict) -> list[dict]:
+    """Builds possible per configuration, network-wide and per location."""
+    return build_capacity(db)
+
+
+def shortage_report(db: Session, params: dict) -> list[dict]:
+    """Items forecast to run out within ``horizon_days`` at current usage."""
+    horizon = int(params.get("horizon_days", 30))
+    return [
+        {
+            "item_id": f.item_id,
+            "item_name": f.item_name,
+            "item_sku": f.item_sku,
+            "quantity_available": f.quantity_available,
+            "daily_rate": round(f.daily_rate, 4),
+            "days_of_cover": round(f.days_of_cover, 1),
+            "shortfall": max(0, round(f.daily_rate * horizon - f.quantity_available)),
+        }
+        for f in sorted(forecast_consumption(db), key=lambda f: f.days_of_cover or 0)
+        if f.days_of_cover is not None and f.days_of_cover < horizon
+    ]
+
+
+def assembly_history_report(db: Session, params: dict) -> list[dict]:
+    """Every assembly, live and archived, optionally of one status."""
+    columns = (
+        "id",
+        "configuration_id",
+        "location_id",
+        "status",
+        "order_reference",
+        "created_at",
+        "completed_at",
+        "shipped_at",
+        "cancelled_at",
+    )
+    live = select(*(getattr(Assembly, c) for c in columns))
+    archived = select(*(getattr(ArchivedAssembly, c) for c in columns))
+    if params.get("status"):
+        live = live.where(Assembly.status == params["status"])
+        archived = archived.where(ArchivedAssembly.status == params["status"])
+    rows = union_all(live, archived).subquery()
+    return [
+        dict(row._mapping)
+        for row in db.execute(select(rows).order_by(rows.c.created_at, rows.c.id))
+    ]
+
+
+REPORTS: dict[str, Callable[[Session, dict], object]] = {
+    "build-capacity": build_capacity_report,
+    "shortages": shortage_report,
+    "assembly-history": assembly_history_report,
+}
+
+
+def run_report(database_url: str, kind: str, params: dict) -> str:
+    """Run one report in a pool process; returns the result as JSON."""
+    engine = create_engine(database_url, poolclass=NullPool)
+    try:
+        with engine.connect() as connection:
+            if connection.dialect.name == "postgresql":
+                connection = connection.execution_options(
+                    isolation_level="REPEATABLE READ", postgresql_readonly=True
+                )
+            with Session(bind=connection) as db:
+                result = REPORTS[kind](db, params)
+                db.rollback()
+    finally:
+        engine.dispose()
+    return json.dumps(result, default=str, separators=(",", ":"))
+
+
+def canonical_params(params: dict) -> tuple[str, str]:
+    text = json.dumps(params, sort_keys=True, separators=(",", ":"))
+    return text, hashlib.sha256(text.encode()).hexdigest()
+
+
+class ReportRunner:
+    """Submit report jobs to a process pool and record their results."""
+
+    def __init__(
+        self,
+        session_factory: sessionmaker,
+        database_url: str,
+        workers: int = 2,
+        ttl: timedelta = timedelta(hours=1),
+    ) -> None:
+        self.session_factory = session_factory
+        self.database_url = database_url
+        self.workers = workers
+        self.ttl = ttl
+        self._executor: ProcessPoolExecutor | None = None
+        self._lock = threading.Lock()
+
+    def _pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # Spawned, not forked: children must not inherit the app's
+                # open connections or background threads.
+                self._executor = ProcessPoolExecutor(
+                    self.workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._executor
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def submit(self, db: Session, kind: str, params: dict) -> ReportJob:
+        """Start a report, or return an identical pending or fresh job."""
+        if kind not in REPORTS:
+            raise KeyError(kind)
+        params_text, params_hash = canonical_params(params)
+        now = utcnow()
+
+        with self._lock:
+            db.execute(delete(ReportJob).where(ReportJob.expires_at < now))
+            existing = db.scalars(
+                select(ReportJob)
+                .where(
+                    ReportJob.kind == kind,
+                    ReportJob.params_hash == params_hash,
+                    or_(
+                        # A job pending for longer than the TTL was lost
+                        # with its worker; start a fresh one.
+                        (ReportJob.status == "pending")
+                        & (ReportJob.created_at > now - self.ttl),
+                        (ReportJob.status == "done") & (ReportJob.expires_at > now),
+                    ),
+                )
+                .order_by(ReportJob.created_at.desc())
+                .limit(1)
+            ).first()
+            if existing:
+                db.commit()
+                return existing
+
+            job = ReportJob(
+                id=uuid.uuid4().hex,
+                kind=kind,
+                params=params_text,
+                params_hash=params_hash,
+                status="pending",
+            )
+            db.add(job)
+            db.commit()
+
+        future = self._pool().submit(run_report, self.database_url, kind, params)
+        future.add_done_callback(lambda f, job_id=job.id: self._finish(job_id, f))
+        return job
+
+    def _finish(self, job_id: str, future: Future) -> None:
+        with self.session_factory() as db:
+            job = db.get(ReportJob, job_id)
+            if job is None:
+                return
+            job.finished_at = utcnow()
+            try:
+                result = future.result()
+            except Exception as exc:
+                logger.exception("Report job %s (%s) failed", job_id, job.kind)
+                job.status = "failed"
+                job.error = str(exc) or exc.__class__.__name__
+            else:
+                job.status = "done"
+                job.result = result
+                job.content_hash = hashlib.sha256(result.encode()).hexdigest()
+            job.expires_at = job.finished_at + self.ttl
+            db.commit()
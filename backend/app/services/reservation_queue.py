@@ -0,0 +1,239 @@
+"""Group-commit intake for assembly reservations.
+
+During order bursts every ``create_assembly`` call locks and updates the same
+component rows and commits on its own. In queued mode callers put their
+request on an in-process queue instead and wait on a future. One background
+worker drains the queue in short windows, checks availability for the whole
+batch against a single locked read of the items involved, reserves stock
+with one update per item and commits the batch in one transaction. Each
+caller's future then resolves to its assembly id or its own error.
+"""
+
+import logging
+import queue
+import threading
+import time
+from collections import Counter
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.models import (
+    Assembly,
+    AssemblyComponent,
+    Configuration,
+    ConfigurationComponent,
+    Item,
+)
+from app.schemas.assembly import AssemblyCreate
+
+logger = logging.getLogger(__name__)
+
+
+class ReservationError(Exception):
+    """A queued request that cannot be reserved; the message is user-facing."""
+
+
+@dataclass
+class _Request:
+    assembly_in: AssemblyCreate
+    future: Future = field(default_factory=Future)
+
+
+class ReservationQueue:
+    """Batch assembly reservations from many callers into one transaction."""
+
+    def __init__(
+        self,
+        session_factory: sessionmaker,
+        window: float = 0.005,
+        max_batch: int = 100,
+    ) -> None:
+        self.session_factory = session_factory
+        self.window = window
+        self.max_batch = max_batch
+        self._queue: queue.Queue[_Request | None] = queue.Queue()
+        self._worker: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+    def submit(self, assembly_in: AssemblyCreate) -> Future:
+        """Queue a reservation; the future resolves to the new assembly id."""
+        self._ensure_worker()
+        request = _Request(assembly_in)
+        self._queue.put(request)
+        return request.future
+
+    def reserve(self, assembly_in: AssemblyCreate, timeout: float | None = None) -> int:
+        """Queue a reservation and wait for its batch to commit."""
+        future = self.submit(assembly_in)
+        try:
+            return future.result(timeout)
+        except TimeoutError:
+            # Withdraw it if still queued; once its batch is running, the
+            # outcome is moments away and must be reported, not dropped.
+            if future.cancel():
+                raise
+            return future.result()
+
+    def stop(self) -> None:
+        """Finish queued work and stop the worker."""
+        with self._lock:
+            worker, self._worker = self._worker, None
+        if worker is not None:
+            self._queue.put(None)
+            worker.join()
+
+    def _ensure_worker(self) -> None:
+        with self._lock:
+            if self._worker is None:
+                self._worker = threading.Thread(
+                    target=self._run, name="reservation-queue", daemon=True
+                )
+                self._worker.start()
+
+    def _run(self) -> None:
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            batch = [first]
+            deadline = time.monotonic() + self.window
+            stopping = False
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    request = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if request is None:
+                    stopping = True
+                    break
+                batch.append(request)
+
+            batch = [r for r in batch if r.future.set_running_or_notify_cancel()]
+            if batch:
+                self._process(batch)
+            if stopping:
+                return
+
+    def _process(self, batch: list[_Request]) -> None:
+        try:
+            with self.session_factory() as db:
+                results = reserve_batch(db, [r.assembly_in for r in batch])
+        except Exception as exc:
+            logger.exception("Reservation batch of %d failed", len(batch))
+            for request in batch:
+                request.future.set_exception(exc)
+            return
+
+        for request, result in zip(batch, results):
+            if isinstance(result, Exception):
+                request.future.set_exception(result)
+            else:
+                request.future.set_result(result)
+
+
+def reserve_batch(
+    db: Session, requests: list[AssemblyCreate]
+) -> list[int | ReservationError]:
+    """Reserve stock for ``requests`` in arrival order and commit once.
+
+    Returns an assembly id or a :class:`ReservationError` per request. A
+    request that cannot be met is skipped without affecting the others.
+    """
+    # An unknown configuration must fail its own request, not the batch's
+    # commit on the foreign key
+    referenced = {r.configuration_id for r in requests if r.configuration_id}
+    known_configs = set(
+        db.scalars(select(Configuration.id).where(Configuration.id.in_(referenced)))
+        if referenced
+        else ()
+    )
+    config_ids = {
+        r.configuration_id
+        for r in requests
+        if r.configuration_id in known_configs and not r.components
+    }
+    config_components: dict[int, list[tuple[int, int]]] = {i: [] for i in config_ids}
+    if config_ids:
+        for cc in db.query(ConfigurationComponent).filter(
+            ConfigurationComponent.configuration_id.in_(config_ids)
+        ):
+            config_components[cc.configuration_id].append((cc.item_id, cc.quantity))
+
+    wanted: list[list[tuple[int, int]]] = [
+        [(c.item_id, c.quantity) for c in r.components]
+        if r.components or not r.configuration_id
+        else config_components.get(r.configuration_id, [])
+        for r in requests
+    ]
+
+    item_ids = {item_id for components in wanted for item_id, _ in components}
+    items = {
+        item.id: item
+        for item in db.query(Item)
+        .filter(Item.id.in_(item_ids))
+        .order_by(Item.id)
+        .with_for_update()
+    }
+    available = {item_id: item.quantity_available for item_id, item in items.items()}
+
+    results: list[int | ReservationError | None] = []
+    accepted: list[tuple[int, Assembly]] = []
+    reserved: Counter[int] = Counter()
+    for i, (assembly_in, components) in enumerate(zip(requests, wanted)):
+        needed: Counter[int] = Counter()
+        for item_id, quantity in components:
+            needed[item_id] += quantity
+        error = None
+        config_id = assembly_in.configuration_id
+        if config_id and config_id not in known_configs:
+            error = ReservationError("Configuration not found")
+        for item_id in needed:
+            if error:
+                break
+            item = items.get(item_id)
+            if item is None:
+                error = ReservationError(f"Item {item_id} not found")
+            elif available[item_id] < needed[item_id]:
+                error = ReservationError(
+                    f"Insufficient stock for {item.name}: "
+                    f"need {needed[item_id]}, have {available[item_id]}"
+                )
+        results.append(error)
+        if error:
+            continue
+
+        for item_id, quantity in needed.items():
+            available[item_id] -= quantity
+        reserved.update(needed)
+        assembly = Assembly(
+            configuration_id=assembly_in.configuration_id,
+            order_reference=assembly_in.order_reference,
+            notes=assembly_in.notes,
+            status="reserved",
+        )
+        db.add(assembly)
+        accepted.append((i, assembly))
+
+    if not accepted:
+        db.rollback()
+        return results  # type: ignore[return-value]
+
+    db.flush()  # Assembly ids, in one multi-row insert
+    for i, assembly in accepted:
+        db.add_all(
+            AssemblyComponent(assembly_id=assembly.id, item_id=item_id, quantity=qty)
+            for item_id, qty in wanted[i]
+        )
+        results[i] = assembly.id
+    # One aggregated update per item for the whole batch
+    for item_id, quantity in reserved.items():
+        items[item_id].quantity_reserved += quantity
+
+    db.commit()
+    return results  # type: ignore[return-value]
@@ -0,0 +1,226 @@
+"""Central stock level history per item, downsampled for charts.
+
+Levels are not stored over time, so they are reconstructed from the events
+that move them: receipts and adjustments (``inventory_transactions``) and
+the assemblies drawing on the central pool, live and archived. An assembly
+reserves its components when created, consumes them when completed and
+releases them when cancelled. Starting from the item's current on-hand and
+reserved quantities the events are replayed backwards, so changes that
+leave no event (initial stock, direct edits) show up as an offset before
+the first event rather than as a step.
+
+A series is held as parallel NumPy arrays and cached per item for
+``STOCK_HISTORY_MAX_AGE_S``. Requests downsample it to a point budget with
+largest-triangle-three-buckets, which keeps the visual shape of a year of
+history in a few hundred points, or with per-bucket min/max, which keeps
+every extreme.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+
+import numpy as np
+from sqlalchemy import and_, literal, select, union_all
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models import (
+    ArchivedAssembly,
+    ArchivedAssemblyComponent,
+    Assembly,
+    AssemblyComponent,
+    InventoryTransaction,
+    Item,
+)
+from app.models.base import utcnow
+
+METHODS = ("lttb", "minmax")
+
+
+@dataclass
+class StockSeries:
+    """Levels after each event, oldest first."""
+
+    times: np.ndarray  # datetime64[us]
+    on_hand: np.ndarray  # int64
+    reserved: np.ndarray  # int64
+
+    def __len__(self) -> int:
+        return len(self.times)
+
+
+def _events(item_id: int):
+    """(time, on-hand delta, reserved delta) for every event of one item."""
+    selects = [
+        select(
+            InventoryTransaction.created_at,
+            InventoryTransaction.quantity_change,
+            literal(0),
+        ).where(InventoryTransaction.item_id == item_id)
+    ]
+    for assembly, component in (
+        (Assembly, AssemblyComponent),
+        (ArchivedAssembly, ArchivedAssemblyComponent),
+    ):
+        joined = and_(
+            component.assembly_id == assembly.id,
+            component.item_id == item_id,
+            assembly.location_id.is_(None),
+        )
+        selects += [
+            select(assembly.created_at, literal(0), component.quantity).where(joined),
+            select(
+                assembly.completed_at, -component.quantity, -component.quantity
+            ).where(joined, assembly.completed_at.is_not(None)),
+            select(assembly.cancelled_at, literal(0), -component.quantity).where(
+                joined, assembly.cancelled_at.is_not(None)
+            ),
+        ]
+    events = union_all(*selects).subquery()
+    columns = list(events.c)
+    return select(*columns).order_by(columns[0])
+
+
+def load_series(db: Session, item_id: int) -> StockSeries | None:
+    """Reconstruct an item's history, or ``None`` if the item doesn't exist."""
+    current = db.execute(
+        select(Item.quantity_on_hand, Item.quantity_reserved).where(Item.id == item_id)
+    ).first()
+    if current is None:
+        return None
+
+    rows = db.execute(_events(item_id)).all()
+    now = np.datetime64(utcnow(), "us")
+    times = np.array([row[0] for row in rows] + [now], dtype="datetime64[us]")
+    deltas = np.array(
+        [(row[1], row[2]) for row in rows] + [(0, 0)], dtype=np.int64
+    ).reshape(-1, 2)
+    # Level after event i is the current level less everything after it
+    after = np.cumsum(deltas[::-1], axis=0)[::-1] - deltas
+    levels = np.array(current, dtype=np.int64) - after
+    return StockSeries(times=times, on_hand=levels[:, 0], reserved=levels[:, 1])
+
+
+def window(series: StockSeries, start: datetime, end: datetime) -> StockSeries:
+    """The part of ``series`` in ``[start, end]``, opening with the level at start."""
+    start64 = np.datetime64(start, "us")
+    first = int(np.searchsorted(series.times, start64, side="right"))
+    last = int(np.searchsorted(series.times, np.datetime64(end, "us"), side="right"))
+    times = series.times[first:last]
+    on_hand = series.on_hand[first:last]
+    reserved = series.reserved[first:last]
+    if first > 0:
+        # Carry the level in force at the start of the window
+        times = np.concatenate(([start64], times))
+        on_hand = np.concatenate(([series.on_hand[first - 1]], on_hand))
+        reserved = np.concatenate(([series.reserved[first - 1]], reserved))
+    return StockSeries(times=times, on_hand=on_hand, reserved=reserved)
+
+
+def lttb(x: np.ndarray, y: np.ndarray, points: int) -> np.ndarray:
+    """Indices of ``points`` samples chosen by largest-triangle-three-buckets.
+
+    The first and last samples are kept. The samples in between are split
+    into ``points - 2`` buckets and each contributes the one forming the
+    largest triangle with the previously chosen sample and the average of
+    the next bucket.
+    """
+    size = len(x)
+    if points >= size:
+        return np.arange(size)
+    if points < 3:
+        return np.array([0, size - 1][:points], dtype=np.intp)
+
+    edges = np.linspace(1, size - 1, points - 1).astype(np.intp)
+    chosen = np.empty(points, dtype=np.intp)
+    chosen[0], chosen[-1] = 0, size - 1
+    previous = 0
+    for bucket in range(points - 2):
+        # Buckets are never empty: they are over one sample wide on average
+        start, end = edges[bucket], edges[bucket + 1]
+        if bucket + 2 < len(edges):
+            following = slice(end, edges[bucket + 2])
+            next_x, next_y = x[following].mean(), y[following].mean()
+        else:
+            next_x, next_y = x[-1], y[-1]
+        area = np.abs(
+            (x[previous] - next_x) * (y[start:end] - y[previous])
+            - (x[previous] - x[start:end]) * (next_y - y[previous])
+        )
+        previous = start + int(area.argmax())
+        chosen[bucket + 1] = previous
+    return chosen
+
+
+def min_max(y: np.ndarray, points: int) -> np.ndarray:
+    """Indices of the lowest and highest sample in each of ``points // 2`` buckets."""
+    size = len(y)
+    if points >= size:
+        return np.arange(size)
+    buckets = max(points // 2, 1)
+    edges = np.linspace(0, size, buckets + 1).astype(np.intp)
+    chosen = []
+    for start, end in zip(edges[:-1], edges[1:]):
+        if end > start:
+            segment = y[start:end]
+            chosen += [start + int(segment.argmin()), start + int(segment.argmax())]
+    return np.unique(np.array(chosen, dtype=np.intp))
+
+
+def downsample(series: StockSeries, points: int, method: str = "lttb") -> StockSeries:
+    """Reduce ``series`` to at most ``points`` samples, shaped by on-hand."""
+    if method not in METHODS:
+        raise ValueError(f"Unknown method {method!r}")
+    if len(series) <= points:
+        return series
+    if method == "lttb":
+        x = (series.times - series.times[0]).astype(np.int64).astype(float)
+        index = lttb(x, series.on_hand.astype(float), points)
+    else:
+        index = min_max(series.on_hand, points)
+    return StockSeries(
+        times=series.times[index],
+        on_hand=series.on_hand[index],
+        reserved=series.reserved[index],
+    )
+
+
+class StockHistoryCache:
+    """Reconstructed series per item, bounded and expired by age."""
+
+    def __init__(self, max_items: int = 1024, max_age: float = 60.0) -> None:
+        self.max_items = max_items
+        self.max_age = max_age
+        self._series: OrderedDict[int, tuple[float, StockSeries]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, db: Session, item_id: int) -> StockSeries | None:
+        with self._lock:
+            cached = self._series.get(item_id)
+            if cached and time.monotonic() - cached[0] < self.max_age:
+                self._series.move_to_end(item_id)
+                return cached[1]
+
+        series = load_series(db, item_id)
+        with self._lock:
+            if series is None:
+                self._series.pop(item_id, None)
+                return None
+            self._series[item_id] = (time.monotonic(), series)
+            self._series.move_to_end(item_id)
+            while len(self._series) > self.max_items:
+                self._series.popitem(last=False)
+        return series
+
+    def clear(self) -> None:
+        with self._lock:
+            self._series.clear()
+
+
+stock_history = StockHistoryCache(
+    max_items=settings.stock_history_cache_items,
+    max_age=settings.stock_history_max_age_s,
+)
@@ -0,0 +1,387 @@
+"""Incrementally maintained inventory summary.
+
+``inventory_summary`` holds running totals: units (central pool plus all
+locations) and item counts by item type, assemblies by status (archived ones
+included) and configurations by active/archived. Every ORM flush turns the
+changes it writes into deltas and records them on the same connection, so
+they commit or roll back together with the change. Code that bypasses the
+ORM with bulk statements must call :func:`apply_summary_deltas` itself.
+
+Deltas are appended to ``inventory_summary_deltas`` rather than added to the
+summary rows: a handful of rows (``reserved`` of components, say) change in
+nearly every write, and updating them in place would hold their row locks
+until commit and so serialize all writers. :class:`SummaryFolder` moves the
+deltas into the summary in short transactions of their own. Reads add the
+deltas not yet folded, so totals stay exact whatever the folding lag. A read
+that finds more than ``SUMMARY_MAX_BACKLOG`` of them (the folder stalled or
+is off) folds the oldest itself first, so no read adds up more than that
+many rows.
+"""
+
+import logging
+import threading
+from collections import Counter
+
+from sqlalchemy import (
+    Connection,
+    case,
+    delete,
+    event,
+    func,
+    insert,
+    select,
+    union_all,
+)
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.orm.attributes import get_history
+
+from app.core.config import settings
+from app.models import (
+    ArchivedAssembly,
+    Assembly,
+    Configuration,
+    InventorySummary,
+    InventorySummaryDelta,
+    Item,
+    ItemStock,
+)
+
+logger = logging.getLogger(__name__)
+
+SummaryKey = tuple[str, str]
+
+# Deltas folded per transaction
+FOLD_BATCH_SIZE = 10000
+
+# Item columns summed per item type, keyed by summary metric
+ITEM_QUANTITIES = {
+    "on_hand": "quantity_on_hand",
+    "reserved": "quantity_reserved",
+    "on_order": "quantity_on_order",
+}
+# Location stock columns added to the same metrics
+STOCK_QUANTITIES = {
+    "on_hand": "quantity_on_hand",
+    "reserved": "quantity_reserved",
+}
+
+
+def _config_state(archived: bool | None) -> str:
+    return "archived" if archived else "active"
+
+
+def _old_new(obj: object, attr: str) -> tuple:
+    """Committed and pending values of an attribute during a flush."""
+    history = get_history(obj, attr)
+    if history.added or history.deleted:
+        old = history.deleted[0] if history.deleted else None
+        new = history.added[0] if history.added else None
+        return old, new
+    value = history.unchanged[0] if history.unchanged else None
+    return value, value
+
+
+def _item_rows(values: dict[str, object]) -> Counter:
+    item_type = str(values["type"])
+    rows: Counter = Counter({("items", item_type): 1})
+    for metric, attr in ITEM_QUANTITIES.items():
+        rows[(metric, item_type)] += values[attr] or 0  # type: ignore[operator]
+    return rows
+
+
+def _stock_deltas(session: Session, stock: ItemStock, sign: int, state: int) -> Counter:
+    """Location stock counted under its item's type; ``state`` 0 = old, 1 = new."""
+    item = session.get(Item, stock.item_id)
+    if item is None:
+        return Counter()
+    rows: Counter = Counter()
+    for metric, attr in STOCK_QUANTITIES.items():
+        rows[(metric, item.type)] += sign * (_old_new(stock, attr)[state] or 0)
+    return rows
+
+
+def flush_deltas(session: Session) -> Counter:
+    """Summary deltas for the changes pending in the current flush."""
+    deltas: Counter = Counter()
+    item_attrs = ("type", *ITEM_QUANTITIES.values())
+
+    for obj in session.new:
+        if isinstance(obj, Item):
+            deltas.update(_item_rows({a: getattr(obj, a) for a in item_attrs}))
+        elif isinstance(obj, Assembly):
+            deltas[("assemblies", obj.status)] += 1
+        elif isinstance(obj, Configuration):
+            deltas[("configurations", _config_state(obj.archived))] += 1
+        elif isinstance(obj, ItemStock):
+            deltas.update(_stock_deltas(session, obj, 1, 1))
+
+    for obj in session.dirty:
+        if isinstance(obj, Item):
+            changes = {a: _old_new(obj, a) for a in item_attrs}
+            if all(old == new for old, new in changes.values()):
+                continue
+            deltas.update(_item_rows({a: new for a, (_, new) in changes.items()}))
+            deltas.subtract(_item_rows({a: old for a, (old, _) in changes.items()}))
+        elif isinstance(obj, Assembly):
+            old, new = _old_new(obj, "status")
+            if old != new:
+                deltas[("assemblies", old)] -= 1
+                deltas[("assemblies", new)] += 1
+        elif isinstance(obj, Configuration):
+            old, new = _old_new(obj, "archived")
+            if bool(old) != bool(new):
+                deltas[("configurations", _config_state(old))] -= 1
+                deltas[("configurations", _config_state(new))] += 1
+        elif isinstance(obj, ItemStock):
+            deltas.update(_stock_deltas(session, obj, 1, 1))
+            deltas.update(_stock_deltas(session, obj, -1, 0))
+
+    for obj in session.deleted:
+        if isinstance(obj, Item):
+            values = {a: _old_new(obj, a)[0] for a in item_attrs}
+            deltas.subtract(_item_rows(values))
+        elif isinstance(obj, Assembly):
+            deltas[("assemblies", _old_new(obj, "status")[0])] -= 1
+        elif isinstance(obj, Configuration):
+            old = _old_new(obj, "archived")[0]
+            deltas[("configurations", _config_state(old))] -= 1
+        elif isinstance(obj, ItemStock):
+            deltas.update(_stock_deltas(session, obj, -1, 0))
+
+    return deltas
+
+
+def _rows(deltas: dict[SummaryKey, int]) -> list[dict]:
+    return [
+        {"metric": metric, "dimension": dimension, "value": value}
+        for (metric, dimension), value in sorted(deltas.items())
+        if value
+    ]
+
+
+def apply_summary_deltas(
+    bind: Session | Connection, deltas: dict[SummaryKey, int]
+) -> None:
+    """Record ``deltas`` to the summary in the caller's transaction."""
+    rows = _rows(deltas)
+    if rows:
+        connection = bind.connection() if isinstance(bind, Session) else bind
+        connection.execute(insert(InventorySummaryDelta), rows)
+
+
+def fold_summary_deltas(db: Session, batch_size: int = FOLD_BATCH_SIZE) -> int:
+    """Move up to ``batch_size`` of the oldest deltas into the summary and commit.
+
+    Concurrent folders are safe: each delta is deleted, and so added, once.
+    Summary rows are upserted in key order so folders cannot deadlock.
+    """
+    oldest = (
+        select(InventorySummaryDelta.id)
+        .order_by(InventorySummaryDelta.id)
+        .limit(batch_size)
+        .scalar_subquery()
+    )
+    folded = db.execute(
+        delete(InventorySummaryDelta)
+        .where(InventorySummaryDelta.id.in_(oldest))
+        .returning(
+            InventorySummaryDelta.metric,
+            InventorySummaryDelta.dimension,
+            InventorySummaryDelta.value,
+        )
+    ).all()
+    totals: Counter = Counter()
+    for metric, dimension, value in folded:
+        totals[(metric, dimension)] += value
+    rows = _rows(totals)
+    if rows:
+        connection = db.connection()
+        dialect = postgresql if connection.dialect.name == "postgresql" else sqlite
+        stmt = dialect.insert(InventorySummary)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["metric", "dimension"],
+            set_={"value": InventorySummary.value + stmt.excluded.value},
+        )
+        connection.execute(stmt, rows)
+    db.commit()
+    return len(folded)
+
+
+class SummaryFolder:
+    """Fold summary deltas in the background."""
+
+    def __init__(
+        self,
+        session_factory: sessionmaker,
+        interval: float,
+        batch_size: int = FOLD_BATCH_SIZE,
+    ) -> None:
+        self.session_factory = session_factory
+        self.interval = interval
+        self.batch_size = batch_size
+        self._stop = threading.Event()
+        self._worker: threading.Thread | None = None
+
+    def run(self) -> None:
+        """Fold until stopped, straight on while there is a backlog."""
+        while not self._stop.is_set():
+            try:
+                with self.session_factory() as db:
+                    folded = fold_summary_deltas(db, self.batch_size)
+            except Exception:
+                logger.exception("Folding summary deltas failed")
+                folded = 0
+            if folded < self.batch_size:
+                self._stop.wait(self.interval)
+
+    def start(self) -> None:
+        if self._worker is None:
+            self._stop.clear()
+            self._worker = threading.Thread(
+                target=self.run, name="summary-folder", daemon=True
+            )
+            self._worker.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._worker is not None:
+            self._worker.join()
+            self._worker = None
+
+
+def _write_flush_deltas(session: Session, flush_context) -> None:
+    apply_summary_deltas(session, flush_deltas(session))
+
+
+def track_summary(session_factory: sessionmaker) -> None:
+    """Record summary deltas for every ORM flush."""
+    event.listen(session_factory, "after_flush", _write_flush_deltas)
+
+
+def delta_backlog(db: Session) -> int:
+    """At most how many deltas wait to be folded, from the ends of the id range.
+
+    Two primary key lookups rather than a count; rolled back inserts leave
+    gaps, so it can overestimate.
+    """
+    low, high = db.execute(
+        select(func.min(InventorySummaryDelta.id), func.max(InventorySummaryDelta.id))
+    ).one()
+    return 0 if low is None else high - low + 1
+
+
+def fold_backlog(db: Session, max_backlog: int | None = None) -> None:
+    """Fold (and commit) the oldest deltas until at most ``max_backlog`` wait."""
+    if max_backlog is None:
+        max_backlog = settings.summary_max_backlog
+    while (backlog := delta_backlog(db)) > max_backlog:
+        if not fold_summary_deltas(db, min(backlog - max_backlog, FOLD_BATCH_SIZE)):
+            break
+
+
+def read_summary(
+    db: Session, max_backlog: int | None = None, fold: bool = True
+) -> dict[SummaryKey, int]:
+    """Summary totals including the deltas not folded in yet.
+
+    More than ``max_backlog`` waiting deltas are folded first (see
+    :func:`fold_backlog`), bounding the rows the read adds up. ``fold=False``
+    skips that, for reads that must stay in one transaction.
+    """
+    if fold:
+        fold_backlog(db, max_backlog)
+    totals = union_all(
+        select(
+            InventorySummary.metric, InventorySummary.dimension, InventorySummary.value
+        ),
+        select(
+            InventorySummaryDelta.metric,
+            InventorySummaryDelta.dimension,
+            InventorySummaryDelta.value,
+        ),
+    ).subquery()
+    value = func.sum(totals.c.value)
+    return {
+        (metric, dimension): int(total)
+        for metric, dimension, total in db.execute(
+            select(totals.c.metric, totals.c.dimension, value)
+            .group_by(totals.c.metric, totals.c.dimension)
+            .having(value != 0)
+        )
+    }
+
+
+def compute_summary(db: Session) -> dict[SummaryKey, int]:
+    """Recompute the summary from the base tables (full scans)."""
+    totals: dict[SummaryKey, int] = {}
+
+    for row in db.query(
+        Item.type,
+        func.count(),
+        *(
+            func.coalesce(func.sum(getattr(Item, a)), 0)
+            for a in ITEM_QUANTITIES.values()
+        ),
+    ).group_by(Item.type):
+        item_type, count, *sums = row
+        totals[("items", item_type)] = count
+        for metric, value in zip(ITEM_QUANTITIES, sums):
+            totals[(metric, item_type)] = value
+
+    for row in (
+        db.query(
+            Item.type,
+            *(
+                func.coalesce(func.sum(getattr(ItemStock, a)), 0)
+                for a in STOCK_QUANTITIES.values()
+            ),
+        )
+        .join(ItemStock, ItemStock.item_id == Item.id)
+        .group_by(Item.type)
+    ):
+        item_type, *sums = row
+        for metric, value in zip(STOCK_QUANTITIES, sums):
+            totals[(metric, item_type)] = totals.get((metric, item_type), 0) + value
+
+    statuses = union_all(
+        select(Assembly.status), select(ArchivedAssembly.status)
+    ).subquery()
+    for status, count in db.execute(
+        select(statuses.c.status, func.count()).group_by(statuses.c.status)
+    ):
+        totals[("assemblies", status)] = count
+
+    state = case((Configuration.archived, "archived"), else_="active")
+    for config_state, count in db.query(state, func.count()).group_by(state):
+        totals[("configurations", config_state)] = count
+
+    return {key: value for key, value in totals.items() if value}
+
+
+def reconcile_summary(db: Session, fix: bool = False) -> dict[SummaryKey, tuple]:
+    """Compare the summary with the base tables.
+
+    Returns ``{key: (summary value, actual value)}`` for every mismatch. With
+    ``fix`` the summary is corrected in the same transaction as the check.
+    """
+    # Folding commits, so it happens before the snapshot, not during it
+    fold_backlog(db)
+    db.commit()
+    if db.get_bind().dialect.name == "postgresql":
+        # Read the summary and the base tables from one snapshot
+        db.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+
+    stored = read_summary(db, fold=False)
+    actual = compute_summary(db)
+    mismatches = {
+        key: (stored.get(key, 0), actual.get(key, 0))
+        for key in stored.keys() | actual.keys()
+        if stored.get(key, 0) != actual.get(key, 0)
+    }
+    if fix and mismatches:
+        apply_summary_deltas(
+            db, {key: new - old for key, (old, new) in mismatches.items()}
+        )
+        db.commit()
+    return mismatches
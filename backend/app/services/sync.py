@@ -0,0 +1,107 @@
+"""Delta sync over ``updated_at`` cursors.
+
+A cursor is ``<updated_at ISO timestamp>@<id>`` of the last row a client has
+seen; a bare ISO timestamp is accepted too, for a first sync from a point in
+time. Rows are paged in ``(updated_at, id)`` order so rows sharing a
+timestamp are never skipped at a page boundary. Deletions are reported from
+``tombstones``; a tombstone may be repeated on a later page, which clients
+apply idempotently.
+
+``updated_at`` and ``deleted_at`` are set when a transaction flushes, not
+when it commits, so a slow transaction can commit rows older than a cursor
+already handed out. Rows are therefore only served once they are ``lag``
+old (``SYNC_SAFETY_LAG_S``); newer ones wait for the next poll. A change is
+only missed if its transaction takes longer than the lag to commit.
+"""
+
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import and_, or_, select
+from sqlalchemy.orm import Session
+
+from app.models import Tombstone
+from app.models.base import utcnow
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+@dataclass
+class ChangePage:
+    rows: list = field(default_factory=list)
+    deleted: list[int] = field(default_factory=list)
+    cursor: str | None = None
+    has_more: bool = False
+
+
+def encode_cursor(updated_at: datetime, row_id: int) -> str:
+    return f"{updated_at.isoformat()}@{row_id}"
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    timestamp, _, row_id = cursor.partition("@")
+    try:
+        updated_at = datetime.fromisoformat(timestamp)
+        last_id = int(row_id) if row_id else 0
+    except ValueError:
+        raise InvalidCursor(f"Invalid cursor: {cursor}")
+    if updated_at.tzinfo is not None:
+        # Timestamps are stored as naive UTC
+        updated_at = updated_at.astimezone(timezone.utc).replace(tzinfo=None)
+    return updated_at, last_id
+
+
+def changes_since(
+    db: Session,
+    model,
+    entity: str,
+    cursor: str | None,
+    limit: int,
+    lag: timedelta = timedelta(0),
+) -> ChangePage:
+    """Rows of ``model`` changed after ``cursor`` and ``entity`` deletions.
+
+    Only changes at least ``lag`` old are returned, and the cursor never
+    moves past them.
+    """
+    horizon = utcnow() - lag
+    query = (
+        select(model)
+        .where(model.updated_at <= horizon)
+        .order_by(model.updated_at, model.id)
+        .limit(limit + 1)
+    )
+    since = None
+    if cursor:
+        since, last_id = decode_cursor(cursor)
+        query = query.where(
+            or_(
+                model.updated_at > since,
+                and_(model.updated_at == since, model.id > last_id),
+            )
+        )
+    rows = list(db.scalars(query))
+    page = ChangePage(rows=rows[:limit], has_more=len(rows) > limit, cursor=cursor)
+    if page.rows:
+        last = page.rows[-1]
+        page.cursor = encode_cursor(last.updated_at, last.id)
+
+    # A full sync has nothing to delete
+    if since is not None:
+        tombstones = db.execute(
+            select(Tombstone.entity_id, Tombstone.deleted_at)
+            .where(
+                Tombstone.entity == entity,
+                Tombstone.deleted_at > since,
+                Tombstone.deleted_at <= horizon,
+            )
+            .order_by(Tombstone.deleted_at)
+        ).all()
+        page.deleted = [entity_id for entity_id, _ in tombstones]
+        if tombstones and not page.has_more:
+            deleted_at = tombstones[-1].deleted_at
+            if not page.rows or deleted_at > page.rows[-1].updated_at:
+                page.cursor = encode_cursor(deleted_at, 0)
+    return page
@@ -0,0 +1,216 @@
+"""FIFO inventory valuation from incrementally maintained cost layers.
+
+Every receipt opens a cost layer holding the units received and their unit
+cost. Consumption (completed assemblies, negative adjustments) draws down
+the item's oldest open layers first, in the same transaction as the stock
+movement, so the open layers are always the stock on hand at FIFO cost and
+valuation is one aggregate over them. :func:`rebuild_cost_layers` recomputes
+the layers from history in one streaming pass.
+"""
+
+import heapq
+from collections import deque
+from collections.abc import Iterator
+from dataclasses import dataclass
+from datetime import datetime
+from decimal import Decimal
+
+from sqlalchemy import and_, delete, func, insert, select, union_all, update
+from sqlalchemy.orm import Session
+
+from app.models import (
+    ArchivedAssembly,
+    ArchivedAssemblyComponent,
+    Assembly,
+    AssemblyComponent,
+    CostLayer,
+    InventoryTransaction,
+    Item,
+)
+
+
+@dataclass
+class ItemValuation:
+    item_id: int
+    item_name: str
+    item_sku: str
+    quantity_on_hand: int
+    quantity_costed: int  # units in open layers with a unit cost
+    value: Decimal
+
+
+def open_cost_layers(
+    db: Session, layers: list[dict], received_at: datetime | None = None
+) -> None:
+    """Insert layers of ``item_id``, ``quantity`` and ``unit_cost``."""
+    rows = [
+        {
+            "item_id": layer["item_id"],
+            "quantity": layer["quantity"],
+            "quantity_remaining": layer["quantity"],
+            "unit_cost": layer["unit_cost"],
+            **({"received_at": received_at} if received_at else {}),
+        }
+        for layer in layers
+        if layer["quantity"] > 0
+    ]
+    if rows:
+        db.execute(insert(CostLayer), rows)
+
+
+def consume_cost_layers(db: Session, quantities: dict[int, int]) -> Decimal:
+    """Draw down the oldest open layers; returns the cost of what was costed.
+
+    Units beyond the open layers (stock that predates costing) are consumed
+    uncosted. The caller commits.
+    """
+    cost = Decimal(0)
+    changes = []
+    # Fixed lock order so concurrent completions cannot deadlock
+    for item_id in sorted(quantities):
+        needed = quantities[item_id]
+        if needed <= 0:
+            continue
+        layers = db.execute(
+            select(CostLayer.id, CostLayer.quantity_remaining, CostLayer.unit_cost)
+            .where(CostLayer.item_id == item_id, CostLayer.quantity_remaining > 0)
+            .order_by(CostLayer.received_at, CostLayer.id)
+            .with_for_update()
+        )
+        for layer_id, remaining, unit_cost in layers:
+            taken = min(needed, remaining)
+            changes.append({"id": layer_id, "quantity_remaining": remaining - taken})
+            cost += taken * (unit_cost or 0)
+            needed -= taken
+            if not needed:
+                break
+    if changes:
+        # ORM bulk UPDATE by primary key: one executemany
+        db.execute(update(CostLayer), changes)
+    return cost
+
+
+def inventory_valuation(db: Session) -> list[ItemValuation]:
+    """Value of every item's open layers, from one grouped query."""
+    costed = and_(CostLayer.quantity_remaining > 0, CostLayer.unit_cost.is_not(None))
+    rows = db.execute(
+        select(
+            Item.id,
+            Item.name,
+            Item.sku,
+            Item.quantity_on_hand,
+            func.coalesce(func.sum(CostLayer.quantity_remaining), 0),
+            func.coalesce(
+                func.sum(CostLayer.quantity_remaining * CostLayer.unit_cost), 0
+            ),
+        )
+        .outerjoin(CostLayer, and_(CostLayer.item_id == Item.id, costed))
+        .group_by(Item.id, Item.name, Item.sku, Item.quantity_on_hand)
+        .order_by(Item.id)
+    )
+    return [
+        ItemValuation(
+            item_id=item_id,
+            item_name=name,
+            item_sku=sku,
+            quantity_on_hand=on_hand,
+            quantity_costed=int(quantity),
+            value=Decimal(str(value)).quantize(Decimal("0.01")),
+        )
+        for item_id, name, sku, on_hand, quantity, value in rows
+    ]
+
+
+def _receipts(db: Session, batch_size: int) -> Iterator[tuple]:
+    stmt = (
+        select(
+            InventoryTransaction.created_at,
+            InventoryTransaction.id,
+            InventoryTransaction.item_id,
+            InventoryTransaction.quantity_change,
+            InventoryTransaction.unit_cost,
+        )
+        .where(InventoryTransaction.type.in_(("receive", "adjustment")))
+        .order_by(InventoryTransaction.created_at, InventoryTransaction.id)
+        .execution_options(yield_per=batch_size)
+    )
+    for created_at, tx_id, item_id, change, unit_cost in db.execute(stmt):
+        yield created_at, 0, tx_id, item_id, change, unit_cost
+
+
+def _consumption(db: Session, batch_size: int) -> Iterator[tuple]:
+    consumed = union_all(
+        select(
+            Assembly.completed_at,
+            AssemblyComponent.id,
+            AssemblyComponent.item_id,
+            AssemblyComponent.quantity,
+        )
+        .join(Assembly, Assembly.id == AssemblyComponent.assembly_id)
+        .where(Assembly.completed_at.is_not(None), Assembly.location_id.is_(None)),
+        select(
+            ArchivedAssembly.completed_at,
+            ArchivedAssemblyComponent.id,
+            ArchivedAssemblyComponent.item_id,
+            ArchivedAssemblyComponent.quantity,
+        )
+        .join(
+            ArchivedAssembly,
+            ArchivedAssembly.id == ArchivedAssemblyComponent.assembly_id,
+        )
+        .where(
+            ArchivedAssembly.completed_at.is_not(None),
+            ArchivedAssembly.location_id.is_(None),
+        ),
+    ).subquery()
+    stmt = (
+        select(consumed)
+        .order_by(consumed.c.completed_at, consumed.c.id)
+        .execution_options(yield_per=batch_size)
+    )
+    for completed_at, component_id, item_id, quantity in db.execute(stmt):
+        yield completed_at, 1, component_id, item_id, -quantity, None
+
+
+def rebuild_cost_layers(db: Session, batch_size: int = 1000) -> int:
+    """Recompute all cost layers from history; returns the open layer count.
+
+    Receipts and adjustments from ``inventory_transactions`` and completed
+    assembly components, live and archived, are merged in time order as they
+    stream in; only the currently open layers are held in memory.
+    """
+    open_layers: dict[int, deque[list]] = {}
+    events = heapq.merge(
+        _receipts(db, batch_size),
+        _consumption(db, batch_size),
+        key=lambda event: (event[0] or datetime.min, event[1], event[2]),
+    )
+    for at, _, _, item_id, change, unit_cost in events:
+        layers = open_layers.setdefault(item_id, deque())
+        if change > 0:
+            layers.append([at, change, change, unit_cost])
+            continue
+        needed = -change
+        while needed and layers:
+            taken = min(needed, layers[0][2])
+            layers[0][2] -= taken
+            needed -= taken
+            if not layers[0][2]:
+                layers.popleft()
+
+    rows = [
+        {
+            "item_id": item_id,
+            "received_at": at,
+            "quantity": quantity,
+            "quantity_remaining": remaining,
+            "unit_cost": unit_cost,
+        }
+        for item_id, layers in open_layers.items()
+        for at, quantity, remaining, unit_cost in layers
+    ]
+    db.execute(delete(CostLayer))
+    for start in range(0, len(rows), batch_size):
+        db.execute(insert(CostLayer), rows[start : start + batch_size])
+    db.commit()
+    return len(rows)
@@ -0,0 +1,422 @@
+"""Concurrent assembly workflow load test.
+
+Simulates many operators creating, starting, completing, shipping and
+cancelling assemblies at the same time against a shared pool of components,
+then reports throughput, latency histograms, error/conflict rates and any
+stock invariant violations.
+
+Against a running server:
+
+    python -m scripts.loadtest --base-url http://localhost:8000 --workers 20
+
+In-process through ASGI (no server needed):
+
+    python -m scripts.loadtest --in-process --database-url sqlite:///./load.db
+"""
+
+import argparse
+import asyncio
+import bisect
+import math
+import os
+import random
+import sys
+import time
+import uuid
+from collections import defaultdict
+from dataclasses import dataclass, field
+
+import httpx
+
+# Each scenario is the sequence of workflow steps one operator performs.
+SCENARIOS: dict[str, tuple[str, ...]] = {
+    "build": ("create", "start", "complete", "ship"),
+    "direct": ("create", "complete"),
+    "cancel": ("create", "cancel"),
+    "abort": ("create", "start", "cancel"),
+}
+DEFAULT_MIX = "build=6,direct=1,cancel=2,abort=1"
+
+# Upper bounds (ms) of the latency histogram buckets; the last bucket is +Inf.
+BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+
+# Business rejections (insufficient stock, invalid status transition).
+CONFLICT_STATUSES = (400, 409)
+
+
+class LatencyHistogram:
+    """Bucketed latency counts plus raw samples for percentiles."""
+
+    def __init__(self) -> None:
+        self.counts = [0] * (len(BUCKETS_MS) + 1)
+        self.samples: list[float] = []
+
+    def record(self, ms: float) -> None:
+        self.counts[bisect.bisect_left(BUCKETS_MS, ms)] += 1
+        self.samples.append(ms)
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        for i, count in enumerate(other.counts):
+            self.counts[i] += count
+        self.samples.extend(other.samples)
+
+    def percentile(self, p: float) -> float:
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        index = max(0, min(len(ordered) - 1, math.ceil(p / 100 * len(ordered)) - 1))
+        return ordered[index]
+
+
+@dataclass
+class OperationStats:
+    latency: LatencyHistogram = field(default_factory=LatencyHistogram)
+    ok: int = 0
+    conflicts: int = 0
+    errors: int = 0
+
+    @property
+    def total(self) -> int:
+        return self.ok + self.conflicts + self.errors
+
+
+@dataclass
+class Fixture:
+    """Items and configurations seeded for one run."""
+
+    stock: int
+    items: list[int] = field(default_factory=list)
+    configurations: dict[int, dict[int, int]] = field(default_factory=dict)
+    assemblies: set[int] = field(default_factory=set)
+    consumed: dict[int, int] = field(default_factory=lambda: defaultdict(int))
+
+
+@dataclass
+class Run:
+    operations: dict[str, OperationStats] = field(
+        default_factory=lambda: defaultdict(OperationStats)
+    )
+    workflows: dict[str, int] = field(default_factory=lambda: defaultdict(int))
+    aborted: dict[str, int] = field(default_factory=lambda: defaultdict(int))
+    remaining: int = 0
+    elapsed: float = 0.0
+
+
+def parse_mix(mix: str) -> dict[str, int]:
+    """Parse ``build=6,cancel=2`` into scenario weights."""
+    weights = {}
+    for part in mix.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in SCENARIOS:
+            raise argparse.ArgumentTypeError(
+                f"Unknown scenario '{name}', expected one of {', '.join(SCENARIOS)}"
+            )
+        weight = weight.strip() or "1"
+        if not weight.isdecimal():
+            raise argparse.ArgumentTypeError(
+                f"Weight of scenario '{name}' must be a non-negative integer,"
+                f" got '{weight}'"
+            )
+        weights[name] = int(weight)
+    if not any(weights.values()):
+        raise argparse.ArgumentTypeError("Scenario mix needs a positive weight")
+    return weights
+
+
+async def call(run: Run, op: str, request) -> httpx.Response | None:
+    """Await a request, recording its latency and outcome under ``op``."""
+    stats = run.operations[op]
+    start = time.perf_counter()
+    try:
+        response = await request
+    except httpx.HTTPError:
+        stats.latency.record((time.perf_counter() - start) * 1000)
+        stats.errors += 1
+        return None
+
+    stats.latency.record((time.perf_counter() - start) * 1000)
+    if response.is_success:
+        stats.ok += 1
+        return response
+    if response.status_code in CONFLICT_STATUSES:
+        stats.conflicts += 1
+    else:
+        stats.errors += 1
+    return None
+
+
+async def seed(
+    client: httpx.AsyncClient, args: argparse.Namespace, rng: random.Random
+) -> Fixture:
+    """Create the shared components and the configurations that use them."""
+    run_id = uuid.uuid4().hex[:8]
+    fixture = Fixture(stock=args.stock)
+
+    for i in range(args.components):
+        response = await client.post(
+            "/api/items/",
+            json={
+                "name": f"Load test component {i}",
+                "sku": f"LT-{run_id}-{i:03d}",
+                "type": "component",
+                "quantity_on_hand": args.stock,
+            },
+        )
+        response.raise_for_status()
+        fixture.items.append(response.json()["id"])
+
+    per_config = min(args.components_per_config, len(fixture.items))
+    for c in range(args.configurations):
+        components = {
+            item_id: rng.randint(1, 3)
+            for item_id in rng.sample(fixture.items, per_config)
+        }
+        response = await client.post(
+            "/api/configurations/",
+            json={
+                "name": f"Load test {run_id} #{c}",
+                "components": [
+                    {"item_id": item_id, "quantity": quantity}
+                    for item_id, quantity in components.items()
+                ],
+            },
+        )
+        response.raise_for_status()
+        fixture.configurations[response.json()["id"]] = components
+
+    return fixture
+
+
+async def run_workflow(
+    client: httpx.AsyncClient,
+    fixture: Fixture,
+    run: Run,
+    scenario: str,
+    rng: random.Random,
+) -> None:
+    config_id = rng.choice(list(fixture.configurations))
+    assembly_id = None
+
+    for step in SCENARIOS[scenario]:
+        if step == "create":
+            request = client.post(
+                "/api/assemblies/", json={"configuration_id": config_id}
+            )
+        else:
+            request = client.post(f"/api/assemblies/{assembly_id}/{step}")
+
+        response = await call(run, step, request)
+        if response is None:
+            run.aborted[scenario] += 1
+            return
+
+        if step == "create":
+            assembly_id = response.json()["id"]
+            fixture.assemblies.add(assembly_id)
+        elif step == "complete":
+            for item_id, quantity in fixture.configurations[config_id].items():
+                fixture.consumed[item_id] += quantity
+
+    run.workflows[scenario] += 1
+
+
+async def worker(
+    client: httpx.AsyncClient,
+    fixture: Fixture,
+    run: Run,
+    mix: dict[str, int],
+    deadline: float,
+    rng: random.Random,
+) -> None:
+    names, weights = list(mix), list(mix.values())
+    while run.remaining > 0 and time.perf_counter() < deadline:
+        run.remaining -= 1
+        scenario = rng.choices(names, weights)[0]
+        await run_workflow(client, fixture, run, scenario, rng)
+
+
+async def check_invariants(client: httpx.AsyncClient, fixture: Fixture) -> list[str]:
+    """Compare final stock against what the run should have produced."""
+    expected_reserved: dict[int, int] = defaultdict(int)
+    for status in ("reserved", "building"):
+        response = await client.get("/api/assemblies/", params={"status": status})
+        response.raise_for_status()
+        for assembly in response.json():
+            if assembly["id"] in fixture.assemblies:
+                for component in assembly["components"]:
+                    expected_reserved[component["item_id"]] += component["quantity"]
+
+    violations = []
+    for item_id in fixture.items:
+        response = await client.get(f"/api/items/{item_id}")
+        response.raise_for_status()
+        item = response.json()
+        on_hand, reserved = item["quantity_on_hand"], item["quantity_reserved"]
+        expected_on_hand = fixture.stock - fixture.consumed[item_id]
+
+        if on_hand < 0:
+            violations.append(f"item {item_id}: negative on hand ({on_hand})")
+        if reserved < 0:
+            violations.append(f"item {item_id}: negative reserved ({reserved})")
+        if reserved > on_hand:
+            violations.append(
+                f"item {item_id}: reserved {reserved} exceeds on hand {on_hand}"
+            )
+        if on_hand != expected_on_hand:
+            violations.append(
+                f"item {item_id}: on hand {on_hand}, expected {expected_on_hand}"
+            )
+        if reserved != expected_reserved[item_id]:
+            violations.append(
+                f"item {item_id}: reserved {reserved}, "
+                f"active assemblies hold {expected_reserved[item_id]}"
+            )
+    return violations
+
+
+def print_report(args: argparse.Namespace, run: Run, violations: list[str]) -> None:
+    total = LatencyHistogram()
+    requests = ok = conflicts = errors = 0
+    for stats in run.operations.values():
+        total.merge(stats.latency)
+        requests += stats.total
+        ok += stats.ok
+        conflicts += stats.conflicts
+        errors += stats.errors
+
+    workflows = sum(run.workflows.values())
+    elapsed = max(run.elapsed, 1e-9)
+    print(f"\nLoad test: {args.workers} workers, {elapsed:.2f}s")
+    print(
+        f"Throughput: {requests / elapsed:.1f} req/s, "
+        f"{workflows / elapsed:.1f} workflows/s"
+    )
+    if requests:
+        print(
+            f"Requests: {requests} ({conflicts / requests:.1%} conflicts, "
+            f"{errors / requests:.1%} errors)"
+        )
+
+    print("\nScenario   finished  aborted")
+    for name in SCENARIOS:
+        if run.workflows[name] or run.aborted[name]:
+            print(f"{name:<10} {run.workflows[name]:>8} {run.aborted[name]:>8}")
+
+    print(
+        "\nOperation    count      ok  conflict   error"
+        "   p50 ms   p90 ms   p99 ms   max ms"
+    )
+    for op in ("create", "start", "complete", "ship", "cancel"):
+        stats = run.operations.get(op)
+        if not stats or not stats.total:
+            continue
+        latency = stats.latency
+        print(
+            f"{op:<10} {stats.total:>7} {stats.ok:>7} {stats.conflicts:>9} "
+            f"{stats.errors:>7} {latency.percentile(50):>8.1f} "
+            f"{latency.percentile(90):>8.1f} {latency.percentile(99):>8.1f} "
+            f"{max(latency.samples):>8.1f}"
+        )
+
+    print("\nLatency histogram (all operations)")
+    peak = max(total.counts) or 1
+    labels = [f"<= {b} ms" for b in BUCKETS_MS] + [f"> {BUCKETS_MS[-1]} ms"]
+    for label, count in zip(labels, total.counts):
+        bar = "#" * round(40 * count / peak)
+        print(f"{label:>11} | {bar:<40} {count}")
+
+    if violations:
+        print(f"\nStock invariants: {len(violations)} violation(s)")
+        for violation in violations:
+            print(f"  {violation}")
+    else:
+        print("\nStock invariants: OK")
+
+
+def build_client(args: argparse.Namespace) -> httpx.AsyncClient:
+    if args.in_process:
+        # The app reads its settings on import, so the URL must be set first.
+        if args.database_url:
+            os.environ["DATABASE_URL"] = args.database_url
+
+        from app.core.database import engine
+        from app.main import app
+        from app.models import Base
+
+        Base.metadata.create_all(bind=engine)
+        return httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app),
+            base_url="http://loadtest",
+            timeout=args.timeout,
+        )
+
+    return httpx.AsyncClient(
+        base_url=args.base_url,
+        timeout=args.timeout,
+        limits=httpx.Limits(max_connections=args.workers),
+    )
+
+
+async def run_load_test(args: argparse.Namespace) -> tuple[Run, list[str]]:
+    rng = random.Random(args.seed)
+    mix = parse_mix(args.mix)
+
+    async with build_client(args) as client:
+        fixture = await seed(client, args, rng)
+        run = Run(remaining=args.workflows)
+
+        start = time.perf_counter()
+        deadline = start + args.duration if args.duration else math.inf
+        await asyncio.gather(
+            *(
+                worker(client, fixture, run, mix, deadline, random.Random(rng.random()))
+                for _ in range(args.workers)
+            )
+        )
+        run.elapsed = time.perf_counter() - start
+
+        violations = await check_invariants(client, fixture)
+
+    return run, violations
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=(__doc__ or "").partition("\n")[0])
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument("--base-url", default="http://localhost:8000")
+    target.add_argument(
+        "--in-process", action="store_true", help="drive the app through ASGI"
+    )
+    parser.add_argument(
+        "--database-url", help="database for --in-process (default: app settings)"
+    )
+    parser.add_argument("--workers", type=int, default=10)
+    parser.add_argument("--workflows", type=int, default=200)
+    parser.add_argument(
+        "--duration", type=float, default=0, help="stop after N seconds"
+    )
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="scenario weights")
+    parser.add_argument("--components", type=int, default=12)
+    parser.add_argument("--configurations", type=int, default=4)
+    parser.add_argument("--components-per-config", type=int, default=6)
+    parser.add_argument("--stock", type=int, default=500)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args(argv)
+    try:
+        parse_mix(args.mix)
+    except argparse.ArgumentTypeError as e:
+        parser.error(str(e))
+    return args
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv)
+    run, violations = asyncio.run(run_load_test(args))
+    print_report(args, run, violations)
+    return 1 if violations else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,23 @@
+import os
+import tempfile
+
+# Point the app at a throwaway database before anything imports app.core.
+TEST_DB_PATH = os.path.join(tempfile.gettempdir(), f"inv-sys-test-{os.getpid()}.db")
+os.environ["DATABASE_URL"] = os.environ.get(
+    "TEST_DATABASE_URL", f"sqlite:///{TEST_DB_PATH}"
+)
+
+import pytest  # noqa: E402
+
+from app.core.database import engine  # noqa: E402
+from app.models import Base  # noqa: E402
+
+
+@pytest.fixture(scope="session", autouse=True)
+def database():
+    Base.metadata.create_all(bind=engine)
+    yield
+    Base.metadata.drop_all(bind=engine)
+    engine.dispose()
+    if os.path.exists(TEST_DB_PATH):
+        os.remove(TEST_DB_PATH)
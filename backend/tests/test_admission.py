@@ -0,0 +1,91 @@
+import asyncio
+
+from fastapi import FastAPI
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.testclient import TestClient
+
+from app.core.admission import (
+    AdmissionController,
+    AdmissionMiddleware,
+    pool_limits,
+    route_group,
+)
+from app.main import app as main_app
+
+
+def _controller(**limits):
+    return AdmissionController(
+        limits={"write": 1, "read": 1, "export": 1, **limits},
+        total=1,
+        queue_size=1,
+        queue_timeout=1.0,
+    )
+
+
+def test_route_groups():
+    assert route_group("GET", "/api/items/") == "read"
+    assert route_group("POST", "/api/assemblies/1/complete") == "write"
+    assert route_group("GET", "/api/sync/items") == "export"
+    assert route_group("GET", "/health") is None
+
+
+def test_limits_leave_pool_headroom():
+    assert pool_limits(5, 10, 6) == (9, 7)
+    assert pool_limits(5, 10, 6, total=12) == (12, 10)
+    assert pool_limits(5, 10, 6, write=20) == (9, 9)
+    assert pool_limits(2, 0, 6) == (1, 1)
+
+
+def test_queued_writes_are_admitted_before_reads():
+    async def scenario():
+        controller = _controller()
+        order = []
+        assert await controller.acquire("read")
+
+        async def run(group):
+            if await controller.acquire(group):
+                order.append(group)
+                controller.release(group)
+
+        reader = asyncio.create_task(run("read"))
+        await asyncio.sleep(0)
+        writer = asyncio.create_task(run("write"))
+        await asyncio.sleep(0)
+        # The read queue holds one waiter; another read is turned away
+        assert not await controller.acquire("read")
+
+        controller.release("read")
+        await asyncio.gather(reader, writer)
+        return order
+
+    assert asyncio.run(scenario()) == ["write", "read"]
+
+
+def test_saturated_group_is_rejected_with_retry_after():
+    app = FastAPI()
+
+    @app.get("/api/things")
+    def things():
+        return []
+
+    controller = _controller(read=0)
+    controller.queue_size = 0
+    app.add_middleware(AdmissionMiddleware, controller=controller, retry_after=7)
+    app.add_middleware(
+        CORSMiddleware, allow_origins=["*"], expose_headers=["Retry-After"]
+    )
+    client = TestClient(app)
+
+    response = client.get("/api/things", headers={"Origin": "http://ui.test"})
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "7"
+    # Browsers only let the UI see it when CORS wraps the rejection
+    assert response.headers["access-control-allow-origin"] == "*"
+    assert response.headers["access-control-expose-headers"] == "Retry-After"
+
+
+def test_cors_headers_wrap_every_middleware():
+    # CORS is added last, so even responses made by other middleware have it
+    assert main_app.user_middleware[0].cls is CORSMiddleware
+    exposed = main_app.user_middleware[0].kwargs["expose_headers"]
+    assert isinstance(exposed, list) and "Retry-After" in exposed
@@ -0,0 +1,56 @@
+from datetime import date
+
+import numpy as np
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services.consumption import smoothed_rates
+
+client = TestClient(app)
+
+
+def test_smoothed_rates_match_recursive_smoothing():
+    series = np.array([[0, 4, 0, 2, 6, 0, 1], [0, 0, 0, 0, 0, 0, 0]], dtype=float)
+    alpha = 0.4
+
+    expected = []
+    for row in series:
+        level = row.mean()
+        for value in row:
+            level = alpha * value + (1 - alpha) * level
+        expected.append(level)
+
+    assert np.allclose(smoothed_rates(series, alpha), expected)
+
+
+def test_consumption_endpoint_reports_completed_usage():
+    item = client.post(
+        "/api/items/",
+        json={
+            "name": "Consumed part",
+            "sku": "CONS-1",
+            "type": "component",
+            "quantity_on_hand": 20,
+        },
+    ).json()
+    for quantity in (3, 2):
+        assembly = client.post(
+            "/api/assemblies/",
+            json={"components": [{"item_id": item["id"], "quantity": quantity}]},
+        ).json()
+        client.post(f"/api/assemblies/{assembly['id']}/complete")
+    # Reserved but never completed: not consumption
+    client.post(
+        "/api/assemblies/",
+        json={"components": [{"item_id": item["id"], "quantity": 4}]},
+    )
+
+    response = client.get("/api/analytics/consumption", params={"alpha": 0.5})
+    assert response.status_code == 200
+    row = next(r for r in response.json() if r["item_id"] == item["id"])
+    assert row["item_sku"] == "CONS-1"
+    assert row["consumed_7d"] == row["consumed_90d"] == 5
+    assert row["quantity_available"] == 11
+    assert row["daily_rate"] > 0
+    assert abs(row["days_of_cover"] - 11 / row["daily_rate"]) < 0.5
+    assert date.fromisoformat(row["stockout_date"]) >= date.today()
@@ -0,0 +1,36 @@
+from datetime import timedelta
+
+from fastapi.testclient import TestClient
+
+from app.core.database import SessionLocal
+from app.main import app
+from app.services.archive import archive_assemblies
+
+client = TestClient(app)
+
+
+def test_archived_assemblies_leave_listing_but_stay_in_history():
+    item = client.post(
+        "/api/items/",
+        json={
+            "name": "Camera",
+            "sku": "ARC-1",
+            "type": "component",
+            "quantity_on_hand": 5,
+        },
+    ).json()
+    assembly = client.post(
+        "/api/assemblies/", json={"components": [{"item_id": item["id"]}]}
+    ).json()
+    client.post(f"/api/assemblies/{assembly['id']}/cancel")
+
+    with SessionLocal() as db:
+        assert archive_assemblies(db, timedelta(days=-1)) >= 1
+
+    listed = [a["id"] for a in client.get("/api/assemblies/").json()]
+    history = client.get("/api/assemblies/history").json()
+    assert assembly["id"] not in listed
+    archived = next(a for a in history if a["id"] == assembly["id"])
+    assert archived["status"] == "cancelled"
+    assert archived["components"][0]["item_sku"] == "ARC-1"
+    assert client.get(f"/api/assemblies/{assembly['id']}").status_code == 200
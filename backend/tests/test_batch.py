@@ -0,0 +1,42 @@
+from fastapi.testclient import TestClient
+
+from app.main import app
+
+client = TestClient(app)
+
+
+def test_batch_runs_reads_in_one_request():
+    item = client.post(
+        "/api/items/",
+        json={
+            "name": "Batched part",
+            "sku": "BATCH-1",
+            "type": "component",
+            "quantity_on_hand": 4,
+        },
+    ).json()
+
+    response = client.post(
+        "/api/batch/",
+        json={
+            "requests": [
+                {"id": "item", "path": f"/api/items/{item['id']}"},
+                {"id": "search", "path": "/api/items/search", "params": {"q": "BATCH"}},
+                {"id": "capacity", "path": "/api/assemblies/stats/build-capacity"},
+                {"id": "missing", "path": "/api/items/999999"},
+            ]
+        },
+    )
+    assert response.status_code == 200
+    results = {r["id"]: r for r in response.json()}
+    assert results["item"]["status"] == 200
+    assert results["item"]["body"]["quantity_on_hand"] == 4
+    assert results["search"]["body"][0]["sku"] == "BATCH-1"
+    assert results["capacity"]["status"] == 200
+    assert results["missing"]["status"] == 404
+    assert results["missing"]["body"] == {"detail": "Item not found"}
+
+
+def test_batch_rejects_non_api_paths():
+    response = client.post("/api/batch/", json={"requests": [{"path": "/metrics"}]})
+    assert response.status_code == 400
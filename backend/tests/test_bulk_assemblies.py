@@ -0,0 +1,73 @@
+from fastapi.testclient import TestClient
+
+from app.core.database import SessionLocal
+from app.main import app
+from app.services.summary import reconcile_summary
+
+client = TestClient(app)
+
+
+def _setup(sku, on_hand):
+    item = client.post(
+        "/api/items/",
+        json={
+            "name": sku,
+            "sku": sku,
+            "type": "component",
+            "quantity_on_hand": on_hand,
+        },
+    ).json()
+    config = client.post(
+        "/api/configurations/",
+        json={
+            "name": f"{sku} rig",
+            "components": [{"item_id": item["id"], "quantity": 2}],
+        },
+    ).json()
+    return item, config
+
+
+def test_bulk_create_is_all_or_nothing_by_default():
+    item, config = _setup("BULK-1", on_hand=10)
+
+    short = client.post(
+        "/api/assemblies/bulk",
+        json={"configuration_id": config["id"], "quantity": 6},
+    )
+    assert short.status_code == 400
+    assert "need 12, have 10" in short.json()["detail"]
+    assert client.get(f"/api/items/{item['id']}").json()["quantity_reserved"] == 0
+
+    response = client.post(
+        "/api/assemblies/bulk",
+        json={"configuration_id": config["id"], "order_references": ["A", "B"]},
+    )
+    assert response.status_code == 201
+    body = response.json()
+    assert body["created"] == 2
+    created = [client.get(f"/api/assemblies/{i}").json() for i in body["assembly_ids"]]
+    assert [a["order_reference"] for a in created] == ["A", "B"]
+    assert created[0]["components"][0]["quantity"] == 2
+    assert client.get(f"/api/items/{item['id']}").json()["quantity_reserved"] == 4
+
+
+def test_bulk_create_partial_fulfils_what_stock_allows():
+    item, config = _setup("BULK-2", on_hand=5)
+
+    response = client.post(
+        "/api/assemblies/bulk",
+        json={
+            "configuration_id": config["id"],
+            "order_references": ["X1", "X2", "X3"],
+            "partial": True,
+        },
+    )
+    assert response.status_code == 201
+    body = response.json()
+    assert (body["requested"], body["created"]) == (3, 2)
+    assert body["unfulfilled"] == ["X3"]
+    assert body["shortages"][0]["needed"] == 6
+    assert client.get(f"/api/items/{item['id']}").json()["quantity_reserved"] == 4
+
+    with SessionLocal() as db:
+        assert reconcile_summary(db) == {}
@@ -0,0 +1,166 @@
+import threading
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import SessionLocal, engine
+from app.main import app
+from app.models import Item
+from app.services.capacity_index import CapacityIndex, track_capacity
+from app.services.summary import track_summary
+
+client = TestClient(app)
+
+
+def capacity(config_id: int) -> int:
+    rows = client.get("/api/assemblies/stats/build-capacity").json()
+    return next(r["can_build"] for r in rows if r["configuration_id"] == config_id)
+
+
+def test_capacity_and_where_used_follow_stock_and_bom_changes():
+    frame, motor = (
+        client.post(
+            "/api/items/",
+            json={
+                "name": name,
+                "sku": sku,
+                "type": "component",
+                "quantity_on_hand": stock,
+            },
+        ).json()
+        for name, sku, stock in (("Frame", "CAP-1", 10), ("Motor", "CAP-2", 4))
+    )
+    config = client.post(
+        "/api/configurations/",
+        json={
+            "name": "Capacity rig",
+            "components": [
+                {"item_id": frame["id"], "quantity": 1},
+                {"item_id": motor["id"], "quantity": 2},
+            ],
+        },
+    ).json()
+    assert capacity(config["id"]) == 2
+
+    # Reserving stock lowers capacity without a rebuild
+    client.post("/api/assemblies/", json={"configuration_id": config["id"]})
+    assert capacity(config["id"]) == 1
+
+    client.patch(f"/api/items/{motor['id']}", json={"quantity_on_hand": 12})
+    assert capacity(config["id"]) == 5
+
+    # Bulk BOM replacement drops the motor
+    client.put(
+        f"/api/configurations/{config['id']}/components",
+        json=[{"item_id": frame["id"], "quantity": 3}],
+    )
+    assert capacity(config["id"]) == 3
+    assert client.get(f"/api/items/{motor['id']}/where-used").json() == []
+    assert client.get(f"/api/items/{frame['id']}/where-used").json() == [
+        {
+            "configuration_id": config["id"],
+            "configuration_name": "Capacity rig",
+            "quantity": 3,
+            "can_build": 3,
+        }
+    ]
+    assert client.get("/api/items/999999/where-used").status_code == 404
+
+
+def test_commit_hook_takes_no_second_connection():
+    item = client.post(
+        "/api/items/",
+        json={
+            "name": "Pooled",
+            "sku": "CAP-POOL",
+            "type": "component",
+            "quantity_on_hand": 3,
+        },
+    ).json()
+    config = client.post(
+        "/api/configurations/",
+        json={"name": "Pooled rig", "components": [{"item_id": item["id"]}]},
+    ).json()
+    assert capacity(config["id"]) == 3
+
+    # The committing session's connection is still out during after_commit
+    single = create_engine(str(engine.url), pool_size=1, max_overflow=0, pool_timeout=1)
+    factory = sessionmaker(bind=single)
+    track_summary(factory)
+    track_capacity(factory)
+    with factory() as db:
+        stocked = db.get(Item, item["id"])
+        assert stocked is not None
+        stocked.quantity_on_hand = 7
+        db.commit()
+
+    assert capacity(config["id"]) == 7
+
+
+class PausedRows:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def all(self):
+        return self.rows
+
+
+class PausingSession:
+    """Holds a load after it has read stock, before it applies anything."""
+
+    def __init__(self, db):
+        self.db = db
+        self.read, self.resume = threading.Event(), threading.Event()
+
+    def execute(self, statement):
+        result = self.db.execute(statement)
+        if "quantity_reserved" not in str(statement):
+            return result
+        rows = result.all()
+        self.read.set()
+        self.resume.wait(5)
+        return PausedRows(rows)
+
+
+def test_slow_load_never_overwrites_a_newer_refresh():
+    item = client.post(
+        "/api/items/",
+        json={
+            "name": "Raced part",
+            "sku": "CAP-RACE",
+            "type": "component",
+            "quantity_on_hand": 10,
+        },
+    ).json()
+    config = client.post(
+        "/api/configurations/",
+        json={"name": "Race rig", "components": [{"item_id": item["id"]}]},
+    ).json()
+    index = CapacityIndex()
+    with SessionLocal() as db:
+        slow = PausingSession(db)
+        loader = threading.Thread(target=index.load, args=(slow,))
+        loader.start()
+        try:
+            assert slow.read.wait(5)
+            with SessionLocal() as writer:
+                stocked = writer.get(Item, item["id"])
+                assert stocked is not None
+                stocked.quantity_on_hand = 7
+                writer.commit()
+            with SessionLocal() as fresh:
+                refresher = threading.Thread(
+                    target=index.refresh, args=(fresh, {item["id"]}, set())
+                )
+                refresher.start()
+                # Unserialized, the refresh applies now and the load after it
+                refresher.join(0.3)
+                slow.resume.set()
+                loader.join(5)
+                refresher.join(5)
+        finally:
+            slow.resume.set()
+
+    builds = {row["configuration_id"]: row["can_build"] for row in index.capacity()}
+    assert builds[config["id"]] == 7
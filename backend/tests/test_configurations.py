@@ -0,0 +1,57 @@
+from fastapi.testclient import TestClient
+
+from app.main import app
+
+client = TestClient(app)
+
+
+def _item(sku: str) -> int:
+    return client.post(
+        "/api/items/", json={"name": sku, "sku": sku, "type": "component"}
+    ).json()["id"]
+
+
+def test_replace_components_applies_diff():
+    keep, change, drop, add = (_item(f"BOM-{i}") for i in range(4))
+    config = client.post(
+        "/api/configurations/",
+        json={
+            "name": "Vessel kit",
+            "components": [
+                {"item_id": keep, "quantity": 1},
+                {"item_id": change, "quantity": 1},
+                {"item_id": drop, "quantity": 1},
+            ],
+        },
+    ).json()
+    kept_row = next(c["id"] for c in config["components"] if c["item_id"] == keep)
+
+    response = client.put(
+        f"/api/configurations/{config['id']}/components",
+        json=[
+            {"item_id": keep, "quantity": 1},
+            {"item_id": change, "quantity": 4},
+            {"item_id": add, "quantity": 2},
+        ],
+    )
+
+    assert response.status_code == 200
+    components = {c["item_id"]: c for c in response.json()["components"]}
+    assert {i: c["quantity"] for i, c in components.items()} == {
+        keep: 1,
+        change: 4,
+        add: 2,
+    }
+    assert components[keep]["id"] == kept_row
+
+
+def test_replace_components_rejects_unknown_items():
+    config = client.post("/api/configurations/", json={"name": "Empty"}).json()
+
+    response = client.put(
+        f"/api/configurations/{config['id']}/components",
+        json=[{"item_id": 999999, "quantity": 1}],
+    )
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Items not found: 999999"
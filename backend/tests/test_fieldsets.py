@@ -0,0 +1,46 @@
+from fastapi.testclient import TestClient
+
+from app.main import app
+
+client = TestClient(app)
+
+
+def test_sparse_fields_and_component_embedding():
+    item = client.post(
+        "/api/items/",
+        json={
+            "name": "Sparse part",
+            "sku": "FS-1",
+            "type": "component",
+            "quantity_on_hand": 4,
+        },
+    ).json()
+    config = client.post(
+        "/api/configurations/",
+        json={"name": "Sparse rig", "components": [{"item_id": item["id"]}]},
+    ).json()
+    assembly = client.post(
+        "/api/assemblies/", json={"configuration_id": config["id"]}
+    ).json()
+
+    response = client.get("/api/assemblies/", params={"fields": "status"})
+    row = next(r for r in response.json() if r["id"] == assembly["id"])
+    assert row == {"id": assembly["id"], "status": "reserved"}
+    # One query: no component or item lookups
+    assert 'desc="1 queries"' in response.headers["Server-Timing"]
+
+    configs = client.get(
+        "/api/configurations/", params={"fields": "name", "include": "components"}
+    ).json()
+    row = next(c for c in configs if c["id"] == config["id"])
+    assert set(row) == {"id", "name", "components"}
+    assert row["components"][0]["item_sku"] == "FS-1"
+
+    full = client.get("/api/assemblies/").json()
+    row = next(r for r in full if r["id"] == assembly["id"])
+    assert row["components"][0]["item_sku"] == "FS-1"
+    assert "created_at" in row
+
+    bad = client.get("/api/configurations/", params={"fields": "name,secret"})
+    assert bad.status_code == 400
+    assert bad.json()["detail"] == "Unknown fields: secret"
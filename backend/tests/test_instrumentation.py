@@ -0,0 +1,39 @@
+import logging
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+from app.core.database import engine
+from app.core.instrumentation import QueryStatsMiddleware, normalize_sql
+from app.main import app
+
+client = TestClient(app)
+
+
+def test_normalize_sql():
+    sql = "SELECT * FROM items\n WHERE id IN (%(id_1)s, %(id_2)s) AND name = 'x'"
+    assert normalize_sql(sql) == "SELECT * FROM items WHERE id IN (?) AND name = ?"
+
+
+def test_server_timing_header_reports_queries():
+    response = client.get("/api/items/")
+    assert response.status_code == 200
+    assert "db;dur=" in response.headers["server-timing"]
+    assert 'desc="1 queries"' in response.headers["server-timing"]
+
+
+def test_repeated_statements_flagged_as_n_plus_one(caplog):
+    probe = FastAPI()
+    probe.add_middleware(QueryStatsMiddleware)
+
+    @probe.get("/probe")
+    def run_same_query_six_times():
+        with engine.connect() as conn:
+            for i in range(6):
+                conn.execute(text("SELECT :i"), {"i": i})
+
+    with caplog.at_level(logging.WARNING, logger="app.core.instrumentation"):
+        TestClient(probe).get("/probe")
+
+    assert "Possible N+1 in GET /probe: 6 x SELECT ?" in caplog.text
@@ -0,0 +1,35 @@
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services.item_search import ItemSearchIndex
+
+client = TestClient(app)
+
+
+def test_index_ranks_exact_then_prefix_then_fuzzy():
+    index = ItemSearchIndex()
+    index.upsert(1, "Camera housing", "HSG-01", None)
+    index.upsert(2, "Camera", "CAM-001", "5701234567890")
+    index.upsert(3, "Router", "NET-RTR", None)
+
+    assert [i for i, _ in index.search("cam", 10)] == [2, 1]
+    assert index.search("5701234567890", 10)[0][0] == 2
+    assert [i for i, _ in index.search("rauter", 10)] == [3]
+
+    index.remove(2)
+    assert [i for i, _ in index.search("cam", 10)] == [1]
+
+
+def test_search_endpoint_sees_new_and_renamed_items():
+    client.get("/api/items/search", params={"q": "warmup"})
+    item = client.post(
+        "/api/items/",
+        json={"name": "Thermal sensor", "sku": "SRCH-THERM", "type": "component"},
+    ).json()
+
+    hits = client.get("/api/items/search", params={"q": "therm"}).json()
+    assert item["id"] in [hit["id"] for hit in hits]
+
+    client.patch(f"/api/items/{item['id']}", json={"name": "Flow meter"})
+    hits = client.get("/api/items/search", params={"q": "flow metr"}).json()
+    assert [hit["id"] for hit in hits] == [item["id"]]
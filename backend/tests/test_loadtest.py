@@ -0,0 +1,31 @@
+import argparse
+
+import pytest
+
+from scripts.loadtest import main, parse_args, parse_mix
+
+
+def test_parse_mix():
+    assert parse_mix("build=3,cancel") == {"build": 3, "cancel": 1}
+
+
+@pytest.mark.parametrize("mix", ["build=x", "build=-1", "build=1.5", "build=0"])
+def test_parse_mix_rejects_bad_weights(mix):
+    with pytest.raises(argparse.ArgumentTypeError):
+        parse_mix(mix)
+
+
+def test_bad_mix_is_a_usage_error(capsys):
+    with pytest.raises(SystemExit) as exit_info:
+        parse_args(["--mix", "build=-1"])
+
+    assert exit_info.value.code == 2
+    assert "non-negative integer" in capsys.readouterr().err
+
+
+def test_single_worker_run_keeps_stock_invariants(capsys):
+    exit_code = main(["--in-process", "--workers", "1", "--workflows", "12"])
+
+    output = capsys.readouterr().out
+    assert "Stock invariants: OK" in output
+    assert exit_code == 0
@@ -0,0 +1,114 @@
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from app.core.database import SessionLocal, engine
+from app.main import app
+from app.services.summary import reconcile_summary
+
+client = TestClient(app)
+
+
+def test_location_assemblies_use_only_their_site_stock():
+    north = client.post("/api/locations/", json={"code": "N", "name": "North"}).json()
+    south = client.post("/api/locations/", json={"code": "S", "name": "South"}).json()
+    item = client.post(
+        "/api/items/",
+        json={
+            "name": "Located part",
+            "sku": "LOC-1",
+            "type": "component",
+            "quantity_on_hand": 1,
+        },
+    ).json()
+    config = client.post(
+        "/api/configurations/",
+        json={
+            "name": "Located rig",
+            "components": [{"item_id": item["id"], "quantity": 2}],
+        },
+    ).json()
+    stock_url = f"/api/locations/{north['id']}/stock/{item['id']}"
+    assert client.put(stock_url, json={"quantity_on_hand": 5}).status_code == 200
+    client.put(
+        f"/api/locations/{south['id']}/stock/{item['id']}",
+        json={"quantity_on_hand": 1},
+    )
+
+    short = client.post(
+        "/api/assemblies/",
+        json={"configuration_id": config["id"], "location_id": south["id"]},
+    )
+    assert short.status_code == 400
+    assert short.json()["detail"] == (
+        "Insufficient stock for Located part at S: need 2, have 1"
+    )
+
+    assembly = client.post(
+        "/api/assemblies/",
+        json={"configuration_id": config["id"], "location_id": north["id"]},
+    ).json()
+    assert assembly["location_id"] == north["id"]
+    client.post(f"/api/assemblies/{assembly['id']}/complete")
+
+    north_stock = client.get(f"/api/locations/{north['id']}/stock").json()
+    assert north_stock[0]["quantity_on_hand"] == 3
+    assert north_stock[0]["quantity_reserved"] == 0
+    # The central pool is untouched
+    assert client.get(f"/api/items/{item['id']}").json()["quantity_on_hand"] == 1
+
+    capacity = next(
+        c
+        for c in client.get("/api/locations/build-capacity").json()
+        if c["configuration_id"] == config["id"]
+    )
+    # 1 central + 3 north + 1 south
+    assert capacity["can_build"] == 2
+    by_code = {c["location_code"]: c["can_build"] for c in capacity["locations"]}
+    assert by_code["N"] == 1
+    assert by_code["S"] == 0
+
+    with SessionLocal() as db:
+        assert reconcile_summary(db) == {}
+
+
+def test_location_movements_write_no_shared_rows():
+    site = client.post("/api/locations/", json={"code": "X", "name": "Solo"}).json()
+    item = client.post(
+        "/api/items/",
+        json={"name": "Solo part", "sku": "LOC-SOLO", "type": "component"},
+    ).json()
+    client.put(
+        f"/api/locations/{site['id']}/stock/{item['id']}",
+        json={"quantity_on_hand": 4},
+    )
+
+    writes = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        sql = " ".join(statement.split()).lower()
+        if sql.startswith(("insert", "update", "delete")):
+            writes.append(sql)
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        assembly = client.post(
+            "/api/assemblies/",
+            json={
+                "location_id": site["id"],
+                "components": [{"item_id": item["id"], "quantity": 3}],
+            },
+        ).json()
+        client.post(f"/api/assemblies/{assembly['id']}/complete")
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+    # Only site stock, the assembly and appended summary deltas
+    shared = [
+        sql
+        for sql in writes
+        if sql.startswith(("update items ", "insert into inventory_summary "))
+    ]
+    assert any(sql.startswith("update item_stock ") for sql in writes)
+    assert shared == []
+    with SessionLocal() as db:
+        assert reconcile_summary(db) == {}
@@ -0,0 +1,54 @@
+from fastapi.testclient import TestClient
+
+from app.core.metrics import Histogram, Registry
+from app.main import app
+
+client = TestClient(app)
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = Registry()
+    histogram = Histogram(
+        "latency_seconds", "Latency.", ("route",), (0.1, 1.0), registry=registry
+    )
+    histogram.observe(0.05, route="/a")
+    histogram.observe(0.5, route="/a")
+
+    text = registry.render()
+    assert 'latency_seconds_bucket{route="/a",le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{route="/a",le="+Inf"} 2' in text
+    assert 'latency_seconds_count{route="/a"} 2' in text
+
+
+def test_metrics_endpoint_reports_routes_and_business_gauges():
+    item = client.post(
+        "/api/items/",
+        json={
+            "name": "Gauge",
+            "sku": "M-1",
+            "type": "component",
+            "quantity_on_hand": 10,
+        },
+    ).json()
+    before = client.get("/metrics").text
+    client.post(
+        "/api/assemblies/",
+        json={"components": [{"item_id": item["id"], "quantity": 3}]},
+    )
+    after = client.get("/metrics").text
+
+    assert 'route="/api/items/"' in after
+    assert "db_pool_checked_out" in after
+    assert _gauge(after, 'assemblies{status="reserved"}') == (
+        _gauge(before, 'assemblies{status="reserved"}') + 1
+    )
+    assert _gauge(after, 'inventory_reserved_units{type="component"}') == (
+        _gauge(before, 'inventory_reserved_units{type="component"}') + 3
+    )
+
+
+def _gauge(text: str, sample: str) -> float:
+    for line in text.splitlines():
+        if line.startswith(sample + " "):
+            return float(line.split()[-1])
+    return 0.0
@@ -0,0 +1,192 @@
+import json
+import threading
+from datetime import timedelta
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+from fastapi.testclient import TestClient
+
+from app.core.database import SessionLocal
+from app.main import app
+from app.models import OutboxEvent
+from app.models.base import utcnow
+from app.services.outbox import OutboxWorker, record_event
+
+client = TestClient(app)
+
+
+class StubReceiver(BaseHTTPRequestHandler):
+    statuses: list[int] = []
+    received: list[dict] = []
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        status = self.statuses.pop(0) if self.statuses else 200
+        if status == 200:
+            self.received.extend(body["events"])
+        self.send_response(status)
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+def test_events_are_retried_and_delivered_in_order():
+    item = client.post(
+        "/api/items/",
+        json={
+            "name": "Outbox part",
+            "sku": "OUTBOX-1",
+            "type": "component",
+            "quantity_on_hand": 2,
+        },
+    ).json()
+    assembly = client.post(
+        "/api/assemblies/",
+        json={"components": [{"item_id": item["id"], "quantity": 1}]},
+    ).json()
+    client.post(f"/api/assemblies/{assembly['id']}/complete")
+    client.post(f"/api/assemblies/{assembly['id']}/ship")
+
+    server = HTTPServer(("127.0.0.1", 0), StubReceiver)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    StubReceiver.statuses = [500]
+    worker = OutboxWorker(
+        SessionLocal,
+        f"http://127.0.0.1:{server.server_port}/events",
+        backoff_base=60,
+        timeout=5,
+    )
+    try:
+        now = utcnow()
+        assert worker.deliver_once(now) == 0
+        # Backing off: nothing is due yet
+        assert worker.deliver_once(now + timedelta(seconds=30)) == 0
+        assert worker.deliver_once(now + timedelta(seconds=61)) >= 2
+        assert worker.deliver_once(now + timedelta(seconds=62)) == 0
+    finally:
+        server.shutdown()
+
+    ours = [
+        event
+        for event in StubReceiver.received
+        if event["aggregate_type"] == "assembly"
+        and event["aggregate_id"] == assembly["id"]
+    ]
+    assert [event["type"] for event in ours] == [
+        "assembly.completed",
+        "assembly.shipped",
+    ]
+    assert ours[0]["payload"]["components"] == [{"item_id": item["id"], "quantity": 1}]
+
+
+class PickyReceiver(BaseHTTPRequestHandler):
+    """Refuses batches with a poison event and fails ones with a flaky event."""
+
+    received: list[dict] = []
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        kinds = {event["payload"].get("kind") for event in body["events"]}
+        if "poison" in kinds:
+            status = 422
+        elif "flaky" in kinds:
+            status = 503
+        else:
+            status = 200
+            self.received.extend(body["events"])
+        self.send_response(status)
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+def test_poison_events_are_failed_without_blocking_the_rest():
+    server = HTTPServer(("127.0.0.1", 0), PickyReceiver)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    worker = OutboxWorker(
+        SessionLocal,
+        f"http://127.0.0.1:{server.server_port}/events",
+        backoff_base=60,
+        timeout=5,
+        max_attempts=2,
+    )
+    try:
+        # Send whatever earlier tests queued, so only our events are due
+        while worker.deliver_once():
+            pass
+        PickyReceiver.received = []
+
+        with SessionLocal() as db:
+            for aggregate_id, kind in (
+                (990001, "poison"),
+                (990001, "after-poison"),
+                (990002, "flaky"),
+                (990002, "after-flaky"),
+                (990003, "fine"),
+            ):
+                record_event(db, "probe", aggregate_id, "probe.sent", {"kind": kind})
+            db.commit()
+
+        now = utcnow()
+        # The batch is refused, so its events go one by one: the poison
+        # event fails at once and the flaky one holds back its aggregate
+        assert worker.deliver_once(now) == 2
+        # The flaky event runs out of attempts, taking its follower's batch
+        assert worker.deliver_once(now + timedelta(seconds=61)) == 0
+        assert worker.deliver_once(now + timedelta(seconds=200)) == 1
+        assert worker.deliver_once(now + timedelta(seconds=400)) == 0
+    finally:
+        server.shutdown()
+
+    kinds = [event["payload"]["kind"] for event in PickyReceiver.received]
+    assert kinds == ["after-poison", "fine", "after-flaky"]
+    with SessionLocal() as db:
+        failed = {
+            event.payload: (event.attempts, event.last_error)
+            for event in db.query(OutboxEvent).filter(
+                OutboxEvent.aggregate_type == "probe",
+                OutboxEvent.failed_at.is_not(None),
+            )
+        }
+    assert failed == {
+        '{"kind":"poison"}': (1, "HTTP Error 422: Unprocessable Entity"),
+        '{"kind":"flaky"}': (2, "HTTP Error 503: Service Unavailable"),
+    }
+
+
+def test_blocked_aggregates_do_not_stall_the_others():
+    sent: list[dict] = []
+
+    def send(url, body, timeout):
+        sent.extend(json.loads(body)["events"])
+
+    worker = OutboxWorker(SessionLocal, "http://receiver.test", batch_size=2, send=send)
+    # Send whatever earlier tests queued, so only our events are due
+    while worker.deliver_once():
+        pass
+    sent.clear()
+
+    later = utcnow() + timedelta(hours=1)
+    with SessionLocal() as db:
+        for _ in range(25):
+            record_event(db, "stall", 880001, "stall.sent", {})
+        record_event(db, "stall", 880002, "stall.sent", {})
+        db.flush()
+        head = (
+            db.query(OutboxEvent)
+            .filter(OutboxEvent.aggregate_type == "stall")
+            .order_by(OutboxEvent.id)
+            .first()
+        )
+        assert head is not None
+        # The first aggregate waits out a backoff; all 25 events sort first
+        head.next_attempt_at = later
+        db.commit()
+
+    assert worker.deliver_once() == 1
+    assert [(e["aggregate_type"], e["aggregate_id"]) for e in sent] == [
+        ("stall", 880002)
+    ]
+    assert worker.deliver_once() == 0
+    assert worker.deliver_once(later) == 2
@@ -0,0 +1,85 @@
+import csv
+import io
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+
+client = TestClient(app)
+
+
+def _item(sku, on_hand=100):
+    return client.post(
+        "/api/items/",
+        json={
+            "name": sku,
+            "sku": sku,
+            "type": "component",
+            "quantity_on_hand": on_hand,
+        },
+    ).json()
+
+
+def _assembly(*components):
+    return client.post(
+        "/api/assemblies/",
+        json={
+            "components": [
+                {"item_id": item["id"], "quantity": quantity}
+                for item, quantity in components
+            ]
+        },
+    ).json()
+
+
+def test_pick_list_totals_components_per_item():
+    frame, bolt = _item("PICK-FRAME"), _item("PICK-BOLT")
+    first = _assembly((frame, 1), (bolt, 4))
+    second = _assembly((frame, 1), (bolt, 6))
+    _assembly((bolt, 50))
+
+    response = client.get(
+        "/api/assemblies/pick-list", params={"ids": [first["id"], second["id"]]}
+    )
+    assert response.status_code == 200
+    lines = {line["item_sku"]: line for line in response.json()}
+    assert set(lines) == {"PICK-BOLT", "PICK-FRAME"}
+    assert lines["PICK-BOLT"]["quantity"] == 10
+    assert lines["PICK-BOLT"]["assemblies"] == 2
+    assert lines["PICK-FRAME"]["quantity"] == 2
+    assert lines["PICK-FRAME"]["quantity_on_hand"] == 100
+
+    client.post(f"/api/assemblies/{second['id']}/cancel")
+    reserved = client.get(
+        "/api/assemblies/pick-list",
+        params={"ids": [first["id"], second["id"]], "status": "reserved"},
+    ).json()
+    assert {line["item_sku"]: line["quantity"] for line in reserved} == {
+        "PICK-BOLT": 4,
+        "PICK-FRAME": 1,
+    }
+
+
+def test_pick_list_csv_and_validation():
+    widget = _item("PICK-CSV")
+    built = _assembly((widget, 3))
+
+    response = client.get(
+        "/api/assemblies/pick-list", params={"ids": [built["id"]], "format": "csv"}
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    assert "pick-list.csv" in response.headers["content-disposition"]
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert rows == [
+        {
+            "item_id": str(widget["id"]),
+            "item_sku": "PICK-CSV",
+            "item_name": "PICK-CSV",
+            "quantity": "3",
+            "assemblies": "1",
+            "quantity_on_hand": "100",
+        }
+    ]
+
+    assert client.get("/api/assemblies/pick-list").status_code == 400
@@ -0,0 +1,134 @@
+import asyncio
+import cProfile
+import threading
+import time
+
+import httpx
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+
+from app.core.profiling import ProfilingMiddleware, profile_endpoints
+
+
+class SingleProfile(cProfile.Profile):
+    """A profiler that, like cProfile on Python 3.12+, allows one per process."""
+
+    active: "SingleProfile | None" = None
+    lock = threading.Lock()
+
+    def enable(self, *args, **kwargs):
+        with self.lock:
+            if SingleProfile.active not in (None, self):
+                raise ValueError("Another profiling tool is already active")
+            SingleProfile.active = self
+        super().enable(*args, **kwargs)
+
+    def disable(self):
+        super().disable()
+        with self.lock:
+            if SingleProfile.active is self:
+                SingleProfile.active = None
+
+
+@pytest.fixture(autouse=True)
+def single_profiler(monkeypatch):
+    monkeypatch.setattr(cProfile, "Profile", SingleProfile)
+
+
+def crunch_numbers() -> int:
+    return sum(i * i for i in range(20_000))
+
+
+def _client(tmp_path, sample_rate=0.0, keep=200):
+    app = FastAPI()
+
+    @app.get("/work")
+    def work():
+        return {"total": crunch_numbers()}
+
+    @app.get("/slow")
+    def slow():
+        time.sleep(0.1)
+        return {"total": crunch_numbers()}
+
+    @app.get("/slow-async")
+    async def slow_async():
+        await asyncio.sleep(0.1)
+        return {"total": crunch_numbers()}
+
+    @app.get("/missing")
+    def missing():
+        raise HTTPException(status_code=404, detail="Nothing here")
+
+    profile_endpoints(app)
+    app.add_middleware(
+        ProfilingMiddleware,
+        token="s3cret",
+        sample_rate=sample_rate,
+        directory=str(tmp_path),
+        keep=keep,
+    )
+    return app
+
+
+def _gather(app, *requests):
+    async def scenario():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://t") as c:
+            return await asyncio.gather(
+                *(c.get(path, headers=headers) for path, headers in requests)
+            )
+
+    return asyncio.run(scenario())
+
+
+def test_token_returns_a_profile_of_the_endpoint_thread(tmp_path):
+    client = TestClient(_client(tmp_path))
+
+    plain = client.get("/work", headers={"X-Profile": "wrong"})
+    assert plain.json() == {"total": crunch_numbers()}
+    assert list(tmp_path.iterdir()) == []
+
+    profiled = client.get("/work", headers={"X-Profile": "s3cret"})
+    assert profiled.status_code == 200
+    assert profiled.headers["x-profiled-status"] == "200"
+    assert profiled.headers["content-type"].startswith("text/plain")
+    # Sync endpoints run in a worker thread; their calls are in the report
+    assert "crunch_numbers" in profiled.text
+
+    by_query = client.get("/missing?profile=s3cret")
+    assert by_query.headers["x-profiled-status"] == "404"
+    assert len(list(tmp_path.glob("*.prof"))) == 2
+
+
+def test_sampled_profiles_rotate(tmp_path):
+    client = TestClient(_client(tmp_path, sample_rate=1.0, keep=3))
+
+    for _ in range(5):
+        assert client.get("/work").json() == {"total": crunch_numbers()}
+
+    saved = sorted(tmp_path.glob("*.prof"))
+    assert len(saved) == 3
+    assert all("-GET-work-" in path.name for path in saved)
+
+
+def test_concurrent_requests_take_turns_at_the_profiler(tmp_path):
+    app = _client(tmp_path, sample_rate=1.0)
+    responses = _gather(app, *[("/slow", {}), ("/slow-async", {})] * 2, ("/work", {}))
+    # A request the profiler is busy for still runs, unprofiled
+    assert [r.status_code for r in responses] == [200] * 5
+    assert 1 <= len(list(tmp_path.glob("*.prof"))) < 5
+
+    asked = ("/slow", {"X-Profile": "s3cret"})
+    first, second = _gather(_client(tmp_path / "demand"), asked, asked)
+    assert sorted([first.status_code, second.status_code]) == [200, 503]
+    busy = first if first.status_code == 503 else second
+    assert busy.headers["Retry-After"] == "1"
+
+
+def test_async_endpoints_are_profiled_on_the_loop(tmp_path):
+    client = TestClient(_client(tmp_path))
+    profiled = client.get("/slow-async", headers={"X-Profile": "s3cret"})
+    assert profiled.headers["x-profiled-status"] == "200"
+    assert "crunch_numbers" in profiled.text
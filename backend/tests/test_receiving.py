@@ -0,0 +1,79 @@
+from fastapi.testclient import TestClient
+
+from app.core.database import SessionLocal
+from app.main import app
+from app.models import InventoryTransaction
+from app.services.summary import reconcile_summary
+
+client = TestClient(app)
+
+
+def _item(sku, on_hand=0, on_order=0):
+    return client.post(
+        "/api/items/",
+        json={
+            "name": sku,
+            "sku": sku,
+            "type": "component",
+            "quantity_on_hand": on_hand,
+            "quantity_on_order": on_order,
+        },
+    ).json()
+
+
+def test_receive_moves_on_order_to_on_hand_per_line():
+    bolt = _item("RCV-BOLT", on_hand=2, on_order=10)
+    nut = _item("RCV-NUT", on_hand=5, on_order=3)
+    config = client.post(
+        "/api/configurations/",
+        json={"name": "Receiving rig", "components": [{"item_id": nut["id"]}]},
+    ).json()
+    client.post("/api/assemblies/", json={"configuration_id": config["id"]})
+
+    response = client.post(
+        "/api/items/receive",
+        json={
+            "reference_id": 42,
+            "lines": [
+                {"item_id": bolt["id"], "received": 4},
+                {"sku": "RCV-BOLT", "received": 1, "adjustment": -1},
+                {"sku": "RCV-NUT", "received": 5},
+                {"sku": "RCV-NOPE", "received": 1},
+                {"item_id": nut["id"], "adjustment": -20},
+            ],
+        },
+    )
+    assert response.status_code == 200
+    results = response.json()
+    # Lines run in order; the nut write-off is rejected on its own
+    assert [r["status"] for r in results] == [
+        "ok",
+        "ok",
+        "ok",
+        "not_found",
+        "rejected",
+    ]
+    levels = [(r["quantity_on_hand"], r["quantity_on_order"]) for r in results]
+    assert levels[:3] == [(6, 6), (6, 5), (10, 0)]
+    assert results[2]["sku"] == "RCV-NUT"
+    assert results[4]["sku"] == "RCV-NUT"
+
+    bolt_now = client.get(f"/api/items/{bolt['id']}").json()
+    assert (bolt_now["quantity_on_hand"], bolt_now["quantity_on_order"]) == (6, 5)
+    nut_now = client.get(f"/api/items/{nut['id']}").json()
+    assert (nut_now["quantity_on_hand"], nut_now["quantity_on_order"]) == (10, 0)
+
+    with SessionLocal() as db:
+        changes = sorted(
+            (t.type, t.quantity_change, t.reference_id)
+            for t in db.query(InventoryTransaction).filter(
+                InventoryTransaction.item_id == bolt["id"]
+            )
+        )
+        assert changes == [("adjustment", -1, 42), ("receive", 5, 42)]
+        assert reconcile_summary(db) == {}
+
+
+def test_receive_requires_an_item_reference():
+    response = client.post("/api/items/receive", json={"lines": [{"received": 1}]})
+    assert response.status_code == 400
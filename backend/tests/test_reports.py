@@ -0,0 +1,53 @@
+import time
+
+from fastapi.testclient import TestClient
+
+from app.api.reports import report_runner
+from app.main import app
+
+client = TestClient(app)
+
+
+def wait_for(job_id: str, timeout: float = 60) -> dict:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = client.get(f"/api/reports/{job_id}").json()
+        if job["status"] != "pending":
+            return job
+        time.sleep(0.1)
+    raise AssertionError(f"report {job_id} still pending")
+
+
+def test_report_runs_in_background_and_is_deduplicated():
+    config = client.post("/api/configurations/", json={"name": "Report rig"}).json()
+    try:
+        submitted = client.post(
+            "/api/reports/", json={"kind": "build-capacity", "params": {"v": 1}}
+        )
+        assert submitted.status_code == 202
+        job_id = submitted.json()["id"]
+        again = client.post(
+            "/api/reports/", json={"kind": "build-capacity", "params": {"v": 1}}
+        ).json()
+        assert again["id"] == job_id
+
+        job = wait_for(job_id)
+        assert job["status"] == "done", job
+        result = client.get(f"/api/reports/{job_id}/result")
+        assert any(r["configuration_id"] == config["id"] for r in result.json())
+        etag = result.headers["ETag"]
+        assert etag == f'"{job["content_hash"]}"'
+        cached = client.get(
+            f"/api/reports/{job_id}/result", headers={"If-None-Match": etag}
+        )
+        assert cached.status_code == 304
+
+        # Finished and fresh: served from the cache, not run again
+        reused = client.post(
+            "/api/reports/", json={"kind": "build-capacity", "params": {"v": 1}}
+        ).json()
+        assert reused["id"] == job_id
+    finally:
+        report_runner.shutdown()
+
+    assert client.post("/api/reports/", json={"kind": "nope"}).status_code == 400
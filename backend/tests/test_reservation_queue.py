@@ -0,0 +1,81 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi.testclient import TestClient
+
+from app.core.database import SessionLocal
+from app.main import app
+from app.models import Assembly, Item
+from app.schemas.assembly import AssemblyCreate
+from app.services.reservation_queue import ReservationError, ReservationQueue
+
+client = TestClient(app)
+
+
+def test_queued_reservations_commit_together_and_fail_individually():
+    item = client.post(
+        "/api/items/",
+        json={
+            "name": "Queued part",
+            "sku": "RQ-1",
+            "type": "component",
+            "quantity_on_hand": 10,
+        },
+    ).json()
+    request = AssemblyCreate.model_validate(
+        {"components": [{"item_id": item["id"], "quantity": 3}]}
+    )
+
+    # A long window so all six land in one batch
+    intake = ReservationQueue(SessionLocal, window=0.5)
+    with ThreadPoolExecutor(max_workers=6) as pool:
+        futures = [pool.submit(intake.reserve, request, 10) for _ in range(6)]
+    intake.stop()
+
+    ids, errors = [], []
+    for future in futures:
+        try:
+            ids.append(future.result())
+        except ReservationError as e:
+            errors.append(str(e))
+
+    assert len(ids) == 3
+    assert errors == ["Insufficient stock for Queued part: need 3, have 1"] * 3
+    with SessionLocal() as db:
+        stocked = db.get(Item, item["id"])
+        assert stocked is not None and stocked.quantity_reserved == 9
+        created = db.query(Assembly).filter(Assembly.id.in_(ids)).all()
+        assert {a.status for a in created} == {"reserved"}
+
+
+def test_unknown_configuration_fails_only_its_own_request():
+    item = client.post(
+        "/api/items/",
+        json={
+            "name": "Mixed part",
+            "sku": "RQ-MIX",
+            "type": "component",
+            "quantity_on_hand": 10,
+        },
+    ).json()
+    good = AssemblyCreate.model_validate(
+        {"components": [{"item_id": item["id"], "quantity": 2}]}
+    )
+    bad = AssemblyCreate.model_validate({"configuration_id": 999999})
+
+    intake = ReservationQueue(SessionLocal, window=0.5)
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        futures = [pool.submit(intake.reserve, r, 10) for r in (good, bad, good)]
+    intake.stop()
+
+    outcomes = []
+    for future in futures:
+        try:
+            outcomes.append(future.result())
+        except ReservationError as e:
+            outcomes.append(str(e))
+    assert outcomes.count("Configuration not found") == 1
+    ids = [o for o in outcomes if isinstance(o, int)]
+    assert len(ids) == 2
+    with SessionLocal() as db:
+        stocked = db.get(Item, item["id"])
+        assert stocked is not None and stocked.quantity_reserved == 4
@@ -0,0 +1,91 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+from fastapi import FastAPI
+
+from app.core.single_flight import SingleFlight, SingleFlightMiddleware
+
+
+def test_concurrent_threads_share_one_call():
+    flights = SingleFlight()
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def slow():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return "done"
+
+    with ThreadPoolExecutor(4) as pool:
+        futures = [pool.submit(flights.do, "key", slow) for _ in range(4)]
+        started.wait(5)
+        # Give the followers time to join before the leader finishes
+        time.sleep(0.1)
+        release.set()
+        results = [f.result() for f in futures]
+
+    assert len(calls) == 1
+    assert sorted(shared for _, shared in results) == [False, True, True, True]
+    assert {result for result, _ in results} == {"done"}
+    assert flights.do("key", lambda: "again") == ("again", False)
+
+
+def test_identical_concurrent_gets_share_one_response():
+    app = FastAPI()
+    calls = []
+
+    @app.get("/api/expensive")
+    async def expensive(q: str = ""):
+        calls.append(q)
+        await asyncio.sleep(0.05)
+        return {"q": q, "call": len(calls)}
+
+    app.add_middleware(SingleFlightMiddleware, paths=frozenset({"/api/expensive"}))
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://t") as c:
+            return await asyncio.gather(
+                c.get("/api/expensive?q=a&x=1"),
+                c.get("/api/expensive?x=1&q=a"),
+                c.get("/api/expensive?q=b"),
+            )
+
+    first, second, other = asyncio.run(scenario())
+    assert first.json() == second.json()
+    assert other.json()["q"] == "b"
+    assert sorted(calls) == ["a", "b"]
+
+
+def test_origin_and_profiling_requests_are_not_shared():
+    app = FastAPI()
+    calls = []
+
+    @app.get("/api/expensive")
+    async def expensive():
+        calls.append(1)
+        call = len(calls)
+        await asyncio.sleep(0.05)
+        return {"call": call}
+
+    app.add_middleware(SingleFlightMiddleware, paths=frozenset({"/api/expensive"}))
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://t") as c:
+            return await asyncio.gather(
+                c.get("/api/expensive", headers={"Origin": "http://a.test"}),
+                c.get("/api/expensive", headers={"Origin": "http://a.test"}),
+                c.get("/api/expensive", headers={"Origin": "http://b.test"}),
+                c.get("/api/expensive", headers={"X-Profile": "token"}),
+                c.get("/api/expensive?profile=token"),
+            )
+
+    first, same, other, *profiled = asyncio.run(scenario())
+    assert first.json() == same.json()
+    assert len({r.json()["call"] for r in (first, other, *profiled)}) == 4
+    assert len(calls) == 4
@@ -0,0 +1,92 @@
+from datetime import datetime
+
+import numpy as np
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services.stock_history import (
+    StockSeries,
+    downsample,
+    lttb,
+    min_max,
+    stock_history,
+    window,
+)
+
+client = TestClient(app)
+
+
+def _series(levels, start=datetime(2026, 1, 1)):
+    levels = np.asarray(levels, dtype=np.int64)
+    times = np.datetime64(start, "us") + np.arange(len(levels)) * np.timedelta64(1, "m")
+    return StockSeries(times=times, on_hand=levels, reserved=np.zeros_like(levels))
+
+
+def test_history_replays_events_back_from_current_levels():
+    item = client.post(
+        "/api/items/",
+        json={
+            "name": "Hist part",
+            "sku": "HIST-1",
+            "type": "component",
+            "quantity_on_hand": 10,
+        },
+    ).json()
+    client.post(
+        "/api/items/receive",
+        json={"lines": [{"item_id": item["id"], "adjustment": 5}]},
+    )
+    components = [{"item_id": item["id"], "quantity": 2}]
+    built = client.post("/api/assemblies/", json={"components": components}).json()
+    client.post(f"/api/assemblies/{built['id']}/complete")
+    dropped = client.post("/api/assemblies/", json={"components": components}).json()
+    client.post(f"/api/assemblies/{dropped['id']}/cancel")
+    stock_history.clear()
+
+    response = client.get(f"/api/items/{item['id']}/stock-history")
+    assert response.status_code == 200
+    body = response.json()
+    # receipt, two reservations, a completion and a cancellation, then now
+    assert body["events"] == 6
+    levels = [(p["quantity_on_hand"], p["quantity_reserved"]) for p in body["points"]]
+    assert levels[-1] == (13, 0)
+    assert max(on_hand for on_hand, _ in levels) == 15
+    assert max(reserved for _, reserved in levels) >= 2
+
+    assert client.get("/api/items/999999/stock-history").status_code == 404
+    assert (
+        client.get(f"/api/items/{item['id']}/stock-history?method=x").status_code == 422
+    )
+
+
+def test_window_carries_in_the_level_at_its_start():
+    series = _series([1, 2, 3, 4, 5])
+    start = datetime(2026, 1, 1, 0, 2, 30)
+    cut = window(series, start, datetime(2026, 1, 2))
+    assert cut.on_hand.tolist() == [3, 4, 5]
+    assert cut.times[0] == np.datetime64(start, "us")
+
+
+def test_lttb_keeps_endpoints_and_spikes():
+    rng = np.random.default_rng(7)
+    levels = 500 + rng.integers(-3, 4, size=100_000).cumsum() // 50
+    levels[41_234] = 5_000
+    levels[77_777] = -400
+
+    index = lttb(np.arange(len(levels), dtype=float), levels.astype(float), 300)
+    assert len(index) == 300
+    assert index[0] == 0 and index[-1] == len(levels) - 1
+    assert np.all(np.diff(index) > 0)
+    assert {41_234, 77_777} <= set(index.tolist())
+
+    sampled = downsample(_series(levels), 300)
+    assert len(sampled) == 300
+    assert sampled.on_hand.max() == 5_000
+
+
+def test_min_max_keeps_every_bucket_extreme():
+    levels = np.tile([0, 10, 5, 7], 1_000)
+    index = min_max(levels, 100)
+    assert len(index) <= 100
+    assert set(levels[index].tolist()) == {0, 10}
+    assert len(downsample(_series([1, 2, 3]), 300, "minmax")) == 3
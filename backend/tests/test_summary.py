@@ -0,0 +1,98 @@
+from fastapi.testclient import TestClient
+
+from app.core.database import SessionLocal
+from app.main import app
+from app.models import InventorySummary, InventorySummaryDelta
+from app.services.summary import (
+    apply_summary_deltas,
+    delta_backlog,
+    fold_summary_deltas,
+    read_summary,
+    reconcile_summary,
+)
+
+client = TestClient(app)
+
+
+def test_summary_tracks_writes_and_reconciles():
+    before = client.get("/api/summary/").json()
+    item = client.post(
+        "/api/items/",
+        json={
+            "name": "Summary part",
+            "sku": "SUM-1",
+            "type": "summary-test",
+            "quantity_on_hand": 8,
+            "quantity_on_order": 5,
+        },
+    ).json()
+    assembly = client.post(
+        "/api/assemblies/",
+        json={"components": [{"item_id": item["id"], "quantity": 2}]},
+    ).json()
+    client.post(f"/api/assemblies/{assembly['id']}/complete")
+
+    summary = client.get("/api/summary/").json()
+    assert summary["items"]["summary-test"] == {
+        "count": 1,
+        "on_hand": 6,
+        "reserved": 0,
+        "on_order": 5,
+        "available": 6,
+    }
+    completed = before["assemblies"].get("completed", 0) + 1
+    assert summary["assemblies"]["completed"] == completed
+
+    with SessionLocal() as db:
+        assert reconcile_summary(db) == {}
+
+
+def test_writes_append_deltas_that_fold_into_the_summary():
+    with SessionLocal() as db:
+        fold_summary_deltas(db)
+        folded_before = db.get(InventorySummary, ("on_hand", "fold-test"))
+        assert folded_before is None
+
+    client.post(
+        "/api/items/",
+        json={
+            "name": "Fold part",
+            "sku": "SUM-FOLD",
+            "type": "fold-test",
+            "quantity_on_hand": 4,
+        },
+    )
+    with SessionLocal() as db:
+        # Writers never touch the shared summary rows
+        assert db.get(InventorySummary, ("on_hand", "fold-test")) is None
+        assert read_summary(db)[("on_hand", "fold-test")] == 4
+
+        assert fold_summary_deltas(db) >= 2
+        folded = db.get(InventorySummary, ("on_hand", "fold-test"))
+        assert folded is not None and folded.value == 4
+        assert db.query(InventorySummaryDelta).count() == 0
+        assert read_summary(db)[("on_hand", "fold-test")] == 4
+        assert reconcile_summary(db) == {}
+
+
+def test_reads_fold_a_backlog_past_the_limit():
+    key = ("on_hand", "backlog-test")
+    with SessionLocal() as db:
+        fold_summary_deltas(db)
+        # A stalled folder: thousands of small deltas on one key
+        for _ in range(3000):
+            apply_summary_deltas(db, {key: 1})
+        db.commit()
+        assert delta_backlog(db) >= 3000
+
+        # Within the limit the read adds them up and leaves them queued
+        assert read_summary(db, max_backlog=5000)[key] == 3000
+        assert delta_backlog(db) >= 3000
+
+        assert read_summary(db, max_backlog=500)[key] == 3000
+        assert delta_backlog(db) <= 500
+        assert db.query(InventorySummaryDelta).count() <= 500
+
+        apply_summary_deltas(db, {key: -3000})
+        db.commit()
+        assert key not in read_summary(db)
@@ -0,0 +1,109 @@
+from decimal import Decimal
+
+from fastapi.testclient import TestClient
+
+from app.core.database import SessionLocal
+from app.main import app
+from app.models import CostLayer
+from app.services.valuation import rebuild_cost_layers
+
+client = TestClient(app)
+
+
+def _layers(item_id):
+    with SessionLocal() as db:
+        return [
+            (layer.quantity_remaining, layer.unit_cost)
+            for layer in db.query(CostLayer)
+            .filter(CostLayer.item_id == item_id, CostLayer.quantity_remaining > 0)
+            .order_by(CostLayer.received_at, CostLayer.id)
+        ]
+
+
+def _valuation(item_id):
+    body = client.get("/api/analytics/valuation").json()
+    return next(i for i in body["items"] if i["item_id"] == item_id)
+
+
+def test_completions_consume_oldest_cost_layers_first():
+    item = client.post(
+        "/api/items/",
+        json={"name": "Costed part", "sku": "FIFO-1", "type": "component"},
+    ).json()
+    for received, cost in ((5, "2.00"), (5, "3.50")):
+        client.post(
+            "/api/items/receive",
+            json={
+                "lines": [{"sku": "FIFO-1", "received": received, "unit_cost": cost}]
+            },
+        )
+    assert Decimal(_valuation(item["id"])["value"]) == Decimal("27.50")
+
+    assembly = client.post(
+        "/api/assemblies/",
+        json={"components": [{"item_id": item["id"], "quantity": 7}]},
+    ).json()
+    client.post(f"/api/assemblies/{assembly['id']}/complete")
+
+    # 5 @ 2.00 and 2 @ 3.50 consumed; 3 @ 3.50 left
+    assert _layers(item["id"]) == [(3, Decimal("3.5"))]
+    valued = _valuation(item["id"])
+    assert (valued["quantity_on_hand"], valued["quantity_costed"]) == (3, 3)
+    assert Decimal(valued["value"]) == Decimal("10.50")
+
+    with SessionLocal() as db:
+        rebuild_cost_layers(db)
+    assert _layers(item["id"]) == [(3, Decimal("3.5"))]
+
+
+def test_items_with_history_cannot_be_deleted():
+    item = client.post(
+        "/api/items/",
+        json={"name": "Audited part", "sku": "FIFO-DEL", "type": "component"},
+    ).json()
+    client.post(
+        "/api/items/receive",
+        json={"lines": [{"sku": "FIFO-DEL", "received": 4, "unit_cost": "1.25"}]},
+    )
+
+    response = client.delete(f"/api/items/{item['id']}")
+    assert response.status_code == 400
+    assert "history" in response.json()["detail"]
+    # Nothing was removed along the way
+    assert _layers(item["id"]) == [(4, Decimal("1.25"))]
+    assert client.get(f"/api/items/{item['id']}").status_code == 200
+
+
+def test_location_builds_leave_central_cost_layers_alone():
+    site = client.post(
+        "/api/locations/", json={"code": "FIFO-S", "name": "Site"}
+    ).json()
+    item = client.post(
+        "/api/items/",
+        json={"name": "Sited part", "sku": "FIFO-LOC", "type": "component"},
+    ).json()
+    client.post(
+        "/api/items/receive",
+        json={"lines": [{"sku": "FIFO-LOC", "received": 5, "unit_cost": "2.00"}]},
+    )
+    client.put(
+        f"/api/locations/{site['id']}/stock/{item['id']}",
+        json={"quantity_on_hand": 4},
+    )
+    before = _valuation(item["id"])
+
+    assembly = client.post(
+        "/api/assemblies/",
+        json={
+            "location_id": site["id"],
+            "components": [{"item_id": item["id"], "quantity": 3}],
+        },
+    ).json()
+    assert client.post(f"/api/assemblies/{assembly['id']}/complete").status_code == 200
+
+    assert _valuation(item["id"]) == before
+    assert _layers(item["id"]) == [(5, Decimal("2"))]
+    with SessionLocal() as db:
+        rebuild_cost_layers(db)
+    assert _layers(item["id"]) == [(5, Decimal("2"))]
+    assert _valuation(item["id"]) == before
@@ -38,6 +38,15 @@ export interface ItemUpdate {
   lead_time_days?: number | null;
 }
 
+export interface ItemSearchResult {
+  id: number;
+  name: string;
+  sku: string;
+  barcode: string | null;
+  type: string;
+  quantity_available: number;
+}
+
 export interface ConfigurationComponent {
   id: number;
   item_id: number;
@@ -112,6 +121,13 @@ export const api = {
     return res.json();
   },
 
+  async searchItems(q: string, limit = 20): Promise<ItemSearchResult[]> {
+    const params = new URLSearchParams({ q, limit: limit.toString() });
+    const res = await fetch(`${API_BASE}/items/search?${params}`);
+    if (!res.ok) throw new Error("Failed to search items");
+    return res.json();
+  },
+
   async getItem(id: number): Promise<Item> {
     const res = await fetch(`${API_BASE}/items/${id}`);
     if (!res.ok) throw new Error("Failed to fetch item");
@@ -218,6 +234,19 @@ export const api = {
     return res.json();
   },
 
+  async replaceConfigurationComponents(
+    configId: number,
+    components: { item_id: number; quantity: number }[]
+  ): Promise<Configuration> {
+    const res = await fetch(`${API_BASE}/configurations/${configId}/components`, {
+      method: "PUT",
+      headers: { "Content-Type": "application/json" },
+      body: JSON.stringify(components),
+    });
+    if (!res.ok) throw new Error("Failed to update components");
+    return res.json();
+  },
+
   async removeConfigurationComponent(
     configId: number,
     componentId: number